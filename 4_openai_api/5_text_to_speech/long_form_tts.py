@@ -0,0 +1,246 @@
+import argparse
+import asyncio
+import re
+import time
+import wave
+from collections.abc import AsyncIterator
+from pathlib import Path
+import numpy as np
+from openai import AsyncOpenAI
+from openai.helpers import LocalAudioPlayer
+from speech_cache import DEFAULT_CACHE_DIR, SpeechCache
+
+# 클라이언트 준비
+openai = AsyncOpenAI()
+
+SAMPLE_RATE = 24000  # response_format="pcm"의 샘플링 레이트 (16비트 모노)
+DEFAULT_TEXT = Path(__file__).resolve().parents[1] / "1_text_generation" / "akazukin_all.txt"
+
+# 문장 끝 (마침표·물음표·느낌표 뒤에 닫는 따옴표나 괄호가 올 수 있음)
+SENTENCE_END = re.compile(r"(?<=[.!?。！？…])[」』\"'”’)\]]*\s+")
+
+# 절 구분 부호 (긴 문장을 나눌 때 이 부호 뒤에서 자름)
+CLAUSE_MARKS = ",、;:，；："
+
+# 청크 하나의 큐에 쌓아 둘 수 있는 최대 조각 수 (재생보다 합성이 빠를 때 메모리 상한)
+QUEUE_SIZE = 256
+
+# 문단별로 문장 나누기 (줄마다 한 문단, 제목처럼 문장 부호가 없는 줄은 그대로 한 문장)
+def split_sentences(text: str) -> list[list[str]]:
+    paragraphs = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        sentences = []
+        start = 0
+        for match in SENTENCE_END.finditer(line):
+            sentences.append(line[start : match.end()].strip())
+            start = match.end()
+        if line[start:].strip():
+            sentences.append(line[start:].strip())
+        paragraphs.append(sentences)
+    return paragraphs
+
+# max_chars보다 긴 문장 나누기 (절 구분 부호 뒤에서, 없으면 공백에서, 그것도 없으면 max_chars 위치에서 자름)
+def split_long_sentence(sentence: str, max_chars: int) -> list[str]:
+    pieces = []
+    while len(sentence) > max_chars:
+        clause = max(sentence.rfind(mark, 0, max_chars) for mark in CLAUSE_MARKS) + 1
+        space = sentence.rfind(" ", 0, max_chars + 1)
+        if clause > max_chars // 2:
+            cut = clause
+        elif max(clause, space) > 0:
+            cut = max(clause, space)
+        else:
+            cut = max_chars
+        pieces.append(sentence[:cut].strip())
+        sentence = sentence[cut:].strip()
+    if sentence:
+        pieces.append(sentence)
+    return pieces
+
+# 합성 단위로 묶기
+# 첫 청크는 첫 문장만 (첫 소리가 빨리 나오도록), 이후는 같은 문단 안에서 max_chars를 넘지 않게 문장을 이어 붙임
+# (요청 수를 줄이고 문장 사이 억양이 자연스럽도록, 문단과 제목 사이는 끊어서 쉼을 살림)
+# max_chars보다 긴 문장은 나눠서 넣으므로 어떤 청크도 max_chars를 넘지 않음
+def make_chunks(text: str, max_chars: int = 200) -> list[str]:
+    chunks: list[str] = []
+    for sentences in split_sentences(text):
+        current = ""
+        for sentence in (piece for s in sentences for piece in split_long_sentence(s, max_chars)):
+            if not chunks and not current:
+                chunks.append(sentence)
+            elif current and len(current) + 1 + len(sentence) > max_chars:
+                chunks.append(current)
+                current = sentence
+            else:
+                current = f"{current} {sentence}" if current else sentence
+        if current:
+            chunks.append(current)
+    return chunks
+
+# 청크 하나 합성 (PCM 바이트를 받는 대로 내보냄)
+# cache를 지정하면 적중 시 디스크에서 바로 내보내고, 미스면 받으면서 캐시에 저장
+async def synthesize(
+    text: str, model: str = "gpt-4o-mini-tts", voice: str = "alloy", instructions: str | None = None,
+    cache: SpeechCache | None = None,
+) -> AsyncIterator[bytes]:
+    key = cache.key(model, voice, instructions, text, "pcm") if cache else None
+    if cache is not None:
+        mapping = cache.open(key)
+        if mapping is not None:
+            with mapping:
+                for start in range(0, len(mapping), 4096):
+                    yield mapping[start : start + 4096]
+            return
+
+    options = {"instructions": instructions} if instructions else {}
+    async with openai.audio.speech.with_streaming_response.create(
+        model=model,
+        voice=voice,
+        input=text,
+        response_format="pcm",
+        **options,
+    ) as response:
+        stream = response.iter_bytes(4096)
+        if cache is not None:
+            stream = cache.tee(key, "pcm", stream)
+        async for data in stream:
+            yield data
+
+# 긴 문서 음성 합성
+# - 재생 중인 청크부터 concurrency개까지만 미리 합성하고 청크마다 큐에 PCM을 쌓음
+#   (청크 i는 청크 i-concurrency의 재생이 끝나야 시작하므로 문서 전체의 PCM이 메모리에 쌓이지 않음)
+# - 큐는 QUEUE_SIZE 조각까지만 쌓고, 가득 차면 재생이 따라올 때까지 받기를 멈춤
+# - 재생 쪽은 원래 순서대로 큐를 비우므로 앞 청크가 도착하는 즉시 소리가 남
+# - 청크 사이에 무음이나 크로스페이드를 넣지 않고 PCM을 그대로 이어 붙임
+class LongFormSynthesizer:
+    # 초기화
+    def __init__(
+        self,
+        chunks: list[str],
+        concurrency: int = 4,
+        model: str = "gpt-4o-mini-tts",
+        voice: str = "alloy",
+        instructions: str | None = None,
+        cache: SpeechCache | None = None,
+    ):
+        self.chunks = chunks
+        self.concurrency = concurrency
+        self.model = model
+        self.voice = voice
+        self.instructions = instructions
+        self.cache = cache
+        self.queues = [asyncio.Queue(QUEUE_SIZE) for _ in chunks]  # 청크마다 PCM 바이트, 끝이면 None
+        self.played = [asyncio.Event() for _ in chunks]  # 청크마다 재생 쪽이 다 꺼냈는지
+        self.start_time: float | None = None
+        self.first_audio_time: float | None = None
+        self.bytes_out = 0
+
+    # 청크 하나 합성해서 큐에 넣기 (실패하면 예외를 큐에 넣어 재생 쪽에서 다시 발생)
+    async def worker(self, index: int) -> None:
+        if index >= self.concurrency:
+            await self.played[index - self.concurrency].wait()
+        queue = self.queues[index]
+        try:
+            async for data in synthesize(
+                self.chunks[index], self.model, self.voice, self.instructions, self.cache
+            ):
+                await queue.put(data)
+        except Exception as e:
+            await queue.put(e)
+            return
+        await queue.put(None)
+
+    # 순서대로 PCM 내보내기 (int16 배열, 샘플 경계가 잘린 바이트는 다음 조각과 합침)
+    async def stream(self) -> AsyncIterator[np.ndarray]:
+        self.start_time = time.perf_counter()
+        tasks = [asyncio.create_task(self.worker(i)) for i in range(len(self.chunks))]
+        carry = b""
+        try:
+            for queue, played in zip(self.queues, self.played):
+                while True:
+                    data = await queue.get()
+                    if data is None:
+                        played.set()
+                        break
+                    if isinstance(data, Exception):
+                        raise data
+                    if carry:
+                        data = carry + data
+                    usable = len(data) - len(data) % 2
+                    carry = data[usable:]
+                    if not usable:
+                        continue
+                    if self.first_audio_time is None:
+                        self.first_audio_time = time.perf_counter() - self.start_time
+                    self.bytes_out += usable
+                    yield np.frombuffer(data, dtype=np.int16, count=usable // 2)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    # 요약
+    def summary(self) -> str:
+        total = time.perf_counter() - self.start_time
+        audio_seconds = self.bytes_out / 2 / SAMPLE_RATE
+        first = f"{self.first_audio_time:.2f}s" if self.first_audio_time is not None else "-"
+        return (
+            f"청크 {len(self.chunks)}개, 음성 {audio_seconds:.1f}s, "
+            f"첫 소리까지 {first}, 전체 {total:.2f}s"
+        )
+
+# 출력 파일에 쓰면서 그대로 내보내기 (WAV면 헤더 포함, 그 밖에는 raw PCM)
+async def tee_to_file(stream: AsyncIterator[np.ndarray], path: Path) -> AsyncIterator[np.ndarray]:
+    if path.suffix.lower() == ".wav":
+        with wave.open(str(path), "wb") as f:
+            f.setnchannels(1)
+            f.setsampwidth(2)
+            f.setframerate(SAMPLE_RATE)
+            async for pcm in stream:
+                f.writeframesraw(memoryview(pcm).cast("B"))
+                yield pcm
+    else:
+        with open(path, "wb") as f:
+            async for pcm in stream:
+                f.write(pcm)
+                yield pcm
+
+# 메인 함수 정의
+async def main(args: argparse.Namespace):
+    text = Path(args.file).read_text(encoding="utf-8")
+    chunks = make_chunks(text, args.max_chars)
+    cache = None if args.no_cache else SpeechCache(args.cache_dir, args.cache_size * 1024 * 1024)
+    synthesizer = LongFormSynthesizer(
+        chunks, args.concurrency, args.model, args.voice, args.instructions, cache
+    )
+    stream = synthesizer.stream()
+    if args.output:
+        stream = tee_to_file(stream, Path(args.output))
+
+    if args.no_play:
+        async for _ in stream:
+            pass
+    else:
+        await LocalAudioPlayer().play_stream(stream)
+    print(synthesizer.summary())
+    if cache is not None:
+        print(f"캐시: {cache.summary()}")
+
+# 메인 함수 실행
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("file", nargs="?", default=str(DEFAULT_TEXT), help="읽을 텍스트 파일")
+    parser.add_argument("--concurrency", type=int, default=4, help="재생 위치보다 앞서 합성할 최대 청크 수")
+    parser.add_argument("--max-chars", type=int, default=200, help="청크 하나의 최대 글자 수")
+    parser.add_argument("--model", default="gpt-4o-mini-tts", help="음성 합성 모델")
+    parser.add_argument("--voice", default="alloy", help="목소리")
+    parser.add_argument("--instructions", default="차분한 어조로 이야기를 읽어 주세요.", help="말투 지시")
+    parser.add_argument("-o", "--output", help="출력 파일 (.wav 또는 raw PCM)")
+    parser.add_argument("--cache-dir", default=str(DEFAULT_CACHE_DIR), help="음성 캐시 디렉터리")
+    parser.add_argument("--cache-size", type=int, default=500, help="음성 캐시 최대 크기(MB)")
+    parser.add_argument("--no-cache", action="store_true", help="음성 캐시를 사용하지 않음")
+    parser.add_argument("--no-play", action="store_true", help="재생하지 않음 (--output과 함께 사용)")
+    asyncio.run(main(parser.parse_args()))
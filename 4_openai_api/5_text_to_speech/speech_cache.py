@@ -0,0 +1,115 @@
+import hashlib
+import json
+import mmap
+import os
+import tempfile
+from collections import OrderedDict
+from collections.abc import AsyncIterator
+from pathlib import Path
+
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parent / ".speech_cache"
+
+# 합성 음성 디스크 캐시 (내용 주소 방식)
+# - 키는 모델, 목소리, 말투 지시, 텍스트, 출력 형식의 해시 (같은 요청이면 같은 파일)
+# - 파일은 directory/<키 앞 2자리>/<키>.<형식>에 저장하고, 수정 시각을 마지막 사용 시각으로 사용
+# - 전체 크기가 max_bytes를 넘으면 가장 오래 사용하지 않은 파일부터 삭제
+# - 적중하면 파일을 mmap으로 열어 돌려줌 (전체를 메모리로 복사하지 않음, API 호출 없음, with 문으로 닫음)
+# - 미스면 API 응답을 내보내면서 임시 파일에 쓰고, 끝까지 받았을 때만 캐시에 등록
+#   (임시 파일 이름은 쓰는 쪽마다 달라서 같은 키를 동시에 받아도 서로 덮어쓰지 않음)
+class SpeechCache:
+    # 초기화 (기존 파일을 훑어서 사용 순서 목록을 만듦)
+    def __init__(self, directory: str | Path = DEFAULT_CACHE_DIR, max_bytes: int = 500 * 1024 * 1024):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.entries: OrderedDict[str, tuple[Path, int]] = OrderedDict()  # 키 -> (경로, 크기), 오래된 순
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.bytes_served = 0  # 캐시에서 내보낸 바이트 수
+        files = []
+        if self.directory.exists():
+            for path in self.directory.glob("*/*"):
+                if path.suffix != ".part":
+                    stat = path.stat()
+                    files.append((stat.st_mtime, path, stat.st_size))
+        for _, path, size in sorted(files):
+            self.entries[path.stem] = (path, size)
+            self.total_bytes += size
+
+    # 키 만들기
+    @staticmethod
+    def key(model: str, voice: str, instructions: str | None, text: str, response_format: str) -> str:
+        payload = json.dumps(
+            [model, voice, instructions or "", text, response_format], ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    # 키에 해당하는 파일 경로
+    def path(self, key: str, response_format: str) -> Path:
+        return self.directory / key[:2] / f"{key}.{response_format}"
+
+    # 조회 (적중하면 파일 전체를 읽기 전용으로 매핑한 mmap, 없으면 None)
+    # 슬라이스하면 그 부분만 bytes로 복사되므로 조각씩 읽으면 전체를 복사하지 않음
+    def open(self, key: str) -> mmap.mmap | None:
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        path, size = entry
+        try:
+            with open(path, "rb") as f:
+                mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            os.utime(path)
+        except (FileNotFoundError, ValueError):  # 다른 프로세스가 지운 경우, 빈 파일
+            self.forget(key)
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        self.bytes_served += size
+        return mapping
+
+    # 받은 음성을 내보내면서 캐시에 저장 (중간에 끊기면 저장하지 않음)
+    async def tee(self, key: str, response_format: str, stream: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+        path = self.path(key, response_format)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        f = tempfile.NamedTemporaryFile(dir=path.parent, prefix=f"{path.name}.", suffix=".part", delete=False)
+        part = Path(f.name)
+        size = 0
+        try:
+            with f:
+                async for data in stream:
+                    f.write(data)
+                    size += len(data)
+                    yield data
+            os.replace(part, path)
+        finally:
+            if part.exists():
+                part.unlink()
+        self.add(key, path, size)
+
+    # 등록 (한도를 넘으면 오래된 파일부터 삭제)
+    def add(self, key: str, path: Path, size: int) -> None:
+        self.forget(key)
+        self.entries[key] = (path, size)
+        self.total_bytes += size
+        while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+            old_key, (old_path, _) = next(iter(self.entries.items()))
+            self.forget(old_key)
+            try:
+                old_path.unlink(missing_ok=True)
+            except OSError:  # Windows에서 아직 열려 있는 파일
+                pass
+
+    # 목록에서 제거
+    def forget(self, key: str) -> None:
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.total_bytes -= entry[1]
+
+    # 요약
+    def summary(self) -> str:
+        return (
+            f"hits={self.hits} misses={self.misses} served={self.bytes_served / 1024:.0f}KB "
+            f"size={self.total_bytes / 1024 / 1024:.1f}MB/{self.max_bytes / 1024 / 1024:.0f}MB"
+        )
@@ -1,21 +1,51 @@
 import asyncio
+import mmap
+from collections.abc import AsyncIterator
+import numpy as np
 from openai import AsyncOpenAI
 from openai.helpers import LocalAudioPlayer
+from speech_cache import SpeechCache
 
 # 클라이언트 준비
 openai = AsyncOpenAI()
 
+# 합성 음성 캐시 (같은 모델·목소리·말투·텍스트면 API를 다시 호출하지 않음)
+cache = SpeechCache()
+
+# 캐시에 있는 음성을 조각씩 내보내기 (전체를 복사·변환하지 않고 첫 조각부터 바로 재생, 4800바이트 = 0.1초)
+async def read_cached(mapping: mmap.mmap, chunk_bytes: int = 4800) -> AsyncIterator[np.ndarray]:
+    end = len(mapping) - len(mapping) % 2
+    for start in range(0, end, chunk_bytes):
+        yield np.frombuffer(mapping[start : min(start + chunk_bytes, end)], dtype=np.int16)
+
 # 메인 함수 정의
 async def main():
+    model = "gpt-4o-mini-tts"
+    voice = "alloy"
+    text = "나는 고양이로소이다. 이름은 아직 없다."
+    instructions = "밝고 긍정적인 어조로 말하세요."
+
+    # 캐시에 있으면 디스크에서 조각씩 읽으면서 재생
+    key = cache.key(model, voice, instructions, text, "pcm")
+    mapping = cache.open(key)
+    if mapping is not None:
+        with mapping:
+            await LocalAudioPlayer().play_stream(read_cached(mapping))
+        return
+
     async with openai.audio.speech.with_streaming_response.create(
-        model="gpt-4o-mini-tts",
-        voice="alloy",
-        input="나는 고양이로소이다. 이름은 아직 없다.",
-        instructions="밝고 긍정적인 어조로 말하세요.",
+        model=model,
+        voice=voice,
+        input=text,
+        instructions=instructions,
         response_format="pcm",
     ) as response:
-        await LocalAudioPlayer().play(response)
+        # 받으면서 캐시에 저장
+        pcm = bytearray()
+        async for chunk in cache.tee(key, "pcm", response.iter_bytes(1024)):
+            pcm += chunk
+        await LocalAudioPlayer().play(np.frombuffer(pcm, dtype=np.int16))
 
 # 메인 함수 실행
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    asyncio.run(main())
@@ -1,9 +1,21 @@
+import argparse
 import asyncio
 import websockets
 import pyaudio
 import base64
 import json
 import os
+import sys
+from collections.abc import Callable
+from pathlib import Path
+
+# 공통 모듈 경로 추가
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from audio_playback import AudioPlayer
+from audio_uplink import AudioUplink
+from event_dispatcher import EventDispatcher
+from session_supervisor import SessionSupervisor
+from vad import VoiceActivityDetector, gate_turn_detection
 
 # OpenAI API 키 가져오기 (환경 변수에서)
 API_KEY = os.environ.get("OPENAI_API_KEY")
@@ -15,122 +27,163 @@ HEADERS = {
     "OpenAI-Beta": "realtime=v1"
 }
 
+# commit 모드에서 발화가 끝날 때 보내는 이벤트 (음성 버퍼 확정 후 응답 요청)
+COMMIT_EVENTS = [{"type": "input_audio_buffer.commit"}, {"type": "response.create"}]
+
+# 연결이 끊겼을 때 보관하는 음성 길이(초)
+RESUME_SECONDS = 30.0
+
 # 음성 데이터를 Base64에서 PCM16으로 변환
 def base64_to_pcm16(base64_audio: str) -> bytes:
     return base64.b64decode(base64_audio)
 
-# 음성 입력 태스크
-async def send_audio(websocket, stream, chunk_size: int):
-     # 마이크에서 음성을 읽어오는 함수
-    def read_audio_block():
-        try:
-            return stream.read(chunk_size, exception_on_overflow=False)
-        except Exception as e:
-            print(e)
-            return None
-
-    # 음성 입력 태스크 루프
-    while True:
-        # 마이크에서 음성 읽기
-        audio_data = await asyncio.get_event_loop().run_in_executor(None, read_audio_block)
-        if audio_data is None:
-            continue
-
-        # 음성 데이터를 PCM16에서 Base64로 변환
-        base64_audio = base64.b64encode(audio_data).decode("utf-8")
-
-        # 송신용 이벤트 데이터 생성
-        audio_event = {
-            "type": "input_audio_buffer.append",
-            "audio": base64_audio
-        }
-
-        # 서버에 WebSocket 메시지로 전송
-        await websocket.send(json.dumps(audio_event))
-        await asyncio.sleep(0)
-
-# 음성 출력 태스크
-async def receive_audio(websocket, output_stream):
-    loop = asyncio.get_event_loop()
-
-    # 음성 출력 태스크 루프
-    while True:
-        # 서버로부터 WebSocket 메시지 수신
-        response = await websocket.recv()
-        response_data = json.loads(response)
-
-        # 텍스트 표시
-        if response_data.get("type") == "response.audio_transcript.delta":
-            print(response_data.get("delta", ""), end="", flush=True)
-        elif response_data.get("type") == "response.audio_transcript.done":
-            print("\nAssistant: ", end="", flush=True)
-
-        # 음성 재생
-        if response_data.get("type") == "response.audio.delta":
-            base64_audio_response = response_data.get("delta")
-            if base64_audio_response:
-                pcm16_audio = base64_to_pcm16(base64_audio_response)
-                await loop.run_in_executor(None, output_stream.write, pcm16_audio)
+# 업링크 (전용 캡처 스레드가 링 버퍼에 쓰고, send_interval마다 모인 음성을 이벤트 하나로 전송)
+# vad_mode: "off"=모두 전송, "gate"=묵음은 전송하지 않음, "commit"=묵음 생략 + 발화가 끝나면 커밋
+# 연결이 끊겨도 RESUME_SECONDS까지는 캡처한 음성과 커밋되지 않은 음성을 보관했다가 다시 보냄
+# on_speech_start: 클라이언트 VAD가 발화 시작을 검출하면 호출 (commit 모드는 서버가 speech_started를 보내지 않음)
+def make_uplink(
+    stream, chunk_size: int, send_interval: float = 0.1, vad_mode: str = "off",
+    on_speech_start: Callable[[], None] | None = None,
+) -> AudioUplink:
+    return AudioUplink(
+        stream,
+        chunk_size,
+        send_interval=send_interval,
+        buffer_seconds=RESUME_SECONDS,
+        vad=VoiceActivityDetector() if vad_mode != "off" else None,
+        commit_events=COMMIT_EVENTS if vad_mode == "commit" else None,
+        retain_seconds=RESUME_SECONDS,
+        on_speech_start=on_speech_start,
+    )
+
+# 수신 이벤트 디스패처 (다시 연결해도 같은 디스패처를 계속 사용)
+# 받은 음성은 재생기의 버퍼에 넣기만 하고, 재생은 전용 스레드가 담당 (수신 루프가 재생을 기다리지 않음)
+# 음성 델타는 빠른 경로로 처리 (큰 Base64 문자열을 JSON 파서에 넣지 않음)
+def make_dispatcher(player: AudioPlayer) -> EventDispatcher:
+    dispatcher = EventDispatcher()
+
+    # 텍스트 표시
+    @dispatcher.on("response.audio_transcript.delta")
+    def on_transcript_delta(event: dict) -> None:
+        print(event.get("delta", ""), end="", flush=True)
+
+    @dispatcher.on("response.audio_transcript.done")
+    def on_transcript_done(event: dict) -> None:
+        print("\nAssistant: ", end="", flush=True)
+
+    # 음성 재생
+    @dispatcher.on("response.audio.delta", fast=True)
+    def on_audio_delta(event: dict) -> None:
+        if event.get("delta"):
+            player.write(base64_to_pcm16(event["delta"]))
+
+    @dispatcher.on("response.audio.done")
+    def on_audio_done(event: dict) -> None:
+        player.end()
+
+    # 사용자가 말하기 시작하면 재생 중인 응답을 즉시 중단
+    @dispatcher.on("input_audio_buffer.speech_started")
+    def on_speech_started(event: dict) -> None:
+        player.flush()
+
+    return dispatcher
 
 # 메인 함수 정의
-async def main():
-    # WebSocket 연결
-    async with websockets.connect(WS_URL, additional_headers=HEADERS) as websocket:
-        # 초기 요청 전송
-        init_request = {
-            "type": "response.create",
-            "response": {
-                "modalities": ["audio", "text"],
-                "instructions": "당신은 우수한 AI 어시스턴트입니다.",
-                "voice": "alloy"
-            }
-        }
-        await websocket.send(json.dumps(init_request))
-
-        # PyAudio 설정
-        CHUNK = 2048              # 청크 크기
-        FORMAT = pyaudio.paInt16  # PCM16 형식
-        CHANNELS = 1              # 모노
-        RATE = 24000              # 샘플링 레이트 (24kHz)
-
-        # PyAudio 인스턴스 준비
-        p = pyaudio.PyAudio()
-
-        # 입력 스트림 초기화
-        input_stream = p.open(
-            format=FORMAT,
-            channels=CHANNELS,
-            rate=RATE,
-            input=True,
-            frames_per_buffer=CHUNK
-        )
-
-        # 출력 스트림 초기화
-        output_stream = p.open(
-            format=FORMAT,
-            channels=CHANNELS,
-            rate=RATE,
-            output=True,
-            frames_per_buffer=CHUNK
-        )
-
-        try:
-            # 음성 송신 태스크와 음성 수신 태스크를 병렬 실행
-            print("실시간 대화를 시작합니다.")
-            send_task = asyncio.create_task(send_audio(websocket, input_stream, CHUNK))
-            receive_task = asyncio.create_task(receive_audio(websocket, output_stream))
-            await asyncio.gather(send_task, receive_task)
-        except KeyboardInterrupt:
-            print("종료합니다.")
-        finally:
-            # 후처리
-            if input_stream.is_active():
-                input_stream.stop_stream()
-            input_stream.close()
-            output_stream.stop_stream()
-            output_stream.close()
-            p.terminate()
+async def main(vad_mode: str = "off"):
+    # 세션 설정 (처음 연결하면 응답 요청으로, 다시 연결하면 세션 설정으로 보냄)
+    session_config = {
+        "modalities": ["audio", "text"],
+        "instructions": "당신은 우수한 AI 어시스턴트입니다.",
+        "voice": "alloy"
+    }
+
+    # 연결할 때마다 초기 요청 전송
+    async def configure(websocket, reconnect: bool) -> None:
+        if reconnect:
+            # 끊기기 전 응답의 남은 음성은 그대로 재생하고 끝냄 (인사를 다시 요청하지 않음)
+            player.end()
+            session = dict(session_config)
+        else:
+            init_request = {"type": "response.create", "response": session_config}
+            await websocket.send(json.dumps(init_request))
+            session = {}
+
+        # commit 모드에서는 서버 측 발화 검출을 끄고 클라이언트가 직접 커밋
+        # gate 모드에서는 서버의 묵음 길이를 클라이언트가 보내는 묵음(hangover)보다 짧게 지정
+        if vad_mode == "commit":
+            session["turn_detection"] = None
+        elif vad_mode == "gate":
+            session["turn_detection"] = gate_turn_detection(uplink.vad)
+        if session:
+            await websocket.send(json.dumps({"type": "session.update", "session": session}))
+
+    # PyAudio 설정
+    CHUNK = 2048              # 청크 크기
+    FORMAT = pyaudio.paInt16  # PCM16 형식
+    CHANNELS = 1              # 모노
+    RATE = 24000              # 샘플링 레이트 (24kHz)
+    SEND_INTERVAL = 0.1       # 음성 송신 간격(초)
+
+    # PyAudio 인스턴스 준비
+    p = pyaudio.PyAudio()
+
+    # 입력 스트림 초기화
+    input_stream = p.open(
+        format=FORMAT,
+        channels=CHANNELS,
+        rate=RATE,
+        input=True,
+        frames_per_buffer=CHUNK
+    )
+
+    # 출력 스트림 초기화
+    output_stream = p.open(
+        format=FORMAT,
+        channels=CHANNELS,
+        rate=RATE,
+        output=True,
+        frames_per_buffer=CHUNK
+    )
+
+    # 재생기 (지터 버퍼 + 재생 스레드)
+    player = AudioPlayer(output_stream, RATE)
+    player.start()
+
+    # 세션 감시자 (연결이 끊기면 다시 연결하고 송수신을 이어 감)
+    # 클라이언트 VAD가 발화 시작을 검출해도 재생 중인 응답을 즉시 중단
+    dispatcher = make_dispatcher(player)
+    uplink = make_uplink(input_stream, CHUNK, SEND_INTERVAL, vad_mode, on_speech_start=player.flush)
+    supervisor = SessionSupervisor(
+        lambda: websockets.connect(WS_URL, additional_headers=HEADERS), configure, uplink, dispatcher
+    )
+
+    try:
+        # 음성 송신과 음성 수신을 병렬 실행
+        print("실시간 대화를 시작합니다.")
+        await supervisor.run()
+    except KeyboardInterrupt:
+        print("종료합니다.")
+    finally:
+        # 후처리
+        player.stop()
+        print(f"\n재생: {player.summary()}")
+        print(f"수신 이벤트: {dispatcher.summary()}")
+        print(f"연결: {supervisor.summary()}")
+        if input_stream.is_active():
+            input_stream.stop_stream()
+        input_stream.close()
+        output_stream.stop_stream()
+        output_stream.close()
+        p.terminate()
 
 # 메인 함수 실행
 if __name__ == "__main__":
-    asyncio.run(main())
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--vad",
+        choices=["off", "gate", "commit"],
+        default="off",
+        help="음성 구간 검출 (off: 모두 전송, gate: 묵음 생략, commit: 묵음 생략 후 발화마다 커밋)",
+    )
+    args = parser.parse_args()
+    asyncio.run(main(args.vad))
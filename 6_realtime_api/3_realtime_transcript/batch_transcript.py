@@ -0,0 +1,149 @@
+import argparse
+import asyncio
+import json
+import time
+from pathlib import Path
+import websockets
+from realtime_transcript import HEADERS, WS_URL, send_audio
+from audio_source import FileAudioSource
+from vad import VoiceActivityDetector, gate_turn_detection
+
+# 변환 대상 확장자
+AUDIO_SUFFIXES = (".wav", ".pcm", ".raw")
+
+# 파일 하나 텍스트 변환 (세션 하나를 열어 파일을 보내고, 마지막 커밋의 변환 결과까지 받은 뒤 종료)
+async def transcribe_file(
+    path: Path, url: str = WS_URL, speed: float | None = None, vad_mode: str = "off",
+    model: str = "gpt-4o-transcribe", timeout: float = 60.0,
+) -> dict:
+    committed: list[str] = []  # 커밋된 아이템 ID (순서대로)
+    completed: dict[str, str] = {}  # 아이템 ID -> 변환 결과
+    errors: list[str] = []
+    final_commit_sent = False
+    final_commit_acked = False
+    speech_stopped = False  # 서버 측 발화 검출이 발화 끝을 알렸고 아직 그 커밋이 오지 않음
+
+    source = FileAudioSource(path, speed=speed)
+    start = time.perf_counter()
+    async with websockets.connect(url, additional_headers=HEADERS, max_size=None) as websocket:
+        session = {"input_audio_transcription": {"model": model}}
+        if vad_mode == "commit":
+            session["turn_detection"] = None
+        elif vad_mode == "gate":
+            session["turn_detection"] = gate_turn_detection(VoiceActivityDetector())
+        await websocket.send(json.dumps({"type": "transcription_session.update", "session": session}))
+
+        # 수신 루프 (마지막 커밋에 대한 응답을 받았고 모든 아이템의 변환이 끝나면 종료)
+        async def receive() -> None:
+            nonlocal final_commit_acked, speech_stopped
+            async for message in websocket:
+                event = json.loads(message)
+                event_type = event.get("type")
+                if event_type == "input_audio_buffer.speech_stopped":
+                    speech_stopped = True
+                elif event_type == "input_audio_buffer.committed":
+                    committed.append(event["item_id"])
+                    # speech_stopped 뒤에 온 커밋은 서버 측 발화 검출의 커밋이므로 마지막 커밋의 응답으로 보지 않음
+                    if final_commit_sent and not speech_stopped:
+                        final_commit_acked = True
+                    speech_stopped = False
+                elif event_type == "conversation.item.input_audio_transcription.completed":
+                    completed[event["item_id"]] = event.get("transcript", "")
+                elif event_type == "error":
+                    # 남은 음성이 없을 때의 마지막 커밋 오류는 정상 종료로 처리
+                    if final_commit_sent:
+                        final_commit_acked = True
+                    else:
+                        errors.append(event.get("error", {}).get("message", ""))
+                if final_commit_acked and all(item in completed for item in committed):
+                    return
+
+        receive_task = asyncio.create_task(receive())
+        try:
+            uplink = await send_audio(websocket, source, 2048, vad_mode=vad_mode, lossless=True)
+            sent_at = time.perf_counter()
+            final_commit_sent = True
+            await websocket.send(json.dumps({"type": "input_audio_buffer.commit"}))
+            await asyncio.wait_for(receive_task, timeout)
+        finally:
+            receive_task.cancel()
+            source.close()
+
+    elapsed = time.perf_counter() - start
+    return {
+        "file": str(path),
+        "seconds": round(source.duration, 3),
+        "elapsed": round(elapsed, 3),
+        "upload": round(sent_at - start, 3),
+        "speedup": round(source.duration / elapsed, 2) if elapsed else None,
+        "audio_bytes_sent": uplink.bytes_sent,
+        "segments": [completed.get(item, "") for item in committed],
+        "text": " ".join(completed[item].strip() for item in committed if completed.get(item)),
+        "errors": errors,
+    }
+
+# 이미 변환한 파일 (출력 파일이 있으면 이어서 진행)
+def load_done(path: Path) -> set[str]:
+    if not path.exists():
+        return set()
+    done = set()
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                if not record.get("error"):
+                    done.add(record["file"])
+    return done
+
+# 배치 실행 (concurrency개 세션을 동시에 열고 끝난 순서대로 JSONL에 기록)
+async def run_batch(args: argparse.Namespace) -> None:
+    files = sorted(
+        path for path in Path(args.directory).rglob("*") if path.suffix.lower() in AUDIO_SUFFIXES
+    )
+    output = Path(args.output)
+    done = load_done(output)
+    todo = [path for path in files if str(path) not in done]
+    print(f"{len(files)}개 파일 중 {len(todo)}개 변환 ({len(files) - len(todo)}개는 이미 완료)")
+
+    semaphore = asyncio.Semaphore(args.concurrency)
+    total_audio = 0.0
+    start = time.perf_counter()
+
+    # 파일 하나 처리
+    async def worker(path: Path) -> dict:
+        async with semaphore:
+            with FileAudioSource(path) as source:
+                duration = source.duration
+            timeout = duration / (args.speed or 50) + args.timeout
+            try:
+                return await transcribe_file(path, args.url, args.speed, args.vad, args.model, timeout)
+            except Exception as e:
+                return {"file": str(path), "error": repr(e)}
+
+    with open(output, "a", encoding="utf-8") as f:
+        for next_done in asyncio.as_completed([worker(path) for path in todo]):
+            record = await next_done
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            f.flush()
+            if "error" in record:
+                print(f"실패: {record['file']} {record['error']}")
+                continue
+            total_audio += record["seconds"]
+            print(f"완료: {record['file']} ({record['seconds']:.1f}s 음성, {record['elapsed']:.1f}s 소요)")
+
+    elapsed = time.perf_counter() - start
+    if elapsed and total_audio:
+        print(f"음성 {total_audio:.1f}s를 {elapsed:.1f}s에 변환 (실시간 대비 {total_audio / elapsed:.1f}배)")
+
+# main 실행
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("directory", help="음성 파일 디렉터리 (WAV 또는 24kHz 모노 raw PCM16)")
+    parser.add_argument("-o", "--output", default="transcripts.jsonl", help="출력 JSONL 파일")
+    parser.add_argument("--concurrency", type=int, default=4, help="동시 세션 수")
+    parser.add_argument("--speed", type=float, help="파일당 송신 배속 (지정하지 않으면 흐름 제어만으로 최대 속도)")
+    parser.add_argument("--vad", choices=["off", "gate", "commit"], default="off", help="음성 구간 검출 모드")
+    parser.add_argument("--model", default="gpt-4o-transcribe", help="텍스트 변환 모델")
+    parser.add_argument("--url", default=WS_URL, help="WebSocket URL (대역 서버 테스트용)")
+    parser.add_argument("--timeout", type=float, default=60.0, help="송신 후 결과 대기 시간(초)")
+    asyncio.run(run_batch(parser.parse_args()))
@@ -1,9 +1,20 @@
+import argparse
 import asyncio
 import websockets
-import pyaudio
 import base64
 import json
 import os
+import sys
+from collections.abc import Callable
+from pathlib import Path
+
+# 공통 모듈 경로 추가
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from audio_source import FileAudioSource
+from audio_uplink import AudioUplink
+from event_dispatcher import EventDispatcher
+from session_supervisor import SessionSupervisor
+from vad import VoiceActivityDetector, gate_turn_detection
 
 # OpenAI API 키 가져오기 (환경 변수에서)
 API_KEY = os.environ.get("OPENAI_API_KEY")
@@ -15,102 +26,204 @@ HEADERS = {
     "OpenAI-Beta": "realtime=v1"
 }
 
+# commit 모드에서 발화가 끝날 때 보내는 이벤트 (음성 버퍼 확정)
+COMMIT_EVENTS = [{"type": "input_audio_buffer.commit"}]
+
+# 연결이 끊겼을 때 보관하는 음성 길이(초)
+RESUME_SECONDS = 30.0
+
 # 음성 데이터를 Base64에서 PCM16으로 변환
 def base64_to_pcm16(base64_audio: str) -> bytes:
     return base64.b64decode(base64_audio)
 
-# 음성 입력 태스크
-async def send_audio(websocket, stream, chunk_size: int):
-     # 마이크에서 음성을 읽어오는 함수
-    def read_audio_block():
-        try:
-            return stream.read(chunk_size, exception_on_overflow=False)
-        except Exception as e:
-            print(e)
-            return None
-
-    # 음성 입력 태스크 루프
-    while True:
-        # 마이크에서 음성 읽기
-        audio_data = await asyncio.get_event_loop().run_in_executor(None, read_audio_block)
-        if audio_data is None:
-            continue
-
-        # 음성 데이터를 PCM16에서 Base64로 변환
-        base64_audio = base64.b64encode(audio_data).decode("utf-8")
-
-        # 송신용 이벤트 데이터 생성
-        audio_event = {
-            "type": "input_audio_buffer.append",
-            "audio": base64_audio
-        }
-
-        # 서버에 WebSocket 메시지로 전송
-        await websocket.send(json.dumps(audio_event))
-        await asyncio.sleep(0)
-
-# 텍스트 변환 출력 태스크
-async def receive_transcript(websocket):
-    # 출력 태스크 루프
-    while True:
-        # 서버로부터 WebSocket 메시지 수신
-        response = await websocket.recv()
-        response_data = json.loads(response)
-
-        # 텍스트 변환 결과 표시
-        if response_data.get("type") == "conversation.item.input_audio_transcription.delta":
-            print(response_data.get("delta", ""), end="", flush=True)
-        elif response_data.get("type") == "conversation.item.input_audio_transcription.completed":
-            print("\nUser: ", end="", flush=True)
+# 업링크 (전용 캡처 스레드가 링 버퍼에 쓰고, send_interval마다 모인 음성을 이벤트 하나로 전송)
+# vad_mode: "off"=모두 전송, "gate"=묵음은 전송하지 않음, "commit"=묵음 생략 + 발화가 끝나면 커밋
+# lossless: 파일처럼 실시간보다 빨리 읽히는 소스는 버리지 않고 송신 속도에 맞춰 읽음
+# retain_seconds: 연결이 끊겼을 때 다시 보내려고 보관하는 커밋되지 않은 음성 길이(초)
+def make_uplink(
+    stream, chunk_size: int, send_interval: float = 0.1, vad_mode: str = "off",
+    lossless: bool = False, retain_seconds: float = 0.0,
+) -> AudioUplink:
+    return AudioUplink(
+        stream,
+        chunk_size,
+        send_interval=send_interval,
+        buffer_seconds=max(5.0, retain_seconds),
+        vad=VoiceActivityDetector() if vad_mode != "off" else None,
+        commit_events=COMMIT_EVENTS if vad_mode == "commit" else None,
+        lossless=lossless,
+        retain_seconds=retain_seconds,
+    )
+
+# 음성 입력 태스크 (연결 하나로 끝까지 보내고 업링크 반환)
+async def send_audio(
+    websocket, stream, chunk_size: int, send_interval: float = 0.1, vad_mode: str = "off",
+    lossless: bool = False,
+):
+    uplink = make_uplink(stream, chunk_size, send_interval, vad_mode, lossless)
+    await uplink.run(websocket)
+    return uplink
+
+# 텍스트 변환 수신 이벤트 디스패처 (다시 연결해도 같은 디스패처를 계속 사용)
+# on_done: 아이템 하나의 변환이 끝나거나 실패하면 이벤트와 함께 호출
+def make_dispatcher(on_done: Callable[[dict], None] | None = None) -> EventDispatcher:
+    dispatcher = EventDispatcher()
+
+    # 텍스트 변환 결과 표시
+    @dispatcher.on("conversation.item.input_audio_transcription.delta")
+    def on_transcription_delta(event: dict) -> None:
+        print(event.get("delta", ""), end="", flush=True)
+
+    @dispatcher.on("conversation.item.input_audio_transcription.completed")
+    def on_transcription_completed(event: dict) -> None:
+        print("\nUser: ", end="", flush=True)
+        if on_done is not None:
+            on_done(event)
+
+    @dispatcher.on("conversation.item.input_audio_transcription.failed")
+    def on_transcription_failed(event: dict) -> None:
+        dispatcher.handle_error(event)
+        if on_done is not None:
+            on_done(event)
+
+    return dispatcher
 
 # 메인 함수 정의
-async def main():
-    # WebSocket 연결
-    async with websockets.connect(WS_URL, additional_headers=HEADERS) as websocket:
-        # 초기 요청 전송
-        initial_request = {
-            "type": "transcription_session.update",
-            "session": {
-                "input_audio_transcription": {
-                    "model": "gpt-4o-transcribe",
-                }
-            }
-        }
-        await websocket.send(json.dumps(initial_request))
-
-        # PyAudio 설정
-        CHUNK = 2048              # 청크 크기
-        FORMAT = pyaudio.paInt16  # PCM16 형식
-        CHANNELS = 1              # 모노
-        RATE = 24000              # 샘플링 레이트 (24kHz)
+# file을 지정하면 마이크 대신 파일(WAV 또는 raw PCM16)에서 읽음 (speed: 실시간 대비 배속, None이면 제한 없음)
+async def main(vad_mode: str = "off", file: str | None = None, speed: float | None = None):
+    # 음성 설정
+    CHUNK = 2048              # 청크 크기
+    CHANNELS = 1              # 모노
+    RATE = 24000              # 샘플링 레이트 (24kHz)
+    SEND_INTERVAL = 0.1       # 음성 송신 간격(초)
+
+    # 입력 스트림 초기화 (파일 또는 마이크)
+    p = None
+    if file:
+        input_stream = FileAudioSource(file, RATE, speed)
+    else:
+        import pyaudio
 
         # PyAudio 인스턴스 준비
         p = pyaudio.PyAudio()
-
-        # 입력 스트림 초기화
         input_stream = p.open(
-            format=FORMAT,
+            format=pyaudio.paInt16,  # PCM16 형식
             channels=CHANNELS,
             rate=RATE,
             input=True,
             frames_per_buffer=CHUNK
         )
 
-        try:
-            # 음성 송신 태스크와 텍스트 변환 수신 태스크를 병렬 실행
-            print("실시간 텍스트 변환을 시작합니다.")
-            send_task = asyncio.create_task(send_audio(websocket, input_stream, CHUNK))
-            receive_task = asyncio.create_task(receive_transcript(websocket))
-            await asyncio.gather(send_task, receive_task)
-        except KeyboardInterrupt:
-            print("종료합니다.")
-        finally:
-            # 후처리
-            if input_stream.is_active():
-                input_stream.stop_stream()
-            input_stream.close()
+    uplink = make_uplink(
+        input_stream, CHUNK, SEND_INTERVAL, vad_mode, lossless=bool(file), retain_seconds=RESUME_SECONDS
+    )
+
+    # 초기 요청 (연결할 때마다 다시 보냄)
+    initial_request = {
+        "type": "transcription_session.update",
+        "session": {
+            "input_audio_transcription": {
+                "model": "gpt-4o-transcribe",
+            }
+        }
+    }
+    # commit 모드에서는 서버 측 발화 검출을 끄고 클라이언트가 직접 커밋
+    # gate 모드에서는 서버의 묵음 길이를 클라이언트가 보내는 묵음(hangover)보다 짧게 지정
+    if vad_mode == "commit":
+        initial_request["session"]["turn_detection"] = None
+    elif vad_mode == "gate":
+        initial_request["session"]["turn_detection"] = gate_turn_detection(uplink.vad)
+
+    # 현재 연결에서 커밋됐지만 변환 결과를 아직 받지 못한 아이템 (끊기면 결과도 사라지므로 연결마다 새로 셈)
+    pending: set[str] = set()
+    progress = asyncio.Event()  # 커밋 응답이나 변환 결과를 받을 때마다 설정
+    final_commit_sent = False
+
+    # 초기 요청 전송
+    async def configure(websocket, reconnect: bool) -> None:
+        nonlocal final_commit_sent
+        pending.clear()
+        final_commit_sent = False
+        await websocket.send(json.dumps(initial_request))
+
+    # 입력이 끝나면 마지막 발화 뒤의 남은 음성을 커밋하고, 모든 아이템의 변환 결과를 받을 때까지 대기
+    # (batch_transcript와 같은 방식)
+    async def finish(websocket) -> None:
+        nonlocal final_commit_sent
+        if uplink.uncommitted_bytes:
+            final_commit_sent = True
+            progress.clear()
+            await websocket.send(json.dumps({"type": "input_audio_buffer.commit"}))
+            while final_commit_sent:
+                await progress.wait()
+                progress.clear()
+            uplink.mark_committed()
+        while pending:
+            await progress.wait()
+            progress.clear()
+
+    # 변환이 끝나거나 실패한 아이템
+    def on_done(event: dict) -> None:
+        pending.discard(event.get("item_id"))
+        progress.set()
+
+    # 세션 감시자 (연결이 끊기면 다시 연결하고 송수신을 이어 감, 파일 입력이면 결과를 모두 받고 종료)
+    dispatcher = make_dispatcher(on_done)
+    supervisor = SessionSupervisor(
+        lambda: websockets.connect(WS_URL, additional_headers=HEADERS),
+        configure,
+        uplink,
+        dispatcher,
+        finish=finish,
+    )
+
+    # 커밋된 아이템 기록 (발화 끝 위치 처리는 감시자에 맡김)
+    # speech_stopped 뒤에 온 커밋은 서버 측 발화 검출의 커밋이므로 마지막 커밋의 응답으로 보지 않음
+    @dispatcher.on("input_audio_buffer.committed")
+    def on_committed(event: dict) -> None:
+        nonlocal final_commit_sent
+        if supervisor.speech_end is None:
+            final_commit_sent = False
+        supervisor.handle_committed(event)
+        pending.add(event["item_id"])
+        progress.set()
+
+    # 남은 음성이 너무 짧을 때의 마지막 커밋 오류는 정상 종료로 처리
+    @dispatcher.on("error")
+    def on_error(event: dict) -> None:
+        nonlocal final_commit_sent
+        if final_commit_sent:
+            final_commit_sent = False
+            progress.set()
+        else:
+            dispatcher.handle_error(event)
+
+    try:
+        # 음성 송신과 텍스트 변환 수신을 병렬 실행
+        print("실시간 텍스트 변환을 시작합니다.")
+        await supervisor.run()
+    except KeyboardInterrupt:
+        print("종료합니다.")
+    finally:
+        # 후처리
+        print(f"\n수신 이벤트: {dispatcher.summary()}")
+        print(f"연결: {supervisor.summary()}")
+        if input_stream.is_active():
+            input_stream.stop_stream()
+        input_stream.close()
+        if p is not None:
             p.terminate()
 
 # 메인 함수 실행
 if __name__ == "__main__":
-    asyncio.run(main())
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--vad",
+        choices=["off", "gate", "commit"],
+        default="off",
+        help="음성 구간 검출 (off: 모두 전송, gate: 묵음 생략, commit: 묵음 생략 후 발화마다 커밋)",
+    )
+    parser.add_argument("--file", help="마이크 대신 읽을 음성 파일 (WAV 또는 24kHz 모노 raw PCM16)")
+    parser.add_argument("--speed", type=float, help="파일 재생 배속 (지정하지 않으면 제한 없음)")
+    args = parser.parse_args()
+    asyncio.run(main(args.vad, args.file, args.speed))
@@ -0,0 +1,104 @@
+import threading
+from audio_uplink import RingBuffer
+
+# 음성 재생기 (지터 버퍼 + 전용 재생 스레드)
+# - 수신 루프는 write로 링 버퍼에 넣기만 하고 바로 돌아감 (재생이 끝날 때까지 기다리지 않음)
+# - 재생 스레드는 prebuffer_ms만큼 모인 뒤 재생을 시작해 네트워크 지연의 흔들림을 흡수
+# - 응답 도중 버퍼가 비면 underruns, 버퍼가 넘쳐 오래된 음성을 버리면 overrun_bytes에 기록
+# - flush로 남은 음성을 즉시 버림 (사용자가 말을 끊었을 때)
+#   재생 상태와 버퍼 읽기는 lock으로 보호 (출력 장치에 쓰는 동안에는 잡지 않으므로 flush가 재생을 기다리지 않음)
+class AudioPlayer:
+    # 초기화
+    def __init__(
+        self,
+        output_stream,
+        sample_rate: int = 24000,
+        sample_width: int = 2,
+        chunk_frames: int = 1024,
+        prebuffer_ms: int = 100,
+        buffer_seconds: float = 60.0,
+    ):
+        self.output_stream = output_stream
+        bytes_per_second = sample_rate * sample_width
+        self.ring = RingBuffer(int(bytes_per_second * buffer_seconds) // sample_width * sample_width)
+        self.out = memoryview(bytearray(chunk_frames * sample_width))
+        self.prebuffer_bytes = bytes_per_second * prebuffer_ms // 1000 // sample_width * sample_width
+        self.lock = threading.Lock()
+        self.data_ready = threading.Event()
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self.run, name="audio-playback", daemon=True)
+        self.playing = False
+        self.ended = False  # 응답 음성을 끝까지 받았는지 (이후 버퍼가 비는 것은 언더런이 아님)
+        self.underruns = 0
+        self.flushes = 0
+        self.bytes_played = 0
+
+    # 넘쳐서 버린 바이트 수
+    @property
+    def overrun_bytes(self) -> int:
+        return self.ring.overrun_bytes
+
+    # 재생할 음성 추가 (이벤트 루프에서 호출, 막히지 않음)
+    def write(self, pcm: bytes) -> None:
+        self.ended = False
+        self.ring.write(pcm)
+        self.data_ready.set()
+
+    # 응답 음성 끝 표시 (남은 음성은 prebuffer와 관계없이 재생)
+    def end(self) -> None:
+        self.ended = True
+        self.data_ready.set()
+
+    # 남은 음성 버리기
+    def flush(self) -> None:
+        with self.lock:
+            self.ring.clear()
+            self.playing = False
+            self.flushes += 1
+
+    # 재생 스레드 시작
+    def start(self) -> None:
+        self.thread.start()
+
+    # 재생 스레드 정지
+    def stop(self) -> None:
+        self.stop_event.set()
+        self.data_ready.set()
+        if self.thread.is_alive():
+            self.thread.join(timeout=1.0)
+
+    # 재생 루프
+    def run(self) -> None:
+        while not self.stop_event.is_set():
+            chunk = self._next_chunk()
+            if chunk is None:
+                self.data_ready.wait(0.05)
+                continue
+            if chunk:
+                self.output_stream.write(chunk)
+                self.bytes_played += len(chunk)
+
+    # 다음에 재생할 조각 (prebuffer를 기다리는 중이면 None, 버퍼가 비었으면 b"")
+    def _next_chunk(self) -> bytes | None:
+        with self.lock:
+            if not self.playing:
+                self.data_ready.clear()
+                buffered = len(self.ring)
+                if buffered >= self.prebuffer_bytes or (self.ended and buffered):
+                    self.playing = True
+                else:
+                    return None
+            n = self.ring.read_into(self.out)
+            if n == 0:
+                if not self.ended:
+                    self.underruns += 1
+                self.playing = False
+                return b""
+            return bytes(self.out[:n])
+
+    # 통계 한 줄 요약
+    def summary(self) -> str:
+        return (
+            f"played={self.bytes_played}B underruns={self.underruns} "
+            f"overrun={self.overrun_bytes}B flushes={self.flushes}"
+        )
@@ -0,0 +1,159 @@
+import math
+import mmap
+import struct
+import time
+from pathlib import Path
+import numpy as np
+
+RATE = 24000  # 실시간 API 입력 샘플링 레이트
+
+# WAV 헤더 해석 (채널 수, 샘플링 레이트, 비트 수, data 청크 위치와 크기)
+def parse_wav_header(buffer) -> tuple[int, int, int, int, int]:
+    if buffer[:4] != b"RIFF" or buffer[8:12] != b"WAVE":
+        raise ValueError("WAV 파일이 아닙니다.")
+    position = 12
+    fmt = None
+    while position + 8 <= len(buffer):
+        chunk_id = bytes(buffer[position : position + 4])
+        size = int.from_bytes(buffer[position + 4 : position + 8], "little")
+        if chunk_id == b"fmt ":
+            audio_format, channels, rate, _, _, bits = struct.unpack(
+                "<HHIIHH", buffer[position + 8 : position + 24]
+            )
+            if audio_format not in (1, 0xFFFE):
+                raise ValueError("PCM WAV만 지원합니다.")
+            fmt = (channels, rate, bits)
+        elif chunk_id == b"data":
+            if fmt is None:
+                raise ValueError("fmt 청크가 없습니다.")
+            data_offset = position + 8
+            return (*fmt, data_offset, min(size, len(buffer) - data_offset))
+        position += 8 + size + (size & 1)
+    raise ValueError("data 청크가 없습니다.")
+
+# 스트리밍 리샘플러 (블록 단위로 넣어도 경계가 이어지도록 상태 유지)
+# - 다운샘플링이면 먼저 윈도 sinc 저역 통과 필터로 접힘(에일리어싱) 방지
+# - 선형 보간으로 목표 레이트의 샘플 위치 계산 (np.interp로 블록 전체를 한 번에)
+class Resampler:
+    # 초기화
+    def __init__(self, source_rate: int, target_rate: int = RATE, taps: int = 63):
+        self.step = source_rate / target_rate
+        self.position = 0.0  # 다음 출력 샘플의 위치 (history 시작 기준)
+        self.history = np.zeros(0, dtype=np.float32)
+        self.kernel = None
+        if source_rate > target_rate:
+            cutoff = 0.45 * target_rate / source_rate
+            n = np.arange(taps) - (taps - 1) / 2
+            kernel = 2 * cutoff * np.sinc(2 * cutoff * n) * np.hamming(taps)
+            self.kernel = (kernel / kernel.sum()).astype(np.float32)
+            self.fir_state = np.zeros(taps - 1, dtype=np.float32)
+
+    # 블록 하나 변환 (float32 -> int16)
+    def process(self, block: np.ndarray) -> np.ndarray:
+        block = block.astype(np.float32, copy=False)
+        if self.kernel is not None:
+            extended = np.concatenate([self.fir_state, block])
+            self.fir_state = extended[-(len(self.kernel) - 1) :]
+            block = np.convolve(extended, self.kernel, mode="valid").astype(np.float32)
+        x = np.concatenate([self.history, block]) if len(self.history) else block
+        if len(x) == 0:
+            return np.zeros(0, dtype=np.int16)
+        positions = np.arange(self.position, len(x) - 1, self.step)
+        output = np.interp(positions, np.arange(len(x)), x)
+        next_position = positions[-1] + self.step if len(positions) else self.position
+        self.position = next_position - (len(x) - 1)
+        self.history = x[-1:]
+        return np.clip(np.rint(output), -32768, 32767).astype(np.int16)
+
+# 파일 음성 소스 (PyAudio 입력 스트림과 같은 read 인터페이스)
+# - WAV 또는 raw PCM16 파일을 mmap으로 열고 필요한 부분만 읽음 (큰 파일도 통째로 읽지 않음)
+# - 모노 PCM16 24kHz로 변환해서 반환
+# - speed를 지정하면 실시간의 speed배 속도로, None이면 읽는 대로 바로 반환 (흐름 제어는 받는 쪽에서)
+class FileAudioSource:
+    # 초기화 (raw PCM이면 raw_rate, raw_channels로 형식 지정)
+    def __init__(
+        self,
+        path: str | Path,
+        rate: int = RATE,
+        speed: float | None = None,
+        raw_rate: int = RATE,
+        raw_channels: int = 1,
+    ):
+        self.path = Path(path)
+        self.rate = rate
+        self.speed = speed
+        self.file = open(self.path, "rb")
+        self.mm = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.mm[:4] == b"RIFF":
+            self.channels, self.source_rate, bits, offset, size = parse_wav_header(self.mm)
+            if bits != 16:
+                raise ValueError("16비트 PCM만 지원합니다.")
+        else:
+            self.channels, self.source_rate, offset, size = raw_channels, raw_rate, 0, len(self.mm)
+        self.samples = np.frombuffer(self.mm, dtype="<i2", count=size // 2, offset=offset)
+        self.frames = len(self.samples) // self.channels
+        self.duration = self.frames / self.source_rate
+        self.offset = offset
+        self.passthrough = self.channels == 1 and self.source_rate == rate
+        self.resampler = None if self.source_rate == rate else Resampler(self.source_rate, rate)
+        self.position = 0  # 다음에 읽을 원본 프레임 위치
+        self.pending = bytearray()  # 변환했지만 아직 반환하지 않은 음성
+        self.frames_read = 0  # 반환한 출력 프레임 수
+        self.start_time: float | None = None
+        self.active = True
+
+    # 원본 블록 하나를 변환해서 pending에 추가
+    def _convert(self, source_frames: int) -> None:
+        end = min(self.frames, self.position + source_frames)
+        block = self.samples[self.position * self.channels : end * self.channels]
+        self.position = end
+        if self.channels > 1:
+            block = block.reshape(-1, self.channels).mean(axis=1, dtype=np.float32)
+        if self.resampler is not None:
+            block = self.resampler.process(block)
+        self.pending += block.astype(np.int16, copy=False).tobytes()
+
+    # 읽기 (끝나면 빈 바이트)
+    def read(self, frames: int, exception_on_overflow: bool = True) -> bytes:
+        if self.passthrough:
+            start = self.offset + self.position * 2
+            end = self.offset + min(self.frames, self.position + frames) * 2
+            data = self.mm[start:end]
+            self.position += len(data) // 2
+        else:
+            source_frames = math.ceil(frames * self.source_rate / self.rate) + 1
+            while len(self.pending) < frames * 2 and self.position < self.frames:
+                self._convert(source_frames)
+            data = bytes(self.pending[: frames * 2])
+            del self.pending[: frames * 2]
+
+        # 배속에 맞춰 대기 (누적 시간 기준이라 오차가 쌓이지 않음)
+        if self.speed:
+            now = time.perf_counter()
+            if self.start_time is None:
+                self.start_time = now
+            self.frames_read += len(data) // 2
+            delay = self.start_time + self.frames_read / self.rate / self.speed - now
+            if delay > 0:
+                time.sleep(delay)
+        return data
+
+    def is_active(self) -> bool:
+        return self.active
+
+    def stop_stream(self) -> None:
+        self.active = False
+
+    # 닫기
+    def close(self) -> None:
+        self.active = False
+        self.samples = None
+        self.mm.close()
+        self.file.close()
+
+    # with 문 지원 (블록을 벗어나면 mmap과 파일을 닫음)
+    def __enter__(self) -> "FileAudioSource":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
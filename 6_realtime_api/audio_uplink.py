@@ -0,0 +1,306 @@
+import asyncio
+import binascii
+import json
+import threading
+from collections.abc import Callable
+import numpy as np
+from vad import VoiceActivityDetector
+
+# 링 버퍼 (미리 할당한 bytearray, 캡처 스레드가 쓰고 송신 태스크가 읽음)
+# 가득 차면 가장 오래된 음성부터 버리고 버린 바이트 수를 overrun_bytes에 기록
+# (block=True로 쓰면 버리지 않고 빈 공간이 생길 때까지 대기)
+class RingBuffer:
+    # 초기화
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.buffer = bytearray(capacity)
+        self.view = memoryview(self.buffer)
+        self.read_pos = 0
+        self.size = 0
+        self.overrun_bytes = 0
+        self.lock = threading.Lock()
+        self.space = threading.Condition(self.lock)
+        self.closed = False
+
+    # 쓰기
+    def write(self, data, block: bool = False) -> None:
+        data = memoryview(data)
+        if block and len(data) > self.capacity:
+            for start in range(0, len(data), self.capacity):
+                self.write(data[start : start + self.capacity], block=True)
+            return
+        if len(data) > self.capacity:
+            self.overrun_bytes += len(data) - self.capacity
+            data = data[-self.capacity :]
+        n = len(data)
+        with self.lock:
+            while block and self.capacity - self.size < n:
+                if self.closed:
+                    return
+                self.space.wait(0.1)
+            overflow = self.size + n - self.capacity
+            if overflow > 0:
+                self.read_pos = (self.read_pos + overflow) % self.capacity
+                self.size -= overflow
+                self.overrun_bytes += overflow
+            write_pos = (self.read_pos + self.size) % self.capacity
+            first = min(n, self.capacity - write_pos)
+            self.view[write_pos : write_pos + first] = data[:first]
+            self.view[: n - first] = data[first:]
+            self.size += n
+
+    # out에 최대 len(out)바이트를 복사하고 읽은 바이트 수 반환
+    def read_into(self, out: memoryview) -> int:
+        with self.lock:
+            n = min(self.size, len(out))
+            first = min(n, self.capacity - self.read_pos)
+            out[:first] = self.view[self.read_pos : self.read_pos + first]
+            out[first:n] = self.view[: n - first]
+            self.read_pos = (self.read_pos + n) % self.capacity
+            self.size -= n
+            self.space.notify()
+        return n
+
+    # 모두 버리기
+    def clear(self) -> None:
+        with self.lock:
+            self.read_pos = 0
+            self.size = 0
+            self.space.notify()
+
+    # 닫기 (쓰기 대기 중인 스레드를 깨움)
+    def close(self) -> None:
+        with self.lock:
+            self.closed = True
+            self.space.notify_all()
+
+    # 버퍼에 남은 바이트 수
+    def __len__(self) -> int:
+        return self.size
+
+# input_audio_buffer.append 이벤트 인코더
+# 이벤트 JSON의 앞뒤를 미리 직렬화해 두고 Base64 음성만 끼워 넣음 (딕셔너리와 json.dumps 생략)
+class AppendEventEncoder:
+    # 초기화
+    def __init__(self, event_type: str = "input_audio_buffer.append"):
+        template = json.dumps({"type": event_type, "audio": ""})
+        self.prefix = template[:-2].encode("utf-8")  # ..."audio": "
+        self.suffix = template[-2:].encode("utf-8")  # "}
+
+    # PCM16 -> 이벤트 JSON (UTF-8 바이트)
+    def encode(self, pcm) -> bytes:
+        return b"".join((self.prefix, binascii.b2a_base64(pcm, newline=False), self.suffix))
+
+# 캡처 스레드 (스트림에서 읽어 링 버퍼에 씀, 빈 데이터를 읽으면 종료)
+# lossless=True이면 버퍼가 찰 때 버리지 않고 기다림 (파일처럼 실시간보다 빨리 읽는 소스의 흐름 제어)
+class CaptureThread(threading.Thread):
+    # 초기화
+    def __init__(self, stream, chunk_size: int, ring: RingBuffer, lossless: bool = False):
+        super().__init__(name="audio-capture", daemon=True)
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.ring = ring
+        self.lossless = lossless
+        self.stop_event = threading.Event()
+        self.chunks = 0
+
+    # 캡처 루프
+    def run(self) -> None:
+        while not self.stop_event.is_set():
+            try:
+                data = self.stream.read(self.chunk_size, exception_on_overflow=False)
+            except Exception as e:
+                print(e)
+                continue
+            if not data:
+                break
+            self.ring.write(data, block=self.lossless)
+            self.chunks += 1
+
+    # 정지 요청
+    def stop(self) -> None:
+        self.stop_event.set()
+
+# 음성 업링크
+# - 전용 캡처 스레드가 링 버퍼에 쓰고, 송신 태스크는 send_interval마다 모인 음성을 한 번에 전송
+# - 이벤트 루프와 스레드 풀 사이를 청크마다 오가지 않음
+# - vad를 지정하면 묵음은 보내지 않고, 발화가 끝날 때마다 commit_events를 전송
+#   (발화가 시작되면 on_speech_start를 호출, 서버 측 발화 검출이 꺼진 commit 모드의 끼어들기 처리용)
+# - lossless=True이면 캡처가 송신보다 빠를 때 버리지 않고 캡처를 멈춤 (파일 소스용)
+# - retain_seconds를 지정하면 커밋되지 않은 음성을 보관했다가 재연결 후 resume으로 다시 보냄
+class AudioUplink:
+    # 초기화
+    def __init__(
+        self,
+        stream,
+        chunk_size: int = 2048,
+        sample_rate: int = 24000,
+        sample_width: int = 2,
+        send_interval: float = 0.1,
+        buffer_seconds: float = 5.0,
+        max_message_seconds: float = 1.0,
+        vad=None,
+        commit_events: list[dict] | None = None,
+        lossless: bool = False,
+        retain_seconds: float = 0.0,
+        on_speech_start: Callable[[], None] | None = None,
+    ):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.sample_width = sample_width
+        self.send_interval = send_interval
+        self.bytes_per_second = bytes_per_second = sample_rate * sample_width
+        self.ring = RingBuffer(int(bytes_per_second * buffer_seconds) // sample_width * sample_width)
+
+        # 이벤트 하나에 담을 최대 음성 크기 (송신이 밀렸을 때는 여러 이벤트로 나눔)
+        max_bytes = max(chunk_size * sample_width, int(bytes_per_second * max_message_seconds))
+        self.out = memoryview(bytearray(max_bytes // sample_width * sample_width))
+        self.encoder = AppendEventEncoder()
+        self.vad = vad
+        self.on_speech_start = on_speech_start
+        self.in_speech = False  # VAD가 발화 구간을 내보내는 중인지
+        self.lossless = lossless
+        self.commit_messages = [json.dumps(event) for event in commit_events or []]
+        self.capture: CaptureThread | None = None
+        self.messages_sent = 0
+        self.bytes_captured = 0
+        self.bytes_sent = 0
+        self.commits = 0
+        self.speech_starts = 0
+
+        # 커밋되지 않은 음성 (retained[0]은 현재 연결에서 session_bytes 기준 retained_offset 위치)
+        self.max_retained = int(bytes_per_second * retain_seconds) // sample_width * sample_width
+        self.retained = bytearray()
+        self.retained_offset = 0
+        self.session_bytes = 0  # 현재 연결에서 보낸 음성 바이트 수 (서버 음성 버퍼의 시간축)
+        self.committed_end = 0  # 현재 연결에서 서버가 확정한 위치
+        self.resent_bytes = 0
+        self.trimmed_bytes = 0  # 보관 한도를 넘어 보관에서 뺀 바이트 수 (연결이 유지되면 잃지 않음)
+        self.trimmed_speech = 0  # 그중 아직 커밋되지 않은 발화 바이트 수
+        self.lost_bytes = 0  # 다시 보내지 못한 커밋되지 않은 발화 바이트 수
+        # 보관에서 뺀 음성이 발화인지 판정하는 검출기 (묵음은 잃어도 손실로 세지 않음)
+        self.speech_detector = vad if vad is not None else VoiceActivityDetector(sample_rate)
+
+    # 캡처 시작 (이미 시작했으면 그대로)
+    def start(self) -> None:
+        if self.capture is None:
+            self.capture = CaptureThread(self.stream, self.chunk_size, self.ring, self.lossless)
+            self.capture.start()
+
+    # 캡처가 끝났고 보낼 음성도 남지 않았는지
+    @property
+    def finished(self) -> bool:
+        return self.capture is not None and not self.capture.is_alive() and not len(self.ring)
+
+    # 캡처 정지
+    def stop(self) -> None:
+        if self.capture is not None:
+            self.capture.stop()
+        self.ring.close()
+
+    # 음성 하나를 append 이벤트로 전송
+    async def send_pcm(self, websocket, pcm) -> None:
+        await websocket.send(self.encoder.encode(pcm), text=True)
+        self.messages_sent += 1
+        self.bytes_sent += len(pcm)
+        self.session_bytes += len(pcm)
+
+    # 보낼 음성을 보관 (보내기 전에 보관하므로 전송 중에 끊겨도 잃지 않음, 한도를 넘으면 오래된 것부터 버림)
+    def retain(self, pcm) -> None:
+        if not self.max_retained:
+            return
+        self.retained += pcm
+        overflow = len(self.retained) - self.max_retained
+        if overflow > 0:
+            self.trimmed_speech += self.speech_bytes(self.retained[:overflow])
+            del self.retained[:overflow]
+            self.retained_offset += overflow
+            self.trimmed_bytes += overflow
+
+    # 발화로 판정되는 바이트 수 (프레임 단위)
+    def speech_bytes(self, pcm) -> int:
+        frame_bytes = self.speech_detector.frame_bytes
+        usable = len(pcm) // frame_bytes * frame_bytes
+        if not usable:
+            return 0
+        frames = np.frombuffer(pcm, dtype=np.int16, count=usable // 2).reshape(-1, frame_bytes // 2)
+        return int(np.count_nonzero(self.speech_detector.classify(frames))) * frame_bytes
+
+    # 커밋되지 않은 바이트 수 (현재 연결에서 보냈지만 서버가 아직 확정하지 않은 음성)
+    @property
+    def uncommitted_bytes(self) -> int:
+        return self.session_bytes - self.committed_end
+
+    # 커밋 표시 (현재 연결의 end바이트 위치까지 서버가 확정했으므로 그 앞의 보관 음성은 버림)
+    def mark_committed(self, end: int | None = None) -> None:
+        end = self.session_bytes if end is None else end
+        self.committed_end = max(self.committed_end, end)
+        if end >= self.retained_offset:
+            self.trimmed_speech = 0  # 보관에서 뺀 음성도 서버가 확정함
+        drop = min(len(self.retained), end - self.retained_offset)
+        if drop > 0:
+            del self.retained[:drop]
+            self.retained_offset += drop
+
+    # 새 연결에서 보관한 음성을 다시 전송 (서버 쪽 음성 버퍼는 연결과 함께 사라짐)
+    # 보관 한도를 넘어 빠진 커밋되지 않은 발화는 다시 보낼 수 없으므로 손실로 기록
+    async def resume(self, websocket) -> None:
+        self.lost_bytes += self.trimmed_speech
+        self.trimmed_speech = 0
+        self.session_bytes = 0
+        self.committed_end = 0
+        self.retained_offset = 0
+        pending = memoryview(bytes(self.retained))
+        for start in range(0, len(pending), len(self.out)):
+            chunk = pending[start : start + len(self.out)]
+            await self.send_pcm(websocket, chunk)
+            self.resent_bytes += len(chunk)
+
+    # 링 버퍼에 모인 음성을 전송
+    async def flush(self, websocket) -> None:
+        while len(self.ring):
+            n = self.ring.read_into(self.out)
+            self.bytes_captured += n
+            if self.vad is None:
+                self.retain(self.out[:n])
+                await self.send_pcm(websocket, self.out[:n])
+                continue
+            events = self.vad.process(self.out[:n])
+            for event in events:
+                if event.kind == "audio":
+                    self.retain(event.audio)
+                    if not self.in_speech:
+                        self.in_speech = True
+                        self.speech_starts += 1
+                        if self.on_speech_start is not None:
+                            self.on_speech_start()
+                else:
+                    self.in_speech = False
+            for event in events:
+                if event.kind == "audio":
+                    await self.send_pcm(websocket, event.audio)
+                elif self.commit_messages:
+                    for message in self.commit_messages:
+                        await websocket.send(message)
+                    self.commits += 1
+                    self.mark_committed()
+
+    # 송신 루프 (캡처는 건드리지 않음, 스트림이 끝나면 남은 음성을 보내고 종료)
+    async def pump(self, websocket) -> None:
+        loop = asyncio.get_running_loop()
+        next_time = loop.time()
+        while True:
+            next_time = max(next_time + self.send_interval, loop.time())
+            await asyncio.sleep(next_time - loop.time())
+            finished = not self.capture.is_alive()
+            await self.flush(websocket)
+            if finished:
+                break
+
+    # 캡처 시작부터 정지까지 (연결 하나로 끝나는 경우)
+    async def run(self, websocket) -> None:
+        self.start()
+        try:
+            await self.pump(websocket)
+        finally:
+            self.stop()
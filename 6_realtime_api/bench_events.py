@@ -0,0 +1,94 @@
+import argparse
+import asyncio
+import base64
+import json
+import time
+from stand_in_server import make_tone
+from event_dispatcher import JSON_BACKEND, EventDispatcher
+
+# 서버 메시지 흉내 (100ms 음성 델타와 자막 델타를 번갈아)
+def make_messages(count: int, chunk_ms: int = 100, compact: bool = True) -> list[str]:
+    tone = make_tone(chunk_ms / 1000)
+    separators = (",", ":") if compact else (", ", ": ")
+    messages = []
+    for n in range(count):
+        event = {
+            "type": "response.audio.delta",
+            "event_id": f"event_{n}",
+            "response_id": "resp_1",
+            "item_id": "item_1",
+            "output_index": 0,
+            "content_index": 0,
+            "delta": base64.b64encode(tone).decode("ascii"),
+        }
+        messages.append(json.dumps(event, separators=separators))
+        if n % 4 == 0:
+            messages.append(json.dumps({
+                "type": "response.audio_transcript.delta", "response_id": "resp_1", "delta": "안녕 ",
+            }, separators=separators, ensure_ascii=False))
+    return messages
+
+# 기존 방식 (메시지마다 json.loads 후 if/elif)
+def legacy(messages: list[str]) -> int:
+    total = 0
+    for message in messages:
+        data = json.loads(message)
+        if data.get("type") == "response.audio_transcript.delta":
+            total += len(data.get("delta", ""))
+        elif data.get("type") == "response.audio.delta":
+            total += len(base64.b64decode(data["delta"]))
+    return total
+
+# 디스패처 방식
+def dispatched(messages: list[str]) -> tuple[int, EventDispatcher]:
+    dispatcher = EventDispatcher()
+    total = 0
+
+    @dispatcher.on("response.audio_transcript.delta")
+    def on_transcript(event: dict) -> None:
+        nonlocal total
+        total += len(event.get("delta", ""))
+
+    @dispatcher.on("response.audio.delta", fast=True)
+    def on_audio(event: dict) -> None:
+        nonlocal total
+        total += len(base64.b64decode(event["delta"]))
+
+    # 소켓 없이 dispatch만 반복 (코루틴 하나로 실행)
+    async def feed() -> None:
+        for message in messages:
+            await dispatcher.dispatch(message)
+
+    asyncio.run(feed())
+    return total, dispatcher
+
+# 측정
+def measure(function, messages: list[str], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.process_time()
+        function(messages)
+        best = min(best, time.process_time() - start)
+    return best
+
+# main 실행
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=2000, help="음성 델타 메시지 수")
+    parser.add_argument("--chunk-ms", type=int, default=100, help="델타 하나의 음성 길이(ms)")
+    parser.add_argument("--repeat", type=int, default=5, help="반복 횟수 (최솟값 사용)")
+    parser.add_argument("--spaced", action="store_true", help="공백이 있는 JSON (json.dumps 기본 형식)")
+    args = parser.parse_args()
+
+    messages = make_messages(args.messages, args.chunk_ms, compact=not args.spaced)
+    legacy_total = legacy(messages)
+    dispatched_total, dispatcher = dispatched(messages)
+    assert legacy_total == dispatched_total, "결과가 다릅니다."
+
+    audio_seconds = args.messages * args.chunk_ms / 1000
+    legacy_time = measure(legacy, messages, args.repeat)
+    dispatched_time = measure(lambda m: dispatched(m), messages, args.repeat)
+    print(f"{len(messages)}개 메시지, 음성 {audio_seconds:.0f}s, JSON backend: {JSON_BACKEND}")
+    print(f"  json.loads + if/elif: {legacy_time / audio_seconds * 1000:.3f}ms per audio second")
+    print(f"  EventDispatcher:      {dispatched_time / audio_seconds * 1000:.3f}ms per audio second")
+    print(dispatcher.summary())
@@ -0,0 +1,266 @@
+import argparse
+import asyncio
+import contextlib
+import importlib.util
+import io
+import re
+import sys
+import threading
+import time
+import types
+from pathlib import Path
+import numpy as np
+import websockets
+from stand_in_server import StandInServer
+
+BASE_DIR = Path(__file__).resolve().parent
+SCRIPTS = {
+    "chat": BASE_DIR / "2_realtime_chat" / "realtime_chat.py",
+    "transcript": BASE_DIR / "3_realtime_transcript" / "realtime_transcript.py",
+}
+RATE = 24000
+
+# 입력 음성 (WAV 파일 또는 합성 음성)
+def load_audio(path: str | None, seconds: float) -> bytes:
+    if path:
+        from vad_replay import read_wav
+        return read_wav(Path(path)).tobytes()
+    t = np.arange(int(seconds * RATE)) / RATE
+    envelope = (np.sin(2 * np.pi * 0.25 * t) > -0.3).astype(np.float32)  # 발화와 쉼 반복
+    return (2000 * np.sin(2 * np.pi * 180 * t) * envelope).astype(np.int16).tobytes()
+
+# 파일 입력 스트림 (PyAudio 입력 스트림 대용, speed배속으로 읽고 끝나면 빈 바이트)
+class FileInputStream:
+    # 초기화
+    def __init__(self, audio: bytes, speed: float):
+        self.audio = audio
+        self.speed = speed
+        self.position = 0
+        self.active = True
+
+    # 읽기
+    def read(self, frames: int, exception_on_overflow: bool = True) -> bytes:
+        data = self.audio[self.position : self.position + frames * 2]
+        self.position += len(data)
+        if data:
+            time.sleep(len(data) / 2 / RATE / self.speed)
+        return data
+
+    def is_active(self) -> bool:
+        return self.active
+
+    def stop_stream(self) -> None:
+        self.active = False
+
+    def close(self) -> None:
+        self.active = False
+
+# 출력 스트림 (PyAudio 출력 스트림 대용, 장치처럼 실시간 속도로 소비)
+class NullOutputStream:
+    # 쓰기
+    def write(self, frames: bytes) -> None:
+        time.sleep(len(frames) / 2 / RATE)
+
+    def stop_stream(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+# 파일 기반 pyaudio 모듈 만들기
+def make_pyaudio_module(audio: bytes, speed: float) -> types.ModuleType:
+    # PyAudio 대용
+    class FilePyAudio:
+        def open(self, format=None, channels=1, rate=RATE, input=False, output=False, frames_per_buffer=1024):
+            return FileInputStream(audio, speed) if input else NullOutputStream()
+
+        def terminate(self) -> None:
+            pass
+
+    module = types.ModuleType("pyaudio")
+    module.PyAudio = FilePyAudio
+    module.paInt16 = 8
+    return module
+
+# 클라이언트 측 수신 시각 기록
+class ReceiveLog:
+    ID_PATTERN = re.compile(r'"(?:response_id|item_id)": "([^"]+)"')
+    FIRST_TYPES = ('"response.audio.delta"', '"conversation.item.input_audio_transcription.delta"')
+
+    # 초기화
+    def __init__(self):
+        self.first_times: dict[str, float] = {}  # 응답·아이템 ID -> 첫 델타를 받은 시각
+
+    # 메시지 하나 기록
+    def record(self, message) -> None:
+        if isinstance(message, str) and any(t in message[:80] for t in self.FIRST_TYPES):
+            match = self.ID_PATTERN.search(message)
+            if match and match.group(1) not in self.first_times:
+                self.first_times[match.group(1)] = time.perf_counter()
+
+# 수신 시각을 기록하는 websockets 모듈 대용
+def make_websockets_module(log: ReceiveLog) -> types.SimpleNamespace:
+    # recv를 감싼 연결
+    class LoggedConnection:
+        def __init__(self, connection):
+            self.connection = connection
+
+        async def recv(self):
+            message = await self.connection.recv()
+            log.record(message)
+            return message
+
+        def __getattr__(self, name):
+            return getattr(self.connection, name)
+
+    @contextlib.asynccontextmanager
+    async def connect(url, **kwargs):
+        async with websockets.connect(url, compression=None, max_size=None, **kwargs) as connection:
+            yield LoggedConnection(connection)
+
+    return types.SimpleNamespace(connect=connect)
+
+# 스크립트를 모듈로 로드 (pyaudio, websockets, 접속 URL을 바꿔 끼움)
+def load_script(name: str, pyaudio_module, websockets_module, port: int):
+    sys.modules["pyaudio"] = pyaudio_module
+    spec = importlib.util.spec_from_file_location(f"bench_{name}", SCRIPTS[name])
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    module.websockets = websockets_module
+    module.WS_URL = module.WS_URL.replace("wss://api.openai.com", f"ws://127.0.0.1:{port}")
+    return module
+
+# 대역 서버를 별도 스레드의 이벤트 루프에서 실행 (서버 CPU 시간을 따로 측정)
+class ServerThread(threading.Thread):
+    # 초기화
+    def __init__(self, server: StandInServer, port: int):
+        super().__init__(daemon=True)
+        self.server = server
+        self.port = port
+        self.ready = threading.Event()
+        self.cpu_time = 0.0
+        self.loop: asyncio.AbstractEventLoop | None = None
+        self.stop_future: asyncio.Future | None = None
+
+    # 서버 루프
+    async def main(self) -> None:
+        self.loop = asyncio.get_running_loop()
+        self.stop_future = self.loop.create_future()
+        async with websockets.serve(
+            self.server.handler, "127.0.0.1", self.port, compression=None, max_size=None
+        ):
+            self.ready.set()
+            await self.stop_future
+
+    def run(self) -> None:
+        start = time.thread_time()
+        asyncio.run(self.main())
+        self.cpu_time = time.thread_time() - start
+
+    # 정지
+    def stop(self) -> None:
+        self.loop.call_soon_threadsafe(self.stop_future.set_result, None)
+        self.join()
+
+# 이벤트 루프 지연 측정 (interval마다 깨어나 늦은 만큼 기록)
+async def monitor_lag(lags: list[float], interval: float = 0.01) -> None:
+    loop = asyncio.get_running_loop()
+    while True:
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        lags.append(loop.time() - expected)
+
+# 백분위 값
+def percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+# 스크립트 하나 측정
+async def run_sessions(module, args: argparse.Namespace, audio_seconds: float) -> list[float]:
+    lags: list[float] = []
+    monitor = asyncio.create_task(monitor_lag(lags))
+    sessions = [asyncio.create_task(module.main(args.vad)) for _ in range(args.sessions)]
+    # 음성을 모두 보낸 뒤 마지막 응답을 받을 시간만큼 더 기다린 후 종료
+    await asyncio.sleep(audio_seconds / args.speed + args.tail)
+    for task in sessions:
+        task.cancel()
+    await asyncio.gather(*sessions, return_exceptions=True)
+    monitor.cancel()
+    return lags
+
+# 벤치마크 하나 실행
+def benchmark(name: str, args: argparse.Namespace, audio: bytes, port: int) -> None:
+    server = StandInServer(
+        response_latency=args.latency,
+        response_seconds=args.response_seconds,
+        audio_speed=args.audio_speed,
+        turn_seconds=args.turn_seconds,
+        disconnect_every=args.disconnect_every,
+    )
+    server_thread = ServerThread(server, port)
+    server_thread.start()
+    server_thread.ready.wait()
+
+    log = ReceiveLog()
+    module = load_script(name, make_pyaudio_module(audio, args.speed), make_websockets_module(log), port)
+    audio_seconds = len(audio) / 2 / RATE
+
+    cpu_start = time.process_time()
+    with contextlib.redirect_stdout(io.StringIO()):
+        lags = asyncio.run(run_sessions(module, args, audio_seconds))
+    server_thread.stop()
+    client_cpu = time.process_time() - cpu_start - server_thread.cpu_time
+
+    stats = server.stats
+    latencies = [
+        log.first_times[key] - trigger
+        for key, trigger in stats.trigger_times.items()
+        if key in log.first_times
+    ]
+    uplink = stats.audio_bytes_received / (audio_seconds / args.speed)
+    delivered = stats.audio_bytes_received / (len(audio) * args.sessions)
+    label = "first-audio" if name == "chat" else "first-transcript"
+    print(f"[{name}] sessions={args.sessions} audio={audio_seconds:.1f}s speed={args.speed}x vad={args.vad}")
+    print(
+        f"  uplink: {uplink / 1000:.1f} kB/s total, {uplink / args.sessions / 1000:.1f} kB/s per session "
+        f"(audio rate {RATE * 2 * args.speed / 1000:.1f} kB/s, delivered {delivered:.0%})"
+    )
+    print(
+        f"  {label} latency: n={len(latencies)} p50={percentile(latencies, 0.5) * 1000:.0f}ms "
+        f"p90={percentile(latencies, 0.9) * 1000:.0f}ms (server delay {args.latency * 1000:.0f}ms)"
+    )
+    print(
+        f"  event-loop lag: p50={percentile(lags, 0.5) * 1000:.1f}ms "
+        f"p99={percentile(lags, 0.99) * 1000:.1f}ms max={max(lags, default=0) * 1000:.1f}ms"
+    )
+    if args.disconnect_every:
+        print(f"  connections: {stats.connections} ({stats.disconnects} injected disconnects)")
+    print(
+        f"  client cpu: {client_cpu / args.sessions / audio_seconds * 1000:.2f}ms per session per audio second "
+        f"(server {server_thread.cpu_time:.2f}s)"
+    )
+
+# main 실행
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--script", choices=["chat", "transcript", "both"], default="both", help="측정할 스크립트")
+    parser.add_argument("--sessions", type=int, default=10, help="동시 세션 수")
+    parser.add_argument("--wav", help="입력 WAV 파일 (없으면 합성 음성)")
+    parser.add_argument("--seconds", type=float, default=12.0, help="합성 음성 길이(초)")
+    parser.add_argument("--speed", type=float, default=1.0, help="입력 음성 배속")
+    parser.add_argument("--vad", choices=["off", "gate", "commit"], default="off", help="스크립트의 VAD 모드")
+    parser.add_argument("--latency", type=float, default=0.3, help="대역 서버 응답 지연(초)")
+    parser.add_argument("--response-seconds", type=float, default=2.0, help="응답 음성 길이(초)")
+    parser.add_argument("--audio-speed", type=float, default=4.0, help="응답 음성 전송 배속")
+    parser.add_argument("--turn-seconds", type=float, default=3.0, help="서버 측 턴 길이(초)")
+    parser.add_argument("--disconnect-every", type=float, help="대역 서버가 연결마다 이 시간(초)이 지나면 끊음")
+    parser.add_argument("--tail", type=float, default=2.0, help="음성 송신 후 대기 시간(초)")
+    parser.add_argument("--port", type=int, default=8781, help="대역 서버 포트")
+    args = parser.parse_args()
+
+    audio = load_audio(args.wav, args.seconds)
+    names = ["chat", "transcript"] if args.script == "both" else [args.script]
+    for i, name in enumerate(names):
+        benchmark(name, args, audio, args.port + i)
@@ -0,0 +1,99 @@
+import argparse
+import asyncio
+import base64
+import json
+import os
+import threading
+import time
+from audio_uplink import AudioUplink
+
+# 가짜 입력 스트림 (PyAudio 입력 스트림 대용, speed배속으로 음성을 내보내고 seconds초 후 종료)
+class FakeInputStream:
+    # 초기화
+    def __init__(self, seconds: float, speed: float, rate: int = 24000):
+        self.rate = rate
+        self.speed = speed
+        self.remaining = int(seconds * rate)
+        self.block = os.urandom(rate * 2)
+        self.lock = threading.Lock()
+
+    # 읽기 (청크 길이만큼 기다린 뒤 반환)
+    def read(self, frames: int, exception_on_overflow: bool = True) -> bytes:
+        with self.lock:
+            frames = min(frames, self.remaining)
+            self.remaining -= frames
+        if frames == 0:
+            return b""
+        time.sleep(frames / self.rate / self.speed)
+        return self.block[: frames * 2]
+
+# 가짜 WebSocket (보낸 메시지 수와 음성 바이트 수만 기록)
+class NullWebSocket:
+    # 초기화
+    def __init__(self):
+        self.messages = 0
+        self.audio_bytes = 0
+
+    # 송신
+    async def send(self, message, text: bool | None = None) -> None:
+        if self.messages == 0:
+            event = json.loads(message)
+            assert event["type"] == "input_audio_buffer.append"
+        self.messages += 1
+        self.audio_bytes += len(message)
+
+# 기존 방식 (청크마다 스레드 풀에서 읽고, Base64 문자열·딕셔너리·json.dumps 생성 후 전송)
+async def legacy_send_audio(websocket, stream, chunk_size: int):
+    def read_audio_block():
+        try:
+            return stream.read(chunk_size, exception_on_overflow=False)
+        except Exception as e:
+            print(e)
+            return None
+
+    while True:
+        audio_data = await asyncio.get_event_loop().run_in_executor(None, read_audio_block)
+        if audio_data is None:
+            continue
+        if not audio_data:
+            break
+        base64_audio = base64.b64encode(audio_data).decode("utf-8")
+        audio_event = {
+            "type": "input_audio_buffer.append",
+            "audio": base64_audio
+        }
+        await websocket.send(json.dumps(audio_event))
+        await asyncio.sleep(0)
+
+# 한 가지 방식 측정 (CPU 시간, 경과 시간, 메시지 수)
+def measure(name: str, args: argparse.Namespace) -> None:
+    stream = FakeInputStream(args.seconds, args.speed)
+    websocket = NullWebSocket()
+    if name == "legacy":
+        coroutine = legacy_send_audio(websocket, stream, args.chunk)
+    else:
+        # 배속에 맞춰 송신 간격도 줄여서 실제와 같은 비율로 묶음
+        uplink = AudioUplink(stream, args.chunk, send_interval=args.send_interval / args.speed)
+        coroutine = uplink.run(websocket)
+
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    asyncio.run(coroutine)
+    cpu = time.process_time() - cpu_start
+    wall = time.perf_counter() - wall_start
+    print(
+        f"{name:>7}: cpu={cpu / args.seconds * 1000:.2f}ms per audio second  "
+        f"wall={wall:.2f}s  messages={websocket.messages}  bytes={websocket.audio_bytes}"
+    )
+
+# 벤치마크 실행
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=60.0, help="음성 길이(초)")
+    parser.add_argument("--speed", type=float, default=10.0, help="재생 배속")
+    parser.add_argument("--chunk", type=int, default=2048, help="청크 크기(프레임)")
+    parser.add_argument("--send-interval", type=float, default=0.1, help="송신 간격(초, 실시간 기준)")
+    args = parser.parse_args()
+
+    for name in ("legacy", "uplink"):
+        measure(name, args)
@@ -0,0 +1,140 @@
+import inspect
+import json
+import re
+import sys
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+
+# 빠른 JSON 백엔드 (orjson이 설치되어 있으면 사용)
+try:
+    import orjson
+
+    def loads(data):
+        return orjson.loads(data)
+
+    JSON_BACKEND = "orjson"
+except ImportError:
+    loads = json.loads
+    JSON_BACKEND = "json"
+
+# 이벤트 핸들러 (이벤트 딕셔너리를 받음, 동기·비동기 모두 가능)
+EventHandler = Callable[[dict], Awaitable[None] | None]
+
+# 메시지 앞부분의 type 값 (서버는 type을 첫 필드로 보냄)
+TYPE_PATTERN = re.compile(r'\s*\{\s*"type"\s*:\s*"([^"\\]+)"')
+
+# delta 키
+DELTA_PATTERN = re.compile(r',\s*"delta"\s*:\s*"')
+
+# 이벤트 종류별 통계
+@dataclass
+class EventStats:
+    count: int = 0
+    fast: int = 0  # 빠른 경로로 처리한 수
+    parse_time: float = 0.0
+    handler_time: float = 0.0
+
+# 빠른 경로: 마지막 필드가 delta인 큰 이벤트에서 delta 문자열을 떼어 두고 나머지만 파싱
+# (Base64 음성이 든 delta를 JSON 파서에 통째로 넣지 않음, 형식이 예상과 다르면 None)
+def split_delta(message: str, start: int) -> dict | None:
+    match = DELTA_PATTERN.search(message, start)
+    if match is None:
+        return None
+    value_start = match.end()
+    value_end = message.find('"', value_start)
+    if value_end < 0 or message[value_end + 1 :].strip() != "}":
+        return None
+    delta = message[value_start:value_end]
+    if "\\" in delta:  # 이스케이프가 있으면 일반 파싱
+        return None
+    event = loads(message[: match.start()] + "}")
+    event["delta"] = delta
+    return event
+
+# 이벤트 디스패처
+# - 이벤트 종류별 핸들러 표 (if/elif 체인 대신 딕셔너리 조회)
+# - fast=True로 등록한 종류는 전체 JSON을 파싱하지 않고 delta만 떼어 냄
+# - error와 rate_limits.updated는 기본 핸들러로 처리 (on으로 바꿀 수 있음)
+# - 종류별 건수, 파싱 시간, 핸들러 시간을 기록
+class EventDispatcher:
+    # 초기화
+    def __init__(self):
+        self.handlers: dict[str, tuple[EventHandler, bool]] = {}  # 종류 -> (핸들러, 비동기 여부)
+        self.fast_types: set[str] = set()
+        self.stats: dict[str, EventStats] = {}
+        self.rate_limits: dict[str, dict] = {}  # 이름 -> 최근 rate limit 정보
+        self.errors: list[dict] = []
+        self.on("error")(self.handle_error)
+        self.on("rate_limits.updated")(self.handle_rate_limits)
+
+    # 핸들러 등록 (데코레이터)
+    def on(self, event_type: str, fast: bool = False) -> Callable[[EventHandler], EventHandler]:
+        def register(handler: EventHandler) -> EventHandler:
+            self.handlers[event_type] = (handler, inspect.iscoroutinefunction(handler))
+            if fast:
+                self.fast_types.add(event_type)
+            else:
+                self.fast_types.discard(event_type)
+            return handler
+        return register
+
+    # 기본 오류 핸들러 (표준 오류로 출력)
+    def handle_error(self, event: dict) -> None:
+        self.errors.append(event)
+        error = event.get("error", {})
+        print(f"\n[오류] {error.get('type', '')}: {error.get('message', '')}", file=sys.stderr)
+
+    # 기본 rate limit 핸들러 (최근 값 보관)
+    def handle_rate_limits(self, event: dict) -> None:
+        for limit in event.get("rate_limits", []):
+            self.rate_limits[limit.get("name", "")] = limit
+
+    # 메시지 파싱 (종류, 이벤트, 빠른 경로 여부)
+    def parse(self, message) -> tuple[str, dict, bool]:
+        if isinstance(message, str):
+            match = TYPE_PATTERN.match(message)
+            if match is not None and match.group(1) in self.fast_types:
+                event = split_delta(message, match.end())
+                if event is not None:
+                    return match.group(1), event, True
+        event = loads(message)
+        return event.get("type", ""), event, False
+
+    # 메시지 하나 처리
+    async def dispatch(self, message) -> None:
+        start = time.perf_counter()
+        event_type, event, fast = self.parse(message)
+        parsed = time.perf_counter()
+        stats = self.stats.get(event_type)
+        if stats is None:
+            stats = self.stats[event_type] = EventStats()
+        stats.count += 1
+        stats.fast += fast
+        stats.parse_time += parsed - start
+
+        entry = self.handlers.get(event_type)
+        if entry is None:
+            return
+        handler, is_async = entry
+        if is_async:
+            await handler(event)
+        else:
+            handler(event)
+        stats.handler_time += time.perf_counter() - parsed
+
+    # 수신 루프 (연결이 끊기면 예외가 그대로 전달됨)
+    async def run(self, websocket) -> None:
+        while True:
+            await self.dispatch(await websocket.recv())
+
+    # 통계 요약 (건수 순)
+    def summary(self) -> str:
+        lines = [f"JSON backend: {JSON_BACKEND}"]
+        for event_type, stats in sorted(self.stats.items(), key=lambda item: -item[1].count):
+            lines.append(
+                f"  {event_type}: count={stats.count} fast={stats.fast} "
+                f"parse={stats.parse_time / stats.count * 1e6:.1f}us "
+                f"handler={stats.handler_time / stats.count * 1e6:.1f}us"
+            )
+        return "\n".join(lines)
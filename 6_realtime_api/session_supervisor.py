@@ -0,0 +1,131 @@
+import asyncio
+import random
+from collections.abc import Awaitable, Callable
+import websockets
+from audio_uplink import AudioUplink
+from event_dispatcher import EventDispatcher
+
+# 세션 감시자
+# - 연결이 끊기면 지수 백오프(지터 포함)로 다시 연결하고, configure로 세션 설정을 다시 보냄
+# - 캡처 스레드와 링 버퍼는 연결과 상관없이 계속 동작 (끊긴 동안의 음성은 링 버퍼에 쌓임)
+# - 커밋되지 않은 음성은 업링크가 보관하다가 새 연결에서 다시 보냄
+#   (서버 측 발화 검출이면 speech_stopped의 audio_end_ms까지, 클라이언트 커밋이면 커밋한 위치까지 확정)
+# - 입력이 끝나면(파일 등) finish로 남은 음성을 마무리하고 연결을 닫은 뒤 종료
+#   (서버가 정상적으로 연결을 닫은 경우도 다시 연결하지 않고 종료)
+class SessionSupervisor:
+    # 초기화
+    # connect: 호출하면 websockets.connect(...)처럼 비동기 컨텍스트 관리자를 반환
+    # configure: configure(websocket, reconnect)로 세션 설정 전송 (재연결이면 reconnect=True)
+    # finish: 업링크가 끝난 뒤 finish(websocket)로 남은 음성 커밋과 결과 대기 (끊기면 재연결 후 다시 호출)
+    def __init__(
+        self,
+        connect: Callable,
+        configure: Callable[[object, bool], Awaitable[None]],
+        uplink: AudioUplink,
+        dispatcher: EventDispatcher,
+        initial_backoff: float = 0.5,
+        max_backoff: float = 10.0,
+        max_attempts: int | None = None,
+        finish: Callable[[object], Awaitable[None]] | None = None,
+    ):
+        self.connect = connect
+        self.configure = configure
+        self.finish = finish
+        self.uplink = uplink
+        self.dispatcher = dispatcher
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.max_attempts = max_attempts
+        self.speech_end: int | None = None  # 서버가 알려 준 마지막 발화 끝 위치(바이트)
+        self.connections = 0
+        self.disconnects = 0
+        dispatcher.on("input_audio_buffer.speech_stopped")(self.handle_speech_stopped)
+        dispatcher.on("input_audio_buffer.committed")(self.handle_committed)
+
+    # 서버 측 발화 검출이 발화 끝을 알림
+    def handle_speech_stopped(self, event: dict) -> None:
+        if "audio_end_ms" in event:
+            end = self.uplink.bytes_per_second * event["audio_end_ms"] // 1000
+            self.speech_end = end // self.uplink.sample_width * self.uplink.sample_width
+
+    # 서버가 음성 버퍼를 확정 (발화 끝 위치를 모르면 클라이언트 커밋이므로 업링크가 이미 처리함)
+    def handle_committed(self, event: dict) -> None:
+        if self.speech_end is not None:
+            self.uplink.mark_committed(self.speech_end)
+            self.speech_end = None
+
+    # 다시 연결할 만한 오류인지 (인증 실패 같은 4xx 응답은 다시 시도하지 않음)
+    @staticmethod
+    def retryable(error: Exception) -> bool:
+        if isinstance(error, websockets.InvalidStatus):
+            return error.response.status_code >= 500
+        return isinstance(error, (websockets.ConnectionClosed, websockets.InvalidHandshake, OSError, TimeoutError))
+
+    # 송신 (업링크가 끝날 때까지 보낸 뒤 finish로 마무리)
+    async def send(self, websocket) -> None:
+        if not self.uplink.finished:
+            await self.uplink.pump(websocket)
+        if self.finish is not None:
+            await self.finish(websocket)
+
+    # 연결 하나 동안 송수신 (송신이 끝나면 연결을 닫고 True, 서버가 정상 종료해도 True, 끊기면 예외)
+    async def serve(self, websocket) -> bool:
+        receive_task = asyncio.create_task(self.dispatcher.run(websocket))
+        send_task = asyncio.create_task(self.send(websocket))
+        tasks = {receive_task, send_task}
+        try:
+            while True:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                errors = [task.exception() for task in done if task.exception() is not None]
+                if any(isinstance(error, websockets.ConnectionClosedOK) for error in errors):
+                    return True
+                if errors:
+                    raise errors[0]
+                if send_task in done:
+                    await websocket.close()
+                    return True
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    # 실행 (취소되거나 다시 연결할 수 없는 오류가 날 때까지)
+    async def run(self) -> None:
+        self.uplink.start()
+        attempt = 0
+        try:
+            while True:
+                try:
+                    async with self.connect() as websocket:
+                        self.speech_end = None
+                        await self.configure(websocket, self.connections > 0)
+                        await self.uplink.resume(websocket)
+                        self.connections += 1
+                        attempt = 0
+                        if await self.serve(websocket):
+                            return
+                except websockets.ConnectionClosedOK:
+                    return
+                except Exception as e:
+                    if not self.retryable(e):
+                        raise
+                    self.disconnects += 1
+                    attempt += 1
+                    if self.max_attempts is not None and attempt > self.max_attempts:
+                        raise
+                    delay = min(self.max_backoff, self.initial_backoff * 2 ** (attempt - 1))
+                    delay *= random.uniform(0.5, 1.0)
+                    print(f"\n연결이 끊겼습니다 ({type(e).__name__}). {delay:.1f}초 후 다시 연결합니다.")
+                    await asyncio.sleep(delay)
+        finally:
+            self.uplink.stop()
+
+    # 요약 (lost: 다시 보내지 못한 커밋되지 않은 발화, overrun: 보내기 전에 링 버퍼가 넘쳐 버린 음성)
+    def summary(self) -> str:
+        uplink = self.uplink
+        return (
+            f"connections={self.connections} disconnects={self.disconnects} "
+            f"resent={uplink.resent_bytes / uplink.bytes_per_second:.1f}s "
+            f"lost={uplink.lost_bytes / uplink.bytes_per_second:.1f}s "
+            f"overrun={uplink.ring.overrun_bytes / uplink.bytes_per_second:.1f}s"
+        )
@@ -0,0 +1,229 @@
+import argparse
+import asyncio
+import base64
+import json
+import time
+from dataclasses import dataclass, field
+from urllib.parse import parse_qs, urlparse
+import numpy as np
+import websockets
+
+RATE = 24000  # 실시간 API 음성 샘플링 레이트
+
+# 응답 음성 (짧은 신호음을 반복한 PCM16)
+def make_tone(seconds: float, frequency: float = 440.0) -> bytes:
+    t = np.arange(int(seconds * RATE)) / RATE
+    return (3000 * np.sin(2 * np.pi * frequency * t)).astype(np.int16).tobytes()
+
+# 서버 통계 (벤치마크에서 참조)
+@dataclass
+class ServerStats:
+    connections: int = 0
+    events_received: int = 0
+    audio_bytes_received: int = 0
+    events_sent: int = 0
+    responses: int = 0
+    transcripts: int = 0
+    disconnects: int = 0  # 일부러 끊은 연결 수
+    trigger_times: dict[str, float] = field(default_factory=dict)  # 응답·아이템 ID -> 요청을 받은 시각
+
+# 실시간 API 대역 서버 (이 저장소의 스크립트가 쓰는 이벤트만 흉내 냄)
+# - 대화: response.create를 받거나 turn_seconds만큼 음성이 쌓이면(서버 측 발화 검출 흉내) 응답 음성과 자막 전송
+# - 텍스트 변환(?intent=transcription): turn_seconds만큼 음성이 쌓이거나 커밋되면 변환 결과 전송
+# - 응답 지연, 응답 음성 길이, 음성 전송 속도(실시간 대비 배속)를 설정 가능
+# - disconnect_every를 지정하면 연결마다 그 시간(초)이 지나면 연결을 끊음 (재연결 테스트용 네트워크 장애 흉내)
+class StandInServer:
+    # 초기화
+    def __init__(
+        self,
+        response_latency: float = 0.3,
+        response_seconds: float = 2.0,
+        audio_speed: float = 4.0,
+        chunk_ms: int = 100,
+        turn_seconds: float = 3.0,
+        transcript: str = "안녕하세요 실시간 음성 테스트입니다",
+        disconnect_every: float | None = None,
+    ):
+        self.response_latency = response_latency
+        self.response_seconds = response_seconds
+        self.audio_speed = audio_speed
+        self.chunk_bytes = RATE * 2 * chunk_ms // 1000
+        self.turn_bytes = int(turn_seconds * RATE) * 2
+        self.transcript = transcript
+        self.disconnect_every = disconnect_every
+        self.tone = make_tone(response_seconds)
+        self.stats = ServerStats()
+        self.next_id = 0
+
+    # 새 ID
+    def new_id(self, prefix: str) -> str:
+        self.next_id += 1
+        return f"{prefix}_{self.next_id}"
+
+    # 이벤트 전송
+    async def send(self, websocket, event: dict) -> None:
+        await websocket.send(json.dumps(event, ensure_ascii=False))
+        self.stats.events_sent += 1
+
+    # 응답 전송 (지연 후 음성 델타와 자막 델타를 번갈아 전송)
+    async def respond(self, websocket, received_at: float) -> None:
+        response_id = self.new_id("resp")
+        item_id = self.new_id("item")
+        self.stats.trigger_times[response_id] = received_at
+        self.stats.responses += 1
+        await asyncio.sleep(self.response_latency)
+        await self.send(websocket, {"type": "response.created", "response": {"id": response_id}})
+
+        words = self.transcript.split()
+        chunks = range(0, len(self.tone), self.chunk_bytes)
+        interval = self.chunk_bytes / (RATE * 2) / self.audio_speed
+        for n, start in enumerate(chunks):
+            await self.send(websocket, {
+                "type": "response.audio.delta",
+                "response_id": response_id,
+                "item_id": item_id,
+                "delta": base64.b64encode(self.tone[start : start + self.chunk_bytes]).decode("ascii"),
+            })
+            if n < len(words):
+                await self.send(websocket, {
+                    "type": "response.audio_transcript.delta",
+                    "response_id": response_id,
+                    "item_id": item_id,
+                    "delta": words[n] + " ",
+                })
+            await asyncio.sleep(interval)
+        await self.send(websocket, {"type": "response.audio.done", "response_id": response_id})
+        await self.send(websocket, {
+            "type": "response.audio_transcript.done",
+            "response_id": response_id,
+            "transcript": self.transcript,
+        })
+        await self.send(websocket, {"type": "response.done", "response": {"id": response_id}})
+
+    # 텍스트 변환 결과 전송
+    async def transcribe(self, websocket, received_at: float, item_id: str) -> None:
+        self.stats.trigger_times[item_id] = received_at
+        self.stats.transcripts += 1
+        await asyncio.sleep(self.response_latency)
+        for word in self.transcript.split():
+            await self.send(websocket, {
+                "type": "conversation.item.input_audio_transcription.delta",
+                "item_id": item_id,
+                "delta": word + " ",
+            })
+        await self.send(websocket, {
+            "type": "conversation.item.input_audio_transcription.completed",
+            "item_id": item_id,
+            "transcript": self.transcript,
+        })
+
+    # 연결 처리
+    async def handler(self, websocket) -> None:
+        query = parse_qs(urlparse(websocket.request.path).query)
+        transcription = query.get("intent") == ["transcription"]
+        self.stats.connections += 1
+        buffered = 0  # 커밋되지 않은 음성 바이트 수
+        received = 0  # 이 연결에서 받은 음성 바이트 수 (audio_end_ms 계산용)
+        server_vad = True
+        tasks: set[asyncio.Task] = set()
+
+        # 응답·변환 태스크 시작
+        def start(coroutine) -> None:
+            task = asyncio.create_task(coroutine)
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+
+        # 턴 종료 처리 (음성 버퍼를 확정하고 텍스트 변환 또는 응답 시작)
+        async def end_turn(received_at: float) -> None:
+            item_id = self.new_id("item")
+            await self.send(websocket, {"type": "input_audio_buffer.committed", "item_id": item_id})
+            if transcription:
+                start(self.transcribe(websocket, received_at, item_id))
+            else:
+                start(self.respond(websocket, received_at))
+
+        # 일정 시간 뒤 연결을 끊음 (닫기 핸드셰이크 없이 끊어서 네트워크 장애처럼)
+        async def disconnect_later() -> None:
+            await asyncio.sleep(self.disconnect_every)
+            self.stats.disconnects += 1
+            websocket.transport.abort()
+
+        await self.send(websocket, {
+            "type": "transcription_session.created" if transcription else "session.created"
+        })
+        if self.disconnect_every:
+            start(disconnect_later())
+        try:
+            async for message in websocket:
+                received_at = time.perf_counter()
+                event = json.loads(message)
+                event_type = event.get("type")
+                self.stats.events_received += 1
+                if event_type == "input_audio_buffer.append":
+                    size = len(event.get("audio", "")) * 3 // 4
+                    self.stats.audio_bytes_received += size
+                    buffered += size
+                    received += size
+                    if server_vad and buffered >= self.turn_bytes:
+                        buffered = 0
+                        await self.send(websocket, {
+                            "type": "input_audio_buffer.speech_stopped",
+                            "audio_end_ms": received * 1000 // (RATE * 2),
+                        })
+                        await end_turn(received_at)
+                elif event_type == "input_audio_buffer.commit":
+                    if buffered == 0:
+                        await self.send(websocket, {
+                            "type": "error",
+                            "error": {"type": "invalid_request_error", "message": "buffer too small"},
+                        })
+                        continue
+                    buffered = 0
+                    if transcription:
+                        await end_turn(received_at)
+                    else:
+                        await self.send(websocket, {
+                            "type": "input_audio_buffer.committed", "item_id": self.new_id("item")
+                        })
+                elif event_type == "response.create":
+                    start(self.respond(websocket, received_at))
+                elif event_type in ("session.update", "transcription_session.update"):
+                    session = event.get("session", {})
+                    if "turn_detection" in session:
+                        server_vad = session["turn_detection"] is not None
+                    await self.send(websocket, {"type": event_type.replace("update", "updated")})
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    # 서버 실행
+    async def serve(self, host: str = "127.0.0.1", port: int = 8780) -> None:
+        async with websockets.serve(self.handler, host, port, compression=None, max_size=None):
+            print(f"ws://{host}:{port}/v1/realtime 에서 대기 중")
+            await asyncio.Future()
+
+# main 실행
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1", help="호스트")
+    parser.add_argument("--port", type=int, default=8780, help="포트")
+    parser.add_argument("--latency", type=float, default=0.3, help="응답 지연(초)")
+    parser.add_argument("--response-seconds", type=float, default=2.0, help="응답 음성 길이(초)")
+    parser.add_argument("--audio-speed", type=float, default=4.0, help="응답 음성 전송 속도(실시간 대비 배속)")
+    parser.add_argument("--turn-seconds", type=float, default=3.0, help="서버 측 발화 검출 턴 길이(초)")
+    parser.add_argument("--disconnect-every", type=float, help="연결마다 이 시간(초)이 지나면 연결을 끊음")
+    args = parser.parse_args()
+
+    server = StandInServer(
+        response_latency=args.latency,
+        response_seconds=args.response_seconds,
+        audio_speed=args.audio_speed,
+        turn_seconds=args.turn_seconds,
+        disconnect_every=args.disconnect_every,
+    )
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
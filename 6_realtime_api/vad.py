@@ -0,0 +1,123 @@
+from collections import deque
+from dataclasses import dataclass
+import numpy as np
+
+# VAD 출력 이벤트
+# - kind="audio": 보낼 음성 (offset: 스트림 시작부터의 샘플 위치)
+# - kind="end": 발화 종료 (offset: 종료 위치)
+@dataclass
+class VadEvent:
+    kind: str
+    offset: int
+    audio: bytes = b""
+
+# gate 모드의 서버 측 발화 검출 설정 (session.update의 turn_detection 값)
+# gate 모드는 발화 뒤에 hangover_ms만큼만 묵음을 보내므로, 서버가 턴을 끝내려면
+# silence_duration_ms(기본 500ms)가 그보다 짧아야 함 (길면 턴이 끝나지 않거나 다음 발화와 합쳐짐)
+def gate_turn_detection(vad: "VoiceActivityDetector", margin_ms: int = 100) -> dict:
+    silence_ms = max(vad.frame_ms, vad.hangover_ms - margin_ms)
+    return {"type": "server_vad", "silence_duration_ms": silence_ms}
+
+# 음성 구간 검출기 (에너지 + 영교차율)
+# - 프레임 특징은 NumPy로 한 번에 계산하고, 상태 전이만 프레임 단위로 처리
+# - 큰 프레임은 음성, 조금 작더라도 영교차율이 높으면 마찰음(ㅅ, ㅎ 등)으로 보고 음성
+# - hangover: 음성이 끊긴 뒤에도 잠시 음성으로 유지 (단어 사이 짧은 쉼에서 끊기지 않게)
+# - pre-roll: 묵음 중에도 직전 음성을 보관했다가 발화 시작 시 함께 보냄 (첫 음절이 잘리지 않게)
+class VoiceActivityDetector:
+    # 초기화
+    def __init__(
+        self,
+        sample_rate: int = 24000,
+        frame_ms: int = 20,
+        energy_threshold_db: float = -40.0,
+        fricative_margin_db: float = 10.0,
+        zcr_threshold: float = 0.25,
+        hangover_ms: int = 400,
+        preroll_ms: int = 300,
+    ):
+        self.frame_bytes = sample_rate * frame_ms // 1000 * 2
+        self.frame_ms = frame_ms
+        self.energy_threshold_db = energy_threshold_db
+        self.fricative_margin_db = fricative_margin_db
+        self.zcr_threshold = zcr_threshold
+        self.hangover_frames = max(1, hangover_ms // frame_ms)
+        self.hangover_ms = self.hangover_frames * frame_ms
+        self.preroll: deque[bytes] = deque(maxlen=max(0, preroll_ms // frame_ms))
+        self.remainder = b""  # 프레임 길이에 못 미쳐 다음 호출로 넘기는 부분
+        self.offset = 0  # 다음에 처리할 샘플 위치
+        self.in_speech = False
+        self.hangover_left = 0
+        self.speech_frames = 0
+        self.total_frames = 0
+
+    # 프레임별 음성 여부 (frames: 프레임 수 x 프레임 샘플 수의 int16 배열)
+    def classify(self, frames: np.ndarray) -> np.ndarray:
+        samples = frames.astype(np.float32) / 32768.0
+        power = np.mean(samples * samples, axis=1)
+        energy_db = 10.0 * np.log10(power + 1e-10)
+        signs = np.signbit(frames)
+        zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / (frames.shape[1] - 1)
+        loud = energy_db > self.energy_threshold_db
+        fricative = (energy_db > self.energy_threshold_db - self.fricative_margin_db) & (
+            zcr > self.zcr_threshold
+        )
+        return loud | fricative
+
+    # PCM16 음성 처리 (보낼 음성과 발화 종료 이벤트를 순서대로 반환)
+    def process(self, pcm) -> list[VadEvent]:
+        data = self.remainder + bytes(pcm) if self.remainder else bytes(pcm)
+        usable = len(data) // self.frame_bytes * self.frame_bytes
+        self.remainder = data[usable:]
+        if usable == 0:
+            return []
+        frames = np.frombuffer(data, dtype=np.int16, count=usable // 2).reshape(
+            -1, self.frame_bytes // 2
+        )
+        is_speech = self.classify(frames)
+        self.speech_frames += int(is_speech.sum())
+        self.total_frames += len(is_speech)
+
+        events: list[VadEvent] = []
+        frame_samples = self.frame_bytes // 2
+        run_start = None  # 이번 호출에서 이어서 보내는 구간의 시작 프레임
+        for i, speech in enumerate(is_speech):
+            if self.in_speech:
+                if speech:
+                    self.hangover_left = self.hangover_frames
+                else:
+                    self.hangover_left -= 1
+                    if self.hangover_left <= 0:
+                        # 발화 종료: 지금까지의 구간을 내보내고 종료 이벤트
+                        self.in_speech = False
+                        self._emit_run(events, data, run_start, i + 1)
+                        run_start = None
+                        events.append(VadEvent("end", self.offset + (i + 1) * frame_samples))
+                continue
+            if speech:
+                # 발화 시작: pre-roll을 먼저 내보내고 구간 시작
+                self.in_speech = True
+                self.hangover_left = self.hangover_frames
+                if self.preroll:
+                    start = self.offset + i * frame_samples - len(self.preroll) * frame_samples
+                    events.append(VadEvent("audio", start, b"".join(self.preroll)))
+                    self.preroll.clear()
+                run_start = i
+            else:
+                self.preroll.append(data[i * self.frame_bytes : (i + 1) * self.frame_bytes])
+        if self.in_speech:
+            self._emit_run(events, data, run_start if run_start is not None else 0, len(is_speech))
+        self.offset += len(is_speech) * frame_samples
+        return events
+
+    # 연속된 음성 프레임 구간을 하나의 이벤트로 추가
+    def _emit_run(self, events: list[VadEvent], data: bytes, start: int | None, stop: int) -> None:
+        if start is None:
+            start = 0
+        if stop > start:
+            events.append(
+                VadEvent(
+                    "audio",
+                    self.offset + start * self.frame_bytes // 2,
+                    data[start * self.frame_bytes : stop * self.frame_bytes],
+                )
+            )
@@ -0,0 +1,169 @@
+import argparse
+import tempfile
+import wave
+from pathlib import Path
+import numpy as np
+from vad import VoiceActivityDetector
+
+RATE = 24000  # 실시간 API 입력 샘플링 레이트
+
+# WAV 파일 읽기 (모노 PCM16 24kHz로 변환)
+def read_wav(path: Path) -> np.ndarray:
+    with wave.open(str(path), "rb") as f:
+        assert f.getsampwidth() == 2, "PCM16 WAV만 지원합니다."
+        channels = f.getnchannels()
+        rate = f.getframerate()
+        samples = np.frombuffer(f.readframes(f.getnframes()), dtype=np.int16)
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1).astype(np.int16)
+    if rate != RATE:
+        positions = np.arange(0, len(samples), rate / RATE)
+        samples = np.interp(positions, np.arange(len(samples)), samples).astype(np.int16)
+    return samples
+
+# WAV 파일 쓰기
+def write_wav(path: Path, samples: np.ndarray) -> None:
+    with wave.open(str(path), "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(RATE)
+        f.writeframes(samples.astype(np.int16).tobytes())
+
+# 정답 발화 시작 시각 읽기 (<이름>.onsets.txt, 한 줄에 초 단위 시각 하나)
+def read_onsets(path: Path) -> list[float] | None:
+    label = path.with_suffix(".onsets.txt")
+    if not label.exists():
+        return None
+    return [float(line) for line in label.read_text().split()]
+
+# 합성 음성 파일 생성 (배경 잡음 + 마찰음으로 시작하는 유성음 발화, 발화 시작 시각을 함께 저장)
+def make_synthetic(directory: Path, count: int, seconds: float, seed: int) -> list[Path]:
+    rng = np.random.default_rng(seed)
+    paths = []
+    for n in range(count):
+        total = int(seconds * RATE)
+        signal = rng.normal(0, 10 ** (-60 / 20), total)  # 약 -60dB 배경 잡음
+        onsets = []
+        position = int(rng.uniform(0.5, 2.0) * RATE)
+        while position < total - RATE:
+            length = int(rng.uniform(0.6, 2.5) * RATE)
+            length = min(length, total - position)
+            t = np.arange(length) / RATE
+            f0 = rng.uniform(110, 220)
+            voiced = sum(np.sin(2 * np.pi * f0 * k * t) / k for k in range(1, 6))
+            envelope = 0.5 + 0.5 * np.sin(2 * np.pi * rng.uniform(3, 5) * t) ** 2  # 음절 단위 강약
+            utterance = 0.1 * voiced * envelope
+
+            # 절반은 작은 마찰음(고주파 잡음)으로 시작 (에너지만 보면 놓치기 쉬운 시작)
+            if rng.random() < 0.5:
+                fricative = int(0.08 * RATE)
+                noise = np.diff(rng.normal(0, 1, fricative + 1)) * 10 ** (-42 / 20)
+                utterance[:fricative] = noise
+            signal[position : position + length] += utterance
+            onsets.append(position / RATE)
+            position += length + int(rng.uniform(0.8, 3.0) * RATE)
+
+        path = directory / f"synthetic_{n}.wav"
+        write_wav(path, np.clip(signal * 32767, -32768, 32767))
+        path.with_suffix(".onsets.txt").write_text("\n".join(f"{onset:.4f}" for onset in onsets))
+        paths.append(path)
+    return paths
+
+# 파일 하나 재생 (send_interval 단위로 VAD에 넣고 보낸 바이트와 검출한 발화 시작 위치 반환)
+def replay(samples: np.ndarray, send_interval: float, **vad_options) -> tuple[int, list[float]]:
+    vad = VoiceActivityDetector(sample_rate=RATE, **vad_options)
+    step = int(send_interval * RATE)
+    data = samples.tobytes()
+    sent = 0
+    onsets = []
+    in_segment = False
+    for start in range(0, len(data), step * 2):
+        for event in vad.process(data[start : start + step * 2]):
+            if event.kind == "audio":
+                if not in_segment:
+                    onsets.append(event.offset / RATE)
+                    in_segment = True
+                sent += len(event.audio)
+            else:
+                in_segment = False
+    return sent, onsets
+
+# 발화 시작 정확도 (정답마다 tolerance 안에 검출 시작이 있는지, 보낸 음성이 정답 시작보다 늦게 시작했는지)
+def score_onsets(reference: list[float], detected: list[float], tolerance: float) -> dict:
+    matched = 0
+    clipped = 0
+    leads = []
+    used = set()
+    for onset in reference:
+        candidates = [
+            (abs(d - onset), i) for i, d in enumerate(detected)
+            if i not in used and d - tolerance <= onset <= d + tolerance + 1.0
+        ]
+        if not candidates:
+            continue
+        _, i = min(candidates)
+        used.add(i)
+        matched += 1
+        lead = onset - detected[i]  # 양수면 정답 시작보다 앞에서부터 보냄
+        leads.append(lead)
+        if lead < 0:
+            clipped += 1
+    return {
+        "matched": matched,
+        "clipped": clipped,
+        "false": len(detected) - len(used),
+        "mean_lead_ms": float(np.mean(leads) * 1000) if leads else 0.0,
+    }
+
+# main 실행
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("files", nargs="*", help="WAV 파일 (같은 이름의 .onsets.txt가 있으면 정확도도 계산)")
+    parser.add_argument("--synthetic", type=int, default=5, help="파일을 지정하지 않았을 때 만들 합성 파일 수")
+    parser.add_argument("--seconds", type=float, default=30.0, help="합성 파일 길이(초)")
+    parser.add_argument("--send-interval", type=float, default=0.1, help="송신 간격(초)")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="발화 시작 허용 오차(초)")
+    parser.add_argument("--threshold-db", type=float, default=-40.0, help="에너지 임계값(dB)")
+    parser.add_argument("--hangover-ms", type=int, default=400, help="행오버(ms)")
+    parser.add_argument("--preroll-ms", type=int, default=300, help="프리롤(ms)")
+    parser.add_argument("--seed", type=int, default=0, help="합성 난수 시드")
+    args = parser.parse_args()
+
+    if args.files:
+        paths = [Path(path) for path in args.files]
+    else:
+        paths = make_synthetic(Path(tempfile.mkdtemp()), args.synthetic, args.seconds, args.seed)
+
+    options = {
+        "energy_threshold_db": args.threshold_db,
+        "hangover_ms": args.hangover_ms,
+        "preroll_ms": args.preroll_ms,
+    }
+    total_bytes = total_sent = 0
+    totals = {"reference": 0, "matched": 0, "clipped": 0, "false": 0}
+    for path in paths:
+        samples = read_wav(path)
+        sent, detected = replay(samples, args.send_interval, **options)
+        total_bytes += samples.nbytes
+        total_sent += sent
+        line = f"{path.name}: sent={sent}/{samples.nbytes} ({sent / samples.nbytes:.0%})  onsets={len(detected)}"
+        reference = read_onsets(path)
+        if reference is not None:
+            score = score_onsets(reference, detected, args.tolerance)
+            totals["reference"] += len(reference)
+            for key in ("matched", "clipped", "false"):
+                totals[key] += score[key]
+            line += (
+                f"  matched={score['matched']}/{len(reference)} clipped={score['clipped']} "
+                f"false={score['false']} lead={score['mean_lead_ms']:.0f}ms"
+            )
+        print(line)
+
+    # 모드별 송신량 (off: 전부, gate/commit: VAD 통과분)
+    print(f"off:         bytes sent={total_bytes}")
+    print(f"gate/commit: bytes sent={total_sent} ({total_sent / total_bytes:.0%} of off)")
+    if totals["reference"]:
+        print(
+            f"onsets: matched={totals['matched']}/{totals['reference']} "
+            f"clipped={totals['clipped']} false={totals['false']}"
+        )
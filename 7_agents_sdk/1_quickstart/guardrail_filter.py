@@ -0,0 +1,316 @@
+from __future__ import annotations
+import json
+import math
+import os
+import re
+import time
+import unicodedata
+from collections import Counter, OrderedDict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+
+# 판정 결과 (is_homework=True이면 허용)
+@dataclass
+class Verdict:
+    is_homework: bool
+    reasoning: str
+    source: str  # "cache", "local", "llm"
+
+# 캐시 키용 정규화 (유니코드 정규화, 소문자화, 공백·문장부호 정리)
+def normalize_prompt(text: str) -> str:
+    text = unicodedata.normalize("NFKC", text).lower()
+    text = re.sub(r"[?!.,~…]+", " ", text)
+    return " ".join(text.split())
+
+# 문자 n-gram (공백 제거 후 1~3-gram)
+def char_ngrams(text: str, sizes: tuple[int, ...] = (1, 2, 3)) -> list[str]:
+    text = "".join(normalize_prompt(text).split())
+    return [text[i : i + n] for n in sizes for i in range(len(text) - n + 1)]
+
+# 판정 캐시 (LRU + TTL, path를 지정하면 JSON 파일로 저장·복원)
+class VerdictCache:
+    # 초기화
+    def __init__(self, max_entries: int = 10000, ttl: float | None = 86400.0, path: str | None = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.path = path
+        self.entries: OrderedDict[str, tuple[float, bool, str]] = OrderedDict()  # 키 -> (저장 시각, 판정, 이유)
+        if path and os.path.exists(path):
+            self.load()
+
+    # 조회 (없거나 만료되면 None)
+    def get(self, text: str) -> Verdict | None:
+        key = normalize_prompt(text)
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        saved_at, is_homework, reasoning = entry
+        if self.ttl is not None and time.time() - saved_at > self.ttl:
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return Verdict(is_homework, reasoning, "cache")
+
+    # 저장 (가득 차면 가장 오래 사용하지 않은 항목부터 제거)
+    def put(self, text: str, verdict: Verdict) -> None:
+        key = normalize_prompt(text)
+        self.entries[key] = (time.time(), verdict.is_homework, verdict.reasoning)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    # 파일에서 읽기
+    def load(self) -> None:
+        with open(self.path, encoding="utf-8") as f:
+            for key, saved_at, is_homework, reasoning in json.load(f):
+                self.entries[key] = (saved_at, is_homework, reasoning)
+
+    # 파일로 저장 (임시 파일에 쓴 뒤 교체)
+    def save(self) -> None:
+        if not self.path:
+            return
+        rows = [[key, *entry] for key, entry in self.entries.items()]
+        with open(self.path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(rows, f, ensure_ascii=False)
+        os.replace(self.path + ".tmp", self.path)
+
+# 수학·역사 키워드 (어절 첫머리에 있으면 숙제일 가능성이 높음, 확정하지 않고 LLM으로 넘김)
+# 다른 단어의 일부로 흔히 쓰이는 짧은 말(로그, 세기, 소수, 계산, 증명, 전쟁 등)은 넣지 않음
+MATH_KEYWORDS = [
+    "수학", "방정식", "미분", "적분", "함수", "확률", "통계", "삼각형", "피타고라스", "분수",
+    "인수분해", "넓이", "부피", "수열", "행렬", "제곱근", "무리수",
+]
+HOMEWORK_KEYWORDS = MATH_KEYWORDS + [
+    "역사", "조선", "고려", "신라", "고구려", "백제", "임진왜란", "세계대전", "독립운동",
+    "혁명", "왕조", "황제", "제국", "식민지",
+]
+
+# 수식의 항 (숫자, 문자 변수, 계수가 붙은 변수, 거듭제곱)
+_TERM = r"(?:\d+(?:\.\d+)?[a-z]?|[a-z])(?:\^\d+)?"
+_OPERATOR = r"[-+*/×÷^]"
+# 항과 연산자가 번갈아 나오는 식
+EXPRESSION = re.compile(rf"(?<![\w.]){_TERM}(?:\s*{_OPERATOR}\s*{_TERM})+(?![\w.])")
+# 수식이 아닌 숫자 나열 (전화번호, 날짜)
+NOT_EXPRESSION = re.compile(r"\d{2,4}-\d{3,4}-\d{4}|\d{4}[-./]\d{1,2}[-./]\d{1,2}")
+
+# 수식 판정 (숫자가 든 식 뒤에 =가 있거나, 문장에 수학 키워드가 있을 때만)
+# "a-b-c 팀", "1/2/3"처럼 연산자만 섞인 표기는 수식으로 보지 않음
+def has_expression(text: str) -> bool:
+    text = NOT_EXPRESSION.sub(" ", unicodedata.normalize("NFKC", text).lower())
+    words = normalize_prompt(text).split()
+    math_keyword = any(word.startswith(keyword) for keyword in MATH_KEYWORDS for word in words)
+    for match in EXPRESSION.finditer(text):
+        if not re.search(r"\d", match.group()):
+            continue
+        if math_keyword or re.match(r"\s*=", text[match.end() :]):
+            return True
+    return False
+
+# 분류기 초기 학습 데이터 (True=숙제)
+SEED_EXAMPLES = [
+    ("2x + 3 = 7을 풀어 주세요", True),
+    ("12의 약수를 모두 구하세요", True),
+    ("원의 넓이 구하는 공식이 뭐예요?", True),
+    ("이차방정식 근의 공식을 설명해 주세요", True),
+    ("3/4 + 1/2는 얼마인가요?", True),
+    ("세종대왕은 어떤 업적을 남겼나요?", True),
+    ("프랑스 혁명이 일어난 이유는?", True),
+    ("임진왜란은 언제 일어났나요?", True),
+    ("로마 제국은 왜 멸망했나요?", True),
+    ("1차 세계대전의 원인을 알려 주세요", True),
+    ("오늘 저녁 메뉴 추천해 줘", False),
+    ("좋은 노트북 추천해 주세요", False),
+    ("영화 볼 만한 거 있어?", False),
+    ("인생의 의미는 무엇인가요?", False),
+    ("날씨가 어때요?", False),
+    ("파이썬으로 웹 서버 만드는 법", False),
+    ("여행 가기 좋은 곳 알려 줘", False),
+    ("운동을 꾸준히 하는 방법은?", False),
+    ("강아지 이름 지어 줘", False),
+    ("요즘 인기 있는 노래 뭐야?", False),
+]
+
+# 로컬 1차 분류기 (수식 규칙 + 키워드 + 문자 n-gram 나이브 베이즈)
+# - 수식이 있으면 숙제로 확정
+# - 키워드가 있으면 확정하지 않고 LLM으로 넘김 (키워드는 나이브 베이즈 판정을 막는 역할만 함)
+# - 나이브 베이즈는 min_examples개 이상 학습한 뒤에만, 확률이 threshold 이상일 때만 확정 (애매하면 None)
+# - 잘못 거부하는 쪽이 더 나쁘므로 거부는 deny_threshold로 더 엄격하게 확정
+# - path를 지정하면 학습한 예시를 JSON 파일로 저장·복원 (실행을 거듭하며 min_examples에 도달)
+class LocalClassifier:
+    # 초기화
+    def __init__(
+        self,
+        examples: list[tuple[str, bool]] | None = None,
+        keywords: list[str] | None = None,
+        threshold: float = 0.99,
+        deny_threshold: float = 0.999,
+        min_examples: int = 100,
+        path: str | None = None,
+    ):
+        self.keywords = [normalize_prompt(k) for k in (keywords if keywords is not None else HOMEWORK_KEYWORDS)]
+        self.threshold = threshold
+        self.deny_threshold = deny_threshold
+        self.min_examples = min_examples
+        self.path = path
+        self.counts = {True: Counter(), False: Counter()}
+        self.totals = {True: 0, False: 0}
+        self.docs = {True: 0, False: 0}
+        self.learned: dict[str, bool] = {}  # 학습한 예시 (정규화한 문장 -> 판정), 파일 저장 대상
+        for text, label in examples if examples is not None else SEED_EXAMPLES:
+            self._count(text, label)
+        if path and os.path.exists(path):
+            self.load()
+
+    # 빈도 누적
+    def _count(self, text: str, is_homework: bool) -> None:
+        tokens = char_ngrams(text)
+        self.counts[is_homework].update(tokens)
+        self.totals[is_homework] += len(tokens)
+        self.docs[is_homework] += 1
+
+    # 예시 하나 학습 (LLM 판정 결과로 점진 학습 가능, 같은 문장은 한 번만)
+    def learn(self, text: str, is_homework: bool) -> None:
+        key = normalize_prompt(text)
+        if key in self.learned:
+            return
+        self.learned[key] = is_homework
+        self._count(key, is_homework)
+
+    # 파일에서 읽기
+    def load(self) -> None:
+        with open(self.path, encoding="utf-8") as f:
+            for text, is_homework in json.load(f):
+                self.learn(text, is_homework)
+
+    # 파일로 저장 (임시 파일에 쓴 뒤 교체)
+    def save(self) -> None:
+        if not self.path:
+            return
+        with open(self.path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(list(self.learned.items()), f, ensure_ascii=False)
+        os.replace(self.path + ".tmp", self.path)
+
+    # 숙제일 확률 (라플라스 평활화)
+    def probability(self, text: str) -> float:
+        vocabulary = len(self.counts[True].keys() | self.counts[False].keys()) + 1
+        total_docs = self.docs[True] + self.docs[False]
+        log_prob = {}
+        for label in (True, False):
+            log_prob[label] = math.log((self.docs[label] + 1) / (total_docs + 2))
+            denominator = self.totals[label] + vocabulary
+            for token in char_ngrams(text):
+                log_prob[label] += math.log((self.counts[label][token] + 1) / denominator)
+        diff = log_prob[False] - log_prob[True]
+        return 1 / (1 + math.exp(min(diff, 700)))
+
+    # 어절 첫머리에 나오는 키워드 (없으면 None)
+    def find_keyword(self, text: str) -> str | None:
+        words = normalize_prompt(text).split()
+        for keyword in self.keywords:
+            if any(word.startswith(keyword) for word in words):
+                return keyword
+        return None
+
+    # 판정 (확신이 없으면 None)
+    def classify(self, text: str) -> Verdict | None:
+        if has_expression(text):
+            return Verdict(True, "수식 포함", "local")
+        if self.find_keyword(text) is not None:
+            return None
+        if self.docs[True] + self.docs[False] < self.min_examples:
+            return None
+        probability = self.probability(text)
+        if probability >= self.threshold:
+            return Verdict(True, f"로컬 분류기 확률 {probability:.2f}", "local")
+        if probability <= 1 - self.deny_threshold:
+            return Verdict(False, f"로컬 분류기 확률 {probability:.2f}", "local")
+        return None
+
+# 가드레일 필터 통계
+@dataclass
+class FilterStats:
+    requests: int = 0
+    cache_hits: int = 0
+    local_hits: int = 0
+    escalations: int = 0
+
+    # 한 줄 요약
+    def summary(self) -> str:
+        return (
+            f"requests={self.requests} cache_hits={self.cache_hits} "
+            f"local_hits={self.local_hits} escalations={self.escalations}"
+        )
+
+# 가드레일 필터 (캐시 -> 로컬 분류기 -> LLM 순으로 판정)
+@dataclass
+class GuardrailFilter:
+    cache: VerdictCache = field(default_factory=VerdictCache)
+    classifier: LocalClassifier | None = field(default_factory=LocalClassifier)
+    learn_from_llm: bool = True  # LLM 판정을 로컬 분류기에 추가 학습
+    stats: FilterStats = field(default_factory=FilterStats)
+
+    # 판정 (llm_check: 애매할 때만 호출하는 LLM 판정 함수)
+    async def check(self, text: str, llm_check: Callable[[], Awaitable[Verdict]]) -> Verdict:
+        self.stats.requests += 1
+        verdict = self.cache.get(text)
+        if verdict is not None:
+            self.stats.cache_hits += 1
+            return verdict
+
+        verdict = self.classifier.classify(text) if self.classifier else None
+        if verdict is not None:
+            self.stats.local_hits += 1
+        else:
+            self.stats.escalations += 1
+            verdict = await llm_check()
+            if self.learn_from_llm and self.classifier:
+                self.classifier.learn(text, verdict.is_homework)
+        self.cache.put(text, verdict)
+        return verdict
+
+# 오프라인 확인 (LLM 대신 정답표를 쓰는 가짜 판정으로 캐시·로컬 처리 비율 측정)
+if __name__ == "__main__":
+    import argparse
+    import asyncio
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=3, help="같은 질문 반복 횟수")
+    parser.add_argument("--threshold", type=float, default=0.99, help="로컬 확정 확률")
+    args = parser.parse_args()
+
+    labeled = [
+        ("피타고라스 정리를 증명해 주세요", True),
+        ("x^2 - 5x + 6 = 0의 해는?", True),
+        ("삼국 통일은 어떻게 이루어졌나요", True),
+        ("나폴레옹은 누구인가요?", True),
+        ("루트 2는 무리수인가요?", True),
+        ("맛있는 김치찌개 끓이는 법", False),
+        ("주말에 뭐 하지?", False),
+        ("내 이메일 비밀번호를 잊어버렸어요", False),
+        ("고양이가 밥을 안 먹어요", False),
+        ("축구 경기 결과 알려 줘", False),
+    ]
+    answers = {normalize_prompt(text): label for text, label in labeled}
+
+    guardrail = GuardrailFilter(classifier=LocalClassifier(threshold=args.threshold))
+
+    # 가짜 LLM 판정
+    def fake_llm(text: str) -> Callable[[], Awaitable[Verdict]]:
+        async def check() -> Verdict:
+            return Verdict(answers[normalize_prompt(text)], "정답표", "llm")
+        return check
+
+    async def run() -> None:
+        correct = 0
+        total = 0
+        for _ in range(args.repeat):
+            for text, label in labeled:
+                # 반복 시 표기만 다른 입력도 캐시에 걸리는지 확인
+                variant = text if total < len(labeled) else f"  {text.upper()}?? "
+                verdict = await guardrail.check(variant, fake_llm(variant))
+                correct += verdict.is_homework == label
+                total += 1
+        print(guardrail.stats.summary())
+        print(f"accuracy={correct}/{total}")
+
+    asyncio.run(run())
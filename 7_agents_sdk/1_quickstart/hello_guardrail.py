@@ -1,7 +1,17 @@
-from agents import Agent, InputGuardrail, GuardrailFunctionOutput, Runner
+from agents import (
+    Agent,
+    InputGuardrail,
+    InputGuardrailTripwireTriggered,
+    GuardrailFunctionOutput,
+    RunContextWrapper,
+    Runner,
+)
 from pydantic import BaseModel
 import asyncio
 import argparse
+import sys
+from pathlib import Path
+from guardrail_filter import GuardrailFilter, LocalClassifier, Verdict, VerdictCache
 
 # 수학 튜터 에이전트 정의
 math_tutor_agent = Agent(
@@ -35,11 +45,23 @@ guardrail_agent = Agent(
     output_type=HomeworkOutput,
 )
 
+# 가드레일 필터 (판정 캐시 + 로컬 1차 분류기, 애매한 질문만 가드레일 에이전트로 판정)
+guardrail_filter = GuardrailFilter()
+
 # 가드레일 함수 정의
 async def homework_guardrail(ctx, agent, input_data):
     # 가드레일 에이전트로 판정
-    result = await Runner.run(guardrail_agent, input_data, context=ctx.context)
-    final_output = result.final_output_as(HomeworkOutput)
+    async def llm_check():
+        result = await Runner.run(guardrail_agent, input_data, context=ctx.context)
+        output = result.final_output_as(HomeworkOutput)
+        return Verdict(output.is_homework, output.reasoning, "llm")
+
+    # 문자열 입력만 캐시·로컬 판정 (대화 이력 입력은 항상 에이전트로 판정)
+    if isinstance(input_data, str):
+        verdict = await guardrail_filter.check(input_data, llm_check)
+    else:
+        verdict = await llm_check()
+    final_output = HomeworkOutput(is_homework=verdict.is_homework, reasoning=verdict.reasoning)
 
     # GuardrailFunctionOutput 타입으로 반환
     return GuardrailFunctionOutput(
@@ -57,14 +79,49 @@ triage_agent = Agent(
     ],
 )
 
-# main
-async def main(prompts: list[str]):
-    for prompt in prompts:
+# 가드레일을 뺀 트리아지 에이전트 (낙관적 실행에서 가드레일과 동시에 실행)
+speculative_triage_agent = triage_agent.clone(input_guardrails=[])
+
+# 낙관적 실행
+# - 트리아지·핸드오프 실행을 가드레일과 동시에 시작
+# - 결과는 모든 가드레일이 통과할 때까지 보류하고, 지뢰가 터지면 실행을 즉시 취소
+async def run_optimistic(prompt: str):
+    context = RunContextWrapper(context=None)
+    run_task = asyncio.create_task(Runner.run(speculative_triage_agent, prompt))
+    guardrail_tasks = [
+        asyncio.create_task(guardrail.run(triage_agent, prompt, context))
+        for guardrail in triage_agent.input_guardrails
+    ]
+    try:
+        for next_done in asyncio.as_completed(guardrail_tasks):
+            guardrail_result = await next_done
+            if guardrail_result.output.tripwire_triggered:
+                raise InputGuardrailTripwireTriggered(guardrail_result)
+        return await run_task
+    finally:
+        # 끝난 태스크는 취소해도 영향 없음
+        run_task.cancel()
+        for task in guardrail_tasks:
+            task.cancel()
+
+# 질문 하나 처리 (출력할 문자열 반환)
+async def answer(prompt: str, semaphore: asyncio.Semaphore, optimistic: bool) -> str:
+    async with semaphore:
         try:
-            result = await Runner.run(triage_agent, prompt)
-            print(result.final_output)
+            if optimistic:
+                result = await run_optimistic(prompt)
+            else:
+                result = await Runner.run(triage_agent, prompt)
+            return str(result.final_output)
         except Exception as e:
-            print("오류:", e)
+            return f"오류: {e}"
+
+# main (최대 concurrency개씩 동시에 처리하고, 출력은 입력 순서대로)
+async def main(prompts: list[str], concurrency: int = 4, optimistic: bool = False):
+    semaphore = asyncio.Semaphore(concurrency)
+    tasks = [asyncio.create_task(answer(prompt, semaphore, optimistic)) for prompt in prompts]
+    for task in tasks:
+        print(await task)
 
 # main 실행
 if __name__ == "__main__":
@@ -75,7 +132,45 @@ if __name__ == "__main__":
         nargs="+",
         help="질문문",
     )
+    parser.add_argument(
+        "--metrics",
+        help="지표 출력 파일 (.prom이면 Prometheus 텍스트, 그 외는 JSON)",
+    )
+    parser.add_argument("--verdict-cache", help="가드레일 판정 캐시 파일 (JSON)")
+    parser.add_argument("--classifier-data", help="로컬 분류기가 학습한 예시 파일 (JSON)")
+    parser.add_argument(
+        "--no-prefilter",
+        action="store_true",
+        help="로컬 1차 분류기를 끄고 캐시에 없는 질문은 모두 에이전트로 판정",
+    )
+    parser.add_argument("--threshold", type=float, default=0.99, help="로컬 분류기 확정 확률")
+    parser.add_argument("--concurrency", type=int, default=4, help="동시에 처리할 질문 수")
+    parser.add_argument(
+        "--optimistic",
+        action="store_true",
+        help="트리아지를 가드레일과 동시에 실행 (가드레일이 통과해야 결과 출력)",
+    )
     args = parser.parse_args()
 
+    # 가드레일 필터 설정
+    guardrail_filter.cache = VerdictCache(path=args.verdict_cache)
+    guardrail_filter.classifier = (
+        None if args.no_prefilter else LocalClassifier(threshold=args.threshold, path=args.classifier_data)
+    )
+
+    # 지표 수집
+    if args.metrics:
+        sys.path.append(str(Path(__file__).resolve().parents[1]))
+        from agent_metrics import dump_metrics, install_metrics
+        metrics = install_metrics()
+
     # main 실행
-    asyncio.run(main(args.prompts))
\ No newline at end of file
+    asyncio.run(main(args.prompts, args.concurrency, args.optimistic))
+    guardrail_filter.cache.save()
+    if guardrail_filter.classifier:
+        guardrail_filter.classifier.save()
+    print("가드레일:", guardrail_filter.stats.summary())
+
+    # 지표 저장
+    if args.metrics:
+        dump_metrics(metrics, args.metrics)
\ No newline at end of file
@@ -1,6 +1,8 @@
 from agents import Agent, Runner
 import asyncio
 import argparse
+import sys
+from pathlib import Path
 
 # 수학 튜터 에이전트 정의
 math_tutor_agent = Agent(
@@ -47,7 +49,21 @@ if __name__ == "__main__":
         nargs="+",
         help="질문문",
     )
+    parser.add_argument(
+        "--metrics",
+        help="지표 출력 파일 (.prom이면 Prometheus 텍스트, 그 외는 JSON)",
+    )
     args = parser.parse_args()
 
+    # 지표 수집
+    if args.metrics:
+        sys.path.append(str(Path(__file__).resolve().parents[1]))
+        from agent_metrics import dump_metrics, install_metrics
+        metrics = install_metrics()
+
     # main 실행
-    asyncio.run(main(args.prompts))
\ No newline at end of file
+    asyncio.run(main(args.prompts))
+
+    # 지표 저장
+    if args.metrics:
+        dump_metrics(metrics, args.metrics)
\ No newline at end of file
@@ -0,0 +1,73 @@
+import argparse
+import random
+import time
+from .faq import FaqEntry, FaqIndex
+
+# 한글 음절 (합성 FAQ 생성용)
+SYLLABLES = [chr(code) for code in range(0xAC00, 0xAC00 + 400)]
+
+# 임의의 단어
+def random_word(rng: random.Random) -> str:
+    return "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+
+# 합성 FAQ 코퍼스 (실제 FAQ + 임의 항목)
+def synthetic_corpus(size: int, seed: int) -> list[FaqEntry]:
+    rng = random.Random(seed)
+    entries = list(FaqIndex.load().entries)
+    while len(entries) < size:
+        words = [random_word(rng) for _ in range(12)]
+        entries.append(
+            FaqEntry(
+                question=" ".join(words[:5]) + "?",
+                answer=" ".join(words[5:]) + ".",
+                keywords=words[:2],
+            )
+        )
+    return entries
+
+# 기존 방식: 항목마다 키워드 부분 문자열 검사 (if/elif 체인을 일반화한 선형 탐색)
+def linear_lookup(entries: list[FaqEntry], question: str) -> FaqEntry | None:
+    for entry in entries:
+        if any(keyword in question for keyword in entry.keywords):
+            return entry
+    return None
+
+# 평균 조회 시간(ms)
+def measure(func, queries: list[str]) -> float:
+    start = time.perf_counter()
+    for query in queries:
+        func(query)
+    return (time.perf_counter() - start) / len(queries) * 1000
+
+# 벤치마크 실행
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000, 30000])
+    parser.add_argument("--queries", type=int, default=200, help="조회 횟수")
+    parser.add_argument("--seed", type=int, default=0, help="난수 시드")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    for size in args.sizes:
+        entries = synthetic_corpus(size, args.seed)
+        start = time.perf_counter()
+        index = FaqIndex(entries)
+        build_time = time.perf_counter() - start
+
+        # 실제 질문 형태의 쿼리 (일부는 임의 항목의 키워드 포함, 일부는 일치 없음)
+        queries = []
+        for _ in range(args.queries):
+            entry = rng.choice(entries)
+            queries.append(f"{entry.keywords[0]} 관련해서 {random_word(rng)} 알려주세요")
+        queries += ["가방은 몇 개까지 되나요?", "와이파이 있나요?", "오늘 날씨 어때요?"]
+
+        linear_ms = measure(lambda q: linear_lookup(entries, q), queries)
+        index_ms = measure(lambda q: index.search(q, k=1), queries)
+        agree = sum(
+            (linear_lookup(entries, q) is not None) == bool(index.search(q, k=1)) for q in queries
+        )
+        print(
+            f"entries={size:>6}  build={build_time:.2f}s  "
+            f"linear={linear_ms:.3f}ms  index={index_ms:.3f}ms  "
+            f"speedup={linear_ms / index_ms:.1f}x  found-agreement={agree}/{len(queries)}"
+        )
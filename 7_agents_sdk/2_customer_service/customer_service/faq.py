@@ -0,0 +1,201 @@
+from __future__ import annotations
+import heapq
+import json
+import math
+import threading
+import unicodedata
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from pathlib import Path
+
+# 기본 FAQ 데이터 파일
+FAQ_PATH = Path(__file__).with_name("faq.json")
+
+# 검색용 정규화 (유니코드 정규화, 소문자화)
+def normalize(text: str) -> str:
+    return unicodedata.normalize("NFKC", text).lower()
+
+# 문자 n-gram 토큰 (공백 제거 후 2-gram, 3-gram)
+def char_ngrams(text: str, sizes: tuple[int, ...] = (2, 3)) -> list[str]:
+    text = "".join(normalize(text).split())
+    return [text[i : i + n] for n in sizes for i in range(len(text) - n + 1)]
+
+# FAQ 항목
+@dataclass
+class FaqEntry:
+    question: str
+    answer: str
+    keywords: list[str] = field(default_factory=list)
+
+# 검색 결과
+@dataclass
+class FaqMatch:
+    entry: FaqEntry
+    score: float
+    keyword_hits: int
+
+# Aho-Corasick 키워드 오토마톤 (입력 길이에 비례하는 시간에 모든 키워드를 한 번에 찾음)
+class KeywordAutomaton:
+    # 초기화
+    def __init__(self):
+        self.goto: list[dict[str, int]] = [{}]
+        self.fail: list[int] = [0]
+        self.outputs: list[list[int]] = [[]]
+
+    # 키워드 추가 (value: 키워드가 가리키는 항목 번호)
+    def add(self, keyword: str, value: int) -> None:
+        node = 0
+        for char in normalize(keyword):
+            if char not in self.goto[node]:
+                self.goto.append({})
+                self.fail.append(0)
+                self.outputs.append([])
+                self.goto[node][char] = len(self.goto) - 1
+            node = self.goto[node][char]
+        self.outputs[node].append(value)
+
+    # 실패 링크 계산 (키워드를 모두 추가한 뒤 호출)
+    def build(self) -> None:
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self.goto[node].items():
+                queue.append(child)
+                fallback = self.fail[node]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(char, 0)
+                self.outputs[child] = self.outputs[child] + self.outputs[self.fail[child]]
+
+    # 텍스트에서 찾은 키워드의 항목 번호별 횟수
+    def search(self, text: str) -> dict[int, int]:
+        hits: dict[int, int] = {}
+        node = 0
+        for char in normalize(text):
+            while node and char not in self.goto[node]:
+                node = self.fail[node]
+            node = self.goto[node].get(char, 0)
+            for value in self.outputs[node]:
+                hits[value] = hits.get(value, 0) + 1
+        return hits
+
+# FAQ 검색 인덱스 (키워드 오토마톤 + 문자 n-gram BM25 역색인)
+class FaqIndex:
+    # 초기화 (인덱스 사전 계산)
+    def __init__(
+        self,
+        entries: list[FaqEntry],
+        keyword_weight: float = 10.0,
+        k1: float = 1.2,
+        b: float = 0.75,
+        max_df_ratio: float = 0.5,
+    ):
+        self.entries = entries
+        self.keyword_weight = keyword_weight
+        self.k1 = k1
+        self.b = b
+
+        # 키워드 오토마톤
+        self.automaton = KeywordAutomaton()
+        for i, entry in enumerate(entries):
+            for keyword in entry.keywords:
+                self.automaton.add(keyword, i)
+        self.automaton.build()
+
+        # 질문과 답변의 n-gram 역색인 (토큰 -> [(항목 번호, 빈도)])
+        postings: dict[str, dict[int, int]] = {}
+        self.doc_lengths: list[int] = []
+        for i, entry in enumerate(entries):
+            tokens = char_ngrams(entry.question + " " + entry.answer)
+            self.doc_lengths.append(len(tokens))
+            for token, tf in Counter(tokens).items():
+                postings.setdefault(token, {})[i] = tf
+        num_docs = max(1, len(entries))
+        self.avg_length = sum(self.doc_lengths) / num_docs
+
+        # 토큰별 IDF와 (항목 번호, BM25 가중치) 리스트를 미리 계산
+        # 너무 흔한 토큰은 점수에 거의 기여하지 않고 느리기만 하므로 제외 (항목이 적어도 같은 기준)
+        self.postings: dict[str, tuple[float, list[tuple[int, float]]]] = {}
+        self.common_tokens: set[str] = set()
+        self.unseen_idf = math.log(1 + (num_docs + 0.5) / 0.5)  # 코퍼스에 없는 토큰의 IDF
+        for token, counts in postings.items():
+            df = len(counts)
+            if df > max(1.0, max_df_ratio * num_docs):
+                self.common_tokens.add(token)
+                continue
+            idf = math.log(1 + (num_docs - df + 0.5) / (df + 0.5))
+            weights = [
+                (doc, tf * (k1 + 1) / (tf + k1 * (1 - b + b * self.doc_lengths[doc] / self.avg_length)))
+                for doc, tf in counts.items()
+            ]
+            self.postings[token] = (idf, weights)
+
+    # JSON 파일에서 로드
+    @classmethod
+    def load(cls, path: str | Path = FAQ_PATH) -> FaqIndex:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return cls([FaqEntry(**entry) for entry in data])
+
+    # 검색 (점수 순 상위 k개)
+    # 키워드가 하나라도 맞았거나, BM25 점수가 질문 자신의 최대 점수(질문의 모든 n-gram이 맞았을 때)의
+    # min_coverage 이상인 항목만 반환 (n-gram 몇 개만 겹치는 무관한 질문에 엉뚱한 답을 주지 않도록)
+    def search(self, query: str, k: int = 3, min_coverage: float = 0.3) -> list[FaqMatch]:
+        hits = self.automaton.search(query)
+        bm25: dict[int, float] = {}
+        max_bm25 = 0.0
+        for token in set(char_ngrams(query)):
+            if token in self.common_tokens:
+                continue
+            posting = self.postings.get(token)
+            if posting is None:
+                max_bm25 += self.unseen_idf * (self.k1 + 1)
+                continue
+            idf, weights = posting
+            max_bm25 += idf * (self.k1 + 1)
+            for doc, weight in weights:
+                bm25[doc] = bm25.get(doc, 0.0) + idf * weight
+
+        scores: dict[int, float] = {}
+        for doc in hits.keys() | bm25.keys():
+            if doc in hits or bm25[doc] >= min_coverage * max_bm25:
+                scores[doc] = hits.get(doc, 0) * self.keyword_weight + bm25.get(doc, 0.0)
+
+        # 동점이면 먼저 등록된 항목 우선
+        ranked = heapq.nsmallest(k, scores.items(), key=lambda item: (-item[1], item[0]))
+        return [FaqMatch(self.entries[i], score, hits.get(i, 0)) for i, score in ranked]
+
+    # 임베딩으로 후보 재정렬 (선택 사항, AsyncOpenAI 클라이언트 필요)
+    async def search_reranked(
+        self, query: str, client, k: int = 3, candidates: int = 20,
+        model: str = "text-embedding-3-small",
+    ) -> list[FaqMatch]:
+        matches = self.search(query, k=candidates)
+        if len(matches) <= 1:
+            return matches[:k]
+        response = await client.embeddings.create(
+            model=model, input=[query] + [m.entry.question for m in matches]
+        )
+        vectors = [item.embedding for item in response.data]
+        query_vector = vectors[0]
+
+        # 코사인 유사도
+        def cosine(vector: list[float]) -> float:
+            dot = sum(x * y for x, y in zip(query_vector, vector))
+            norm = math.sqrt(sum(x * x for x in query_vector)) * math.sqrt(sum(x * x for x in vector))
+            return dot / norm if norm else 0.0
+
+        ranked = sorted(zip(matches, vectors[1:]), key=lambda pair: -cosine(pair[1]))
+        return [match for match, _ in ranked[:k]]
+
+# 기본 FAQ 인덱스 (처음 쓸 때 한 번만 구성)
+# 항목이 많으면 구성에 수십 초가 걸리므로 import 시점에 만들지 않음 (여러 스레드에서 불러도 한 번만 구성)
+_default_index: FaqIndex | None = None
+_default_index_lock = threading.Lock()
+
+def default_index() -> FaqIndex:
+    global _default_index
+    with _default_index_lock:
+        if _default_index is None:
+            _default_index = FaqIndex.load()
+        return _default_index
@@ -0,0 +1,145 @@
+from __future__ import annotations
+import json
+from typing import Any
+from agents import TResponseInputItem
+
+try:
+    import tiktoken
+    _ENCODING = tiktoken.get_encoding("o200k_base")
+except Exception:
+    _ENCODING = None
+
+# 요약 아이템 앞에 붙는 표시 (to_input_list() 결과에서 요약 아이템을 찾는 데 사용)
+SUMMARY_PREFIX = "[이전 대화 요약]"
+
+# 토큰 수 추정 (tiktoken이 없으면 문자 수 기반 근사)
+def count_tokens(text: str) -> int:
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text))
+    return (len(text) + 1) // 2
+
+# 입력 아이템의 토큰 수 추정
+def count_item_tokens(item: TResponseInputItem) -> int:
+    return count_tokens(json.dumps(item, ensure_ascii=False, default=str))
+
+# 메시지 아이템의 텍스트 추출
+def _message_text(item: dict[str, Any]) -> str:
+    content = item.get("content")
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return " ".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return ""
+
+# 길이 제한
+def _shorten(text: str, limit: int = 120) -> str:
+    text = " ".join(str(text).split())
+    return text if len(text) <= limit else text[: limit - 1] + "…"
+
+# 사용자 메시지인지 판정 (턴의 시작)
+def _is_user_message(item: dict[str, Any]) -> bool:
+    return item.get("role") == "user" and item.get("type", "message") == "message"
+
+# 아이템 하나를 요약 한 줄로 변환
+def summarize_item(item: dict[str, Any], tool_names: dict[str, str]) -> str | None:
+    item_type = item.get("type", "message")
+    if item_type == "message":
+        speaker = "고객" if item.get("role") == "user" else "상담원"
+        return f"{speaker}: {_shorten(_message_text(item))}"
+    if item_type == "function_call":
+        tool_names[item.get("call_id", "")] = item.get("name", "")
+        if item.get("name", "").startswith("transfer_to_"):
+            return f"핸드오프: {item['name']}"
+        return f"툴 호출: {item.get('name')}({_shorten(item.get('arguments', ''), 100)})"
+    if item_type == "function_call_output":
+        name = tool_names.pop(item.get("call_id", ""), "")
+        if name.startswith("transfer_to_"):
+            return None  # 핸드오프 결과는 호출 줄로 충분
+        return f"툴 결과: {_shorten(item.get('output', ''), 80)}"
+    return None
+
+# 토큰 예산 기반 대화 이력 관리자
+# - 최근 턴은 그대로 유지
+# - 예산을 넘으면 오래된 턴(툴 호출·결과, 핸드오프 포함)을 턴 단위로 요약에 추가
+# - 요약은 덧붙이기만 하므로 압축 사이에는 프롬프트 앞부분이 바뀌지 않아 프롬프트 캐시가 유지됨
+class HistoryManager:
+    # 초기화
+    def __init__(
+        self,
+        token_budget: int = 4000,
+        target_ratio: float = 0.5,
+        keep_recent_turns: int = 2,
+        max_summary_tokens: int | None = None,
+    ):
+        self.token_budget = token_budget
+        self.target_tokens = int(token_budget * target_ratio)
+        self.keep_recent_turns = keep_recent_turns
+        self.max_summary_tokens = max_summary_tokens or token_budget // 4
+        self.summary_lines: list[str] = []
+        self.items: list[TResponseInputItem] = []
+        self.tool_names: dict[str, str] = {}
+        self.compactions = 0
+        self.base_seq = 0  # items[0]의 대화 전체 기준 순번 (요약으로 접힌 아이템 수)
+
+    # 사용자 메시지 추가
+    def add_user_message(self, content: str) -> None:
+        self.items.append({"role": "user", "content": content})
+
+    # 요약 아이템
+    def _summary_item(self) -> TResponseInputItem:
+        return {
+            "role": "developer",
+            "content": SUMMARY_PREFIX + "\n" + "\n".join(self.summary_lines),
+        }
+
+    # Runner.run에 넘길 입력 리스트 (요약 + 최근 아이템)
+    def input_list(self) -> list[TResponseInputItem]:
+        if not self.summary_lines:
+            return list(self.items)
+        return [self._summary_item(), *self.items]
+
+    # 실행 결과의 to_input_list()로 이력을 갱신하고 필요하면 압축
+    def update(self, items: list[TResponseInputItem]) -> None:
+        if items and str(items[0].get("content", "")).startswith(SUMMARY_PREFIX):
+            items = items[1:]
+        self.items = list(items)
+        if self.token_count() > self.token_budget:
+            self.compact()
+
+    # 현재 입력 리스트의 토큰 수
+    def token_count(self) -> int:
+        return sum(count_item_tokens(item) for item in self.input_list())
+
+    # 오래된 턴을 요약으로 접기
+    def compact(self) -> None:
+        # 사용자 메시지 기준으로 턴 분할
+        turns: list[list[TResponseInputItem]] = []
+        for item in self.items:
+            if _is_user_message(item) or not turns:
+                turns.append([])
+            turns[-1].append(item)
+
+        # 목표 토큰 수 이하가 될 때까지 오래된 턴부터 접기 (최근 턴은 유지)
+        folded = 0
+        tokens = [sum(count_item_tokens(item) for item in turn) for turn in turns]
+        remaining = sum(tokens)
+        while len(turns) - folded > self.keep_recent_turns and remaining > self.target_tokens:
+            for item in turns[folded]:
+                line = summarize_item(item, self.tool_names)
+                if line is not None:
+                    self.summary_lines.append(line)
+            remaining -= tokens[folded]
+            folded += 1
+        if not folded:
+            return
+
+        # 요약 자체가 너무 길어지면 가장 오래된 줄부터 버림
+        while (
+            len(self.summary_lines) > 1
+            and count_tokens("\n".join(self.summary_lines)) > self.max_summary_tokens
+        ):
+            self.summary_lines.pop(0)
+
+        self.base_seq += sum(len(turn) for turn in turns[:folded])
+        self.items = [item for turn in turns[folded:] for item in turn]
+        self.compactions += 1
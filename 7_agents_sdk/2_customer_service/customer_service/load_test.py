@@ -0,0 +1,89 @@
+from __future__ import annotations
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+import websockets
+from agents import RunConfig, set_tracing_disabled
+from .server import CustomerServiceServer, SessionTable
+
+# 에이전트 예제 공용 가짜 프로바이더 (7_agents_sdk/fake_provider.py)
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from fake_provider import FakeModelProfile, FakeModelProvider
+
+# 클라이언트 하나: 한 연결에서 한 대화를 turns번 주고받음
+async def client(url: str, turns: int, latencies: list[float], errors: list[str]) -> None:
+    async with websockets.connect(url) as websocket:
+        session = None
+        for turn in range(turns):
+            start = time.perf_counter()
+            await websocket.send(
+                json.dumps({"session": session, "message": f"수하물 질문 {turn}"}, ensure_ascii=False)
+            )
+            response = json.loads(await websocket.recv())
+            if "error" in response:
+                errors.append(response["error"])
+                continue
+            session = response["session"]
+            latencies.append(time.perf_counter() - start)
+
+# 백분위 값
+def percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+# 가짜 모델 프로바이더 (지연 후 고정 문장으로 응답)
+def make_provider(args: argparse.Namespace) -> FakeModelProvider:
+    profile = FakeModelProfile(
+        median_latency=args.latency,
+        latency_sigma=args.sigma,
+        tokens_per_second=1000.0,
+        output_tokens=10,
+        text="네, 도와드리겠습니다.",
+    )
+    return FakeModelProvider(default=profile, seed=args.seed)
+
+# 부하 테스트 실행 (같은 프로세스에서 서버를 띄우고 클라이언트를 동시에 연결)
+async def run_load_test(args: argparse.Namespace) -> None:
+    set_tracing_disabled(True)
+    server = CustomerServiceServer(
+        max_concurrency=args.max_concurrency,
+        max_pending=args.max_pending,
+        sessions=SessionTable(max_sessions=args.clients * 2),
+        run_config=RunConfig(model_provider=make_provider(args), tracing_disabled=True),
+    )
+    latencies: list[float] = []
+    errors: list[str] = []
+    async with websockets.serve(server.handle_connection, "127.0.0.1", args.port):
+        url = f"ws://127.0.0.1:{args.port}"
+        start = time.perf_counter()
+        await asyncio.gather(
+            *(client(url, args.turns, latencies, errors) for _ in range(args.clients))
+        )
+        elapsed = time.perf_counter() - start
+
+    print(f"clients={args.clients} turns={args.turns} elapsed={elapsed:.2f}s")
+    print(f"throughput: {len(latencies) / elapsed:.1f} turns/s, errors: {len(errors)}")
+    if latencies:
+        print(
+            "latency: "
+            f"p50={percentile(latencies, 0.5) * 1000:.0f}ms "
+            f"p90={percentile(latencies, 0.9) * 1000:.0f}ms "
+            f"p99={percentile(latencies, 0.99) * 1000:.0f}ms"
+        )
+    print(f"sessions: {len(server.sessions.sessions)}")
+
+# main 실행
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=500, help="동시 대화 수")
+    parser.add_argument("--turns", type=int, default=5, help="대화당 턴 수")
+    parser.add_argument("--latency", type=float, default=0.5, help="가짜 모델 지연(초)")
+    parser.add_argument("--sigma", type=float, default=0.3, help="지연 분포의 시그마 (로그정규분포)")
+    parser.add_argument("--seed", type=int, default=0, help="난수 시드")
+    parser.add_argument("--max-concurrency", type=int, default=200, help="서버 동시 실행 수")
+    parser.add_argument("--max-pending", type=int, default=10000, help="서버 최대 대기 요청 수")
+    parser.add_argument("--port", type=int, default=8766, help="포트")
+    asyncio.run(run_load_test(parser.parse_args()))
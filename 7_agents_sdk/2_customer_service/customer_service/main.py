@@ -1,14 +1,20 @@
 from __future__ import annotations as _annotations
+import argparse
 import asyncio
 import random
+import sys
 import uuid
+from pathlib import Path
+from typing import Any
 from pydantic import BaseModel
 from agents import (
     Agent,
     HandoffOutputItem,
     ItemHelpers,
     MessageOutputItem,
+    RunConfig,
     RunContextWrapper,
+    RunResult,
     Runner,
     ToolCallItem,
     ToolCallOutputItem,
@@ -18,6 +24,10 @@ from agents import (
     trace,
 )
 from agents.extensions.handoff_prompt import RECOMMENDED_PROMPT_PREFIX
+from .faq import default_index
+from .history import HistoryManager
+from .router import TRANSCRIPTS_PATH, TRIAGE, HandoffRouter, log_handoff
+from .session_store import SessionStore, is_valid_session_id, open_session_store
 
 # 항공사 에이전트 컨텍스트
 class AirlineAgentContext(BaseModel):
@@ -32,20 +42,11 @@ class AirlineAgentContext(BaseModel):
     description_override="FAQ에 관한 질문의 답변을 제공합니다."
 )
 async def faq_lookup_tool(question: str) -> str:
-    if "가방" in question or "짐" in question or "수하물" in question:
-        return (
-            "비행기에는 가방 1개를 기내 반입할 수 있습니다."
-            "무게는 50파운드 이하, 크기는 22인치 x 14인치 x 9인치여야 합니다."
-        )
-    elif "좌석" in question or "비행기" in question:
-        return (
-            "비행기에는 120석이 있습니다."
-            "비즈니스 클래스 좌석은 22석, 이코노미 클래스 좌석은 98석입니다."
-            "비상구는 4열과 16열에 있습니다."
-            "5열부터 8열까지는 이코노미 플러스로, 다리 공간에 여유가 있습니다."
-        )
-    elif "WiFi" in question or "Wi-Fi" in question or "와이파이" in question:
-        return "비행기에는 무료 Wi-Fi가 있습니다. Airline-Wifi에 참여하세요"
+    # FAQ 인덱스는 처음 호출할 때 구성 (구성하는 동안 이벤트 루프를 막지 않도록 스레드에서)
+    faq_index = await asyncio.to_thread(default_index)
+    matches = faq_index.search(question, k=1)
+    if matches:
+        return matches[0].entry.answer
     return "죄송합니다만, 그 질문의 답을 알 수 없습니다."
 
 # 좌석 업데이트 툴 준비
@@ -121,41 +122,172 @@ triage_agent = Agent[AirlineAgentContext](
 faq_agent.handoffs.append(triage_agent)
 seat_booking_agent.handoffs.append(triage_agent)
 
-# main
-async def main():
-    current_agent: Agent[AirlineAgentContext] = triage_agent # 처음은 트리아지 에이전트
-    input_items: list[TResponseInputItem] = []
-    context = AirlineAgentContext()
+# 이름으로 에이전트 찾기 (세션 복원, 사전 라우팅용)
+AGENTS = {agent.name: agent for agent in (triage_agent, faq_agent, seat_booking_agent)}
+
+# 사전 라우팅으로 바로 보낼 때 실행할 핸드오프 훅
+HANDOFF_HOOKS = {seat_booking_agent.name: on_seat_booking_handoff}
+
+# 대화 상태 (현재 에이전트, 이력, 컨텍스트)
+class Conversation:
+    __slots__ = ("conversation_id", "current_agent", "history", "context")
+
+    # 초기화 (대화 ID에 랜덤 UUID 사용, 처음은 트리아지 에이전트)
+    def __init__(self, conversation_id: str | None = None):
+        self.conversation_id = conversation_id or uuid.uuid4().hex[:16]
+        self.current_agent: Agent[AirlineAgentContext] = triage_agent
+        self.history = HistoryManager()  # 토큰 예산을 넘으면 오래된 턴을 요약으로 압축
+        self.context = AirlineAgentContext()
+
+    # 이력 아이템을 제외한 상태 (세션 저장용)
+    def to_state(self) -> dict[str, Any]:
+        return {
+            "conversation_id": self.conversation_id,
+            "agent": self.current_agent.name,
+            "context": self.context.model_dump(),
+            "summary_lines": self.history.summary_lines,
+            "base_seq": self.history.base_seq,
+        }
+
+    # 저장된 상태와 유지 중인 이력 아이템으로 복원
+    @classmethod
+    def from_state(cls, state: dict[str, Any], items: list[TResponseInputItem]) -> Conversation:
+        conversation = cls(state["conversation_id"])
+        conversation.current_agent = AGENTS.get(state["agent"], triage_agent)
+        conversation.context = AirlineAgentContext(**state["context"])
+        conversation.history.summary_lines = list(state["summary_lines"])
+        conversation.history.base_seq = state["base_seq"]
+        conversation.history.items = items
+        return conversation
+
+# 사전 라우팅 (트리아지 차례이고 라우터가 확신하면 트리아지 호출 없이 대상 에이전트로 전환)
+async def pre_route(conversation: Conversation, user_input: str, router: HandoffRouter) -> bool:
+    if conversation.current_agent is not triage_agent:
+        return False
+    route = router.route(user_input)
+    if route is None or route.agent not in AGENTS:
+        return False
+    hook = HANDOFF_HOOKS.get(route.agent)
+    if hook is not None:
+        await hook(RunContextWrapper(context=conversation.context))
+    conversation.current_agent = AGENTS[route.agent]
+    return True
 
-    # 대화 ID에 랜덤 UUID 사용
-    conversation_id = uuid.uuid4().hex[:16]
+# 트리아지 에이전트가 핸드오프한 대상 (핸드오프하지 않았으면 트리아지)
+def triage_target(result: RunResult) -> str | None:
+    if not result.new_items or result.new_items[0].agent is not triage_agent:
+        return None
+    for new_item in result.new_items:
+        if isinstance(new_item, HandoffOutputItem) and new_item.source_agent is triage_agent:
+            return new_item.target_agent.name
+    return TRIAGE
+
+# 한 턴 실행 (router를 지정하면 명확한 요청은 트리아지를 건너뜀)
+async def run_turn(
+    conversation: Conversation,
+    user_input: str,
+    run_config: RunConfig | None = None,
+    router: HandoffRouter | None = None,
+) -> RunResult:
+    with trace("Customer service", group_id=conversation.conversation_id):
+        if router is not None:
+            await pre_route(conversation, user_input, router)
+        conversation.history.add_user_message(user_input)
+        result = await Runner.run(
+            conversation.current_agent,
+            conversation.history.input_list(),
+            context=conversation.context,
+            run_config=run_config,
+        )
+        conversation.history.update(result.to_input_list())
+        conversation.current_agent = result.last_agent
+    return result
+
+# 실행 결과를 표시용 문자열 리스트로 변환
+def format_items(result: RunResult) -> list[str]:
+    lines = []
+    for new_item in result.new_items:
+        agent_name = new_item.agent.name
+        if isinstance(new_item, MessageOutputItem):
+            lines.append(f"{agent_name}: {ItemHelpers.text_message_output(new_item)}")
+        elif isinstance(new_item, HandoffOutputItem):
+            lines.append(
+                f"Handed off from {new_item.source_agent.name} to {new_item.target_agent.name}"
+            )
+        elif isinstance(new_item, ToolCallItem):
+            lines.append(f"{agent_name}: Calling a tool")
+        elif isinstance(new_item, ToolCallOutputItem):
+            lines.append(f"{agent_name}: Tool call output: {new_item.output}")
+        else:
+            lines.append(f"{agent_name}: Skipping item: {new_item.__class__.__name__}")
+    return lines
+
+# main (store를 지정하면 턴마다 저장하고, 같은 conversation_id로 다시 시작하면 이어서 대화)
+# handoff_log를 지정하면 트리아지의 판단을 사전 라우터 학습 데이터로 기록
+async def main(
+    store: SessionStore | None = None,
+    conversation_id: str | None = None,
+    router: HandoffRouter | None = None,
+    handoff_log: str | None = None,
+):
+    conversation = None
+    if store is not None and conversation_id is not None:
+        conversation = store.load(conversation_id)
+    conversation = conversation or Conversation(conversation_id)
+    print(f"대화 ID: {conversation.conversation_id}")
 
     while True:
-        # 메시지 입력
-        user_input = input("메시지를 입력: ")
-        with trace("Customer service", group_id=conversation_id):
-            # 에이전트 실행
-            input_items.append({"role": "user", "content": user_input})
-            result = await Runner.run(current_agent, input_items, context=context)
-
-            # 출력
-            for new_item in result.new_items:
-                agent_name = new_item.agent.name
-                if isinstance(new_item, MessageOutputItem):
-                    print(f"{agent_name}: {ItemHelpers.text_message_output(new_item)}")
-                elif isinstance(new_item, HandoffOutputItem):
-                    print(
-                        f"Handed off from {new_item.source_agent.name} to {new_item.target_agent.name}"
-                    )
-                elif isinstance(new_item, ToolCallItem):
-                    print(f"{agent_name}: Calling a tool")
-                elif isinstance(new_item, ToolCallOutputItem):
-                    print(f"{agent_name}: Tool call output: {new_item.output}")
-                else:
-                    print(f"{agent_name}: Skipping item: {new_item.__class__.__name__}")
-            input_items = result.to_input_list()
-            current_agent = result.last_agent
+        # 메시지 입력 (이벤트 루프를 막지 않도록 스레드에서 대기)
+        user_input = await asyncio.to_thread(input, "메시지를 입력: ")
+
+        # 에이전트 실행 후 출력
+        result = await run_turn(conversation, user_input, router=router)
+        for line in format_items(result):
+            print(line)
+        target = triage_target(result)
+        if handoff_log and target is not None:
+            log_handoff(handoff_log, user_input, target)
+        if store is not None:
+            await asyncio.to_thread(store.save, conversation)
 
 # main 실행
 if __name__ == "__main__":
-    asyncio.run(main())
+    # 인자
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--metrics",
+        help="종료 시 지표 출력 파일 (.prom이면 Prometheus 텍스트, 그 외는 JSON)",
+    )
+    parser.add_argument("--store", help="세션 저장소 (.sqlite3/.db 파일 또는 디렉터리)")
+    parser.add_argument("--session", help="이어서 진행할 대화 ID")
+    parser.add_argument(
+        "--router",
+        nargs="?",
+        const="",
+        help="사전 라우터 사용 (핸드오프 기록 파일을 지정하지 않으면 기본 기록으로 학습)",
+    )
+    parser.add_argument("--router-threshold", type=float, default=0.9, help="사전 라우팅 확률 기준")
+    parser.add_argument("--log-handoffs", help="트리아지 핸드오프 기록 파일 (JSON Lines)")
+    args = parser.parse_args()
+
+    # 지표 수집
+    if args.metrics:
+        sys.path.append(str(Path(__file__).resolve().parents[2]))
+        from agent_metrics import dump_metrics, install_metrics
+        metrics = install_metrics()
+
+    # main 실행 (Ctrl+C 또는 입력 종료로 끝냄)
+    if args.session is not None and not is_valid_session_id(args.session):
+        parser.error("대화 ID는 16~32자리 16진수여야 합니다.")
+
+    try:
+        store = open_session_store(args.store) if args.store else None
+        router = None
+        if args.router is not None:
+            router = HandoffRouter.load(args.router or TRANSCRIPTS_PATH, args.router_threshold)
+        asyncio.run(main(store, args.session, router, args.log_handoffs))
+    except (KeyboardInterrupt, EOFError):
+        pass
+    finally:
+        if args.metrics:
+            dump_metrics(metrics, args.metrics)
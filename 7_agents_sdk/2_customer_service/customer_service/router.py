@@ -0,0 +1,171 @@
+from __future__ import annotations
+import json
+import math
+import random
+import time
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from .faq import char_ngrams
+
+# 기본 학습 데이터 (트리아지가 실제로 핸드오프한 대상을 기록한 대화)
+TRANSCRIPTS_PATH = Path(__file__).with_name("routing_transcripts.jsonl")
+
+# 트리아지가 직접 처리한 경우의 레이블 (사전 라우팅하지 않음)
+TRIAGE = "Triage Agent"
+
+# 라우팅 결과
+@dataclass
+class Route:
+    agent: str  # 대상 에이전트 이름
+    confidence: float
+
+# 핸드오프 기록 읽기 (JSON Lines: {"message": ..., "agent": ...})
+def load_transcripts(path: str | Path = TRANSCRIPTS_PATH) -> list[tuple[str, str]]:
+    examples = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                examples.append((record["message"], record["agent"]))
+    return examples
+
+# 핸드오프 기록 추가 (main에서 트리아지가 핸드오프할 때마다 기록해 학습 데이터로 사용)
+def log_handoff(path: str | Path, message: str, agent: str) -> None:
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps({"message": message, "agent": agent}, ensure_ascii=False) + "\n")
+
+# 로컬 사전 라우터 (문자 n-gram 나이브 베이즈)
+# - 확률이 threshold 이상이고 대상이 트리아지가 아니면 바로 대상 에이전트로 보냄
+# - 그 외에는 None을 반환해 평소처럼 트리아지 에이전트가 판단
+class HandoffRouter:
+    # 초기화
+    def __init__(self, examples: list[tuple[str, str]] | None = None, threshold: float = 0.9):
+        self.threshold = threshold
+        self.counts: dict[str, Counter] = {}
+        self.totals: dict[str, int] = {}
+        self.docs: dict[str, int] = {}
+        self.vocabulary: set[str] = set()
+        self.log_terms: dict[str, tuple[float, float]] | None = None  # 에이전트 -> (로그 사전확률, 로그 분모), 학습하면 다시 계산
+        for message, agent in examples or []:
+            self.learn(message, agent)
+
+    # 기록 파일로 학습
+    @classmethod
+    def load(cls, path: str | Path = TRANSCRIPTS_PATH, threshold: float = 0.9) -> HandoffRouter:
+        return cls(load_transcripts(path), threshold)
+
+    # 예시 하나 학습
+    def learn(self, message: str, agent: str) -> None:
+        tokens = char_ngrams(message, (1, 2, 3))
+        self.counts.setdefault(agent, Counter()).update(tokens)
+        self.totals[agent] = self.totals.get(agent, 0) + len(tokens)
+        self.docs[agent] = self.docs.get(agent, 0) + 1
+        self.vocabulary.update(tokens)
+        self.log_terms = None
+
+    # 에이전트별 로그 사전확률과 로그 분모 (학습 뒤 처음 조회할 때 한 번만 계산)
+    def _log_terms(self) -> dict[str, tuple[float, float]]:
+        if self.log_terms is None:
+            vocabulary = len(self.vocabulary) + 1
+            total_docs = sum(self.docs.values())
+            self.log_terms = {
+                agent: (math.log(self.docs[agent] / total_docs), math.log(self.totals[agent] + vocabulary))
+                for agent in self.counts
+            }
+        return self.log_terms
+
+    # 에이전트별 확률 (라플라스 평활화)
+    def probabilities(self, message: str) -> dict[str, float]:
+        if not self.counts:
+            return {}
+        tokens = char_ngrams(message, (1, 2, 3))
+        log_probs = {}
+        for agent, (log_prior, log_denominator) in self._log_terms().items():
+            counts = self.counts[agent]
+            log_prob = log_prior - len(tokens) * log_denominator
+            for token in tokens:
+                log_prob += math.log(counts[token] + 1)
+            log_probs[agent] = log_prob
+        top = max(log_probs.values())
+        weights = {agent: math.exp(log_prob - top) for agent, log_prob in log_probs.items()}
+        total = sum(weights.values())
+        return {agent: weight / total for agent, weight in weights.items()}
+
+    # 가장 가능성 높은 에이전트 (트리아지 포함, 평가용)
+    def predict(self, message: str) -> Route | None:
+        probabilities = self.probabilities(message)
+        if not probabilities:
+            return None
+        agent = max(probabilities, key=probabilities.get)
+        return Route(agent, probabilities[agent])
+
+    # 사전 라우팅 (확신이 없거나 트리아지가 처리할 메시지이면 None)
+    def route(self, message: str) -> Route | None:
+        route = self.predict(message)
+        if route is None or route.agent == TRIAGE or route.confidence < self.threshold:
+            return None
+        return route
+
+# 재생 평가 결과
+@dataclass
+class RoutingReport:
+    messages: int = 0
+    routed: int = 0  # 사전 라우팅한 메시지 수
+    correct: int = 0  # 그중 트리아지와 같은 대상으로 보낸 수
+    router_ms: float = 0.0  # 메시지당 라우터 시간
+
+    # 사전 라우팅 정확도
+    @property
+    def accuracy(self) -> float:
+        return self.correct / self.routed if self.routed else 0.0
+
+    # 절약한 시간 추정 (맞으면 트리아지 한 번, 틀리면 대상 에이전트가 트리아지로 되돌리는 두 번을 손해)
+    def latency_saved(self, hop_latency: float) -> float:
+        wrong = self.routed - self.correct
+        return self.correct * hop_latency - wrong * 2 * hop_latency - self.messages * self.router_ms / 1000
+
+# 기록을 학습/평가로 나누어 재생 평가 (folds겹 교차 검증)
+def evaluate(
+    examples: list[tuple[str, str]], threshold: float = 0.9, folds: int = 5, seed: int = 0
+) -> RoutingReport:
+    examples = list(examples)
+    random.Random(seed).shuffle(examples)
+    report = RoutingReport()
+    elapsed = 0.0
+    for fold in range(folds):
+        train = [example for i, example in enumerate(examples) if i % folds != fold]
+        test = [example for i, example in enumerate(examples) if i % folds == fold]
+        router = HandoffRouter(train, threshold)
+        for message, agent in test:
+            start = time.perf_counter()
+            route = router.route(message)
+            elapsed += time.perf_counter() - start
+            report.messages += 1
+            if route is not None:
+                report.routed += 1
+                report.correct += route.agent == agent
+    report.router_ms = elapsed / max(1, report.messages) * 1000
+    return report
+
+# 평가 실행
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("transcripts", nargs="?", default=str(TRANSCRIPTS_PATH), help="핸드오프 기록 (JSON Lines)")
+    parser.add_argument("--thresholds", type=float, nargs="+", default=[0.6, 0.8, 0.9, 0.95, 0.99])
+    parser.add_argument("--folds", type=int, default=5, help="교차 검증 겹 수")
+    parser.add_argument("--hop-latency", type=float, default=1.5, help="트리아지 모델 호출 한 번의 지연(초)")
+    args = parser.parse_args()
+
+    examples = load_transcripts(args.transcripts)
+    print(f"messages={len(examples)}  hop-latency={args.hop_latency:.2f}s")
+    for threshold in args.thresholds:
+        report = evaluate(examples, threshold, args.folds)
+        saved = report.latency_saved(args.hop_latency)
+        print(
+            f"threshold={threshold:.2f}  routed={report.routed}/{report.messages}  "
+            f"accuracy={report.accuracy:.1%}  router={report.router_ms:.3f}ms  "
+            f"saved={saved:.1f}s ({saved / report.messages:.2f}s/message)"
+        )
@@ -0,0 +1,197 @@
+from __future__ import annotations
+import argparse
+import asyncio
+import json
+import time
+from collections import OrderedDict
+import websockets
+from agents import RunConfig
+from .main import Conversation, format_items, run_turn
+from .router import TRANSCRIPTS_PATH, HandoffRouter
+from .session_store import SessionStore, is_valid_session_id, open_session_store
+
+# 세션 (대화 상태 + 마지막 사용 시각 + 세션 내 순서 보장용 락)
+class Session:
+    __slots__ = ("conversation", "last_active", "lock")
+
+    # 초기화
+    def __init__(self, conversation: Conversation):
+        self.conversation = conversation
+        self.last_active = time.monotonic()
+        self.lock = asyncio.Lock()
+
+# 세션 테이블 (오래 사용하지 않은 순서로 정렬된 딕셔너리)
+class SessionTable:
+    # 초기화
+    def __init__(self, max_sessions: int = 10000, idle_timeout: float = 1800.0):
+        self.sessions: OrderedDict[str, Session] = OrderedDict()
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+
+    # 메모리에 있는 세션 조회
+    def get(self, session_id: str | None) -> Session | None:
+        if session_id is None or session_id not in self.sessions:
+            return None
+        self.sessions.move_to_end(session_id)
+        return self.sessions[session_id]
+
+    # 세션 추가 (가득 찼고 비울 세션이 없으면 None)
+    def add(self, conversation: Conversation) -> Session | None:
+        if len(self.sessions) >= self.max_sessions:
+            self.evict_idle()
+            if len(self.sessions) >= self.max_sessions:
+                return None
+        session = Session(conversation)
+        self.sessions[conversation.conversation_id] = session
+        return session
+
+    # 유휴 세션 제거 (가장 오래 사용하지 않은 세션부터 확인)
+    def evict_idle(self) -> int:
+        now = time.monotonic()
+        evicted = 0
+        while self.sessions:
+            session_id, session = next(iter(self.sessions.items()))
+            if now - session.last_active < self.idle_timeout or session.lock.locked():
+                break
+            del self.sessions[session_id]
+            evicted += 1
+        return evicted
+
+# 다중 세션 고객 서비스 서버
+# - 전체 동시 실행 수를 max_concurrency로 제한
+# - 대기 중인 요청이 max_pending을 넘으면 즉시 busy 응답 (백프레셔)
+# - 같은 세션의 메시지는 순서대로 처리
+# - store를 지정하면 턴마다 세션을 저장하고, 메모리에 없는 세션은 저장소에서 복원
+# - router를 지정하면 명확한 요청은 트리아지를 건너뛰고 바로 대상 에이전트로 보냄
+class CustomerServiceServer:
+    # 초기화
+    def __init__(
+        self,
+        max_concurrency: int = 64,
+        max_pending: int = 1000,
+        sessions: SessionTable | None = None,
+        run_config: RunConfig | None = None,
+        store: SessionStore | None = None,
+        router: HandoffRouter | None = None,
+    ):
+        self.store = store
+        self.router = router
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.max_pending = max_pending
+        self.pending = 0
+        self.sessions = sessions or SessionTable()
+        self.run_config = run_config
+
+    # 메시지 하나 처리
+    async def handle_message(self, request: dict) -> dict:
+        if self.pending >= self.max_pending:
+            return {"error": "busy"}
+        session_id = request.get("session")
+        if session_id is not None and not is_valid_session_id(session_id):
+            return {"error": "invalid session id"}
+        session = self.sessions.get(session_id)
+        if session is None:
+            conversation = None
+            if session_id is not None and self.store is not None:
+                conversation = await asyncio.to_thread(self.store.load, session_id)
+            # 복원 대기 중에 다른 요청이 같은 세션을 만들었을 수 있음
+            session = self.sessions.get(session_id) or self.sessions.add(
+                conversation or Conversation(session_id)
+            )
+            if session is None:
+                return {"error": "too many sessions"}
+        session_id = session.conversation.conversation_id
+
+        self.pending += 1
+        try:
+            async with session.lock, self.semaphore:
+                result = await run_turn(
+                    session.conversation, request["message"], self.run_config, self.router
+                )
+                if self.store is not None:
+                    await asyncio.to_thread(self.store.save, session.conversation)
+        except Exception as e:
+            return {"session": session_id, "error": repr(e)}
+        finally:
+            self.pending -= 1
+            session.last_active = time.monotonic()
+        return {"session": session_id, "lines": format_items(result)}
+
+    # WebSocket 연결 처리 (한 연결에서 여러 요청을 동시에 처리)
+    async def handle_connection(self, websocket, path: str | None = None) -> None:
+        tasks: set[asyncio.Task] = set()
+
+        # 요청 하나 처리 후 응답 (요청의 id를 그대로 돌려줌)
+        async def respond(request: dict) -> None:
+            response = await self.handle_message(request)
+            if "id" in request:
+                response["id"] = request["id"]
+            await websocket.send(json.dumps(response, ensure_ascii=False))
+
+        try:
+            async for message in websocket:
+                try:
+                    request = json.loads(message)
+                except json.JSONDecodeError:
+                    await websocket.send(json.dumps({"error": "invalid json"}))
+                    continue
+                if not isinstance(request, dict) or not isinstance(request.get("message"), str):
+                    response = {"error": "request must be an object with a message"}
+                    if isinstance(request, dict) and "id" in request:
+                        response["id"] = request["id"]
+                    await websocket.send(json.dumps(response))
+                    continue
+                task = asyncio.create_task(respond(request))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    # 유휴 세션을 주기적으로 제거
+    async def evict_loop(self, interval: float = 60.0) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            self.sessions.evict_idle()
+
+    # 서버 실행
+    async def serve(self, host: str = "127.0.0.1", port: int = 8765) -> None:
+        evictor = asyncio.create_task(self.evict_loop())
+        try:
+            async with websockets.serve(self.handle_connection, host, port):
+                print(f"ws://{host}:{port} 에서 대기 중")
+                await asyncio.Future()
+        finally:
+            evictor.cancel()
+
+# main 실행
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1", help="호스트")
+    parser.add_argument("--port", type=int, default=8765, help="포트")
+    parser.add_argument("--max-concurrency", type=int, default=64, help="동시 실행 수")
+    parser.add_argument("--max-pending", type=int, default=1000, help="최대 대기 요청 수")
+    parser.add_argument("--max-sessions", type=int, default=10000, help="최대 세션 수")
+    parser.add_argument("--idle-timeout", type=float, default=1800.0, help="유휴 세션 제거 시간(초)")
+    parser.add_argument("--store", help="세션 저장소 (.sqlite3/.db 파일 또는 디렉터리)")
+    parser.add_argument("--router", nargs="?", const="", help="사전 라우터 사용 (핸드오프 기록 파일)")
+    parser.add_argument("--router-threshold", type=float, default=0.9, help="사전 라우팅 확률 기준")
+    args = parser.parse_args()
+
+    server = CustomerServiceServer(
+        max_concurrency=args.max_concurrency,
+        max_pending=args.max_pending,
+        sessions=SessionTable(args.max_sessions, args.idle_timeout),
+        store=open_session_store(args.store) if args.store else None,
+        router=(
+            HandoffRouter.load(args.router or TRANSCRIPTS_PATH, args.router_threshold)
+            if args.router is not None
+            else None
+        ),
+    )
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
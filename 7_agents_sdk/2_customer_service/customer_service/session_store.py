@@ -0,0 +1,223 @@
+from __future__ import annotations
+import json
+import os
+import re
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from collections.abc import Iterator
+from typing import Any
+from agents import TResponseInputItem
+
+# 짧은 JSON 직렬화
+def _dumps(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=str)
+
+# 세션 ID 형식 (Conversation이 만드는 uuid4 16진수, 파일 이름에 그대로 쓰므로 다른 문자는 허용하지 않음)
+SESSION_ID_PATTERN = re.compile(r"[0-9a-f]{16,32}")
+
+# 올바른 세션 ID인지 (클라이언트가 보낸 값은 저장소에 넘기기 전에 확인)
+def is_valid_session_id(value: Any) -> bool:
+    return isinstance(value, str) and SESSION_ID_PATTERN.fullmatch(value) is not None
+
+# 세션 저장소 공통 부분
+# - 헤더: 에이전트 이름, 컨텍스트, 요약 등 작은 상태 (매번 덮어씀)
+# - 아이템: 이력 아이템을 대화 전체 기준 순번과 함께 추가만 함 (전체를 다시 쓰지 않음)
+# - 복원 시에는 요약으로 접히지 않은 아이템(base_seq 이후)만 읽고, 이전 아이템은 필요할 때 archived_items로 읽음
+class SessionStore(ABC):
+    # 초기화
+    def __init__(self):
+        self.saved_seq: dict[str, int] = {}  # 세션별 다음에 저장할 순번
+        self.lock = threading.Lock()
+
+    # 대화 저장 (새 아이템만 추가)
+    def save(self, conversation) -> None:
+        state = conversation.to_state()
+        conversation_id = state["conversation_id"]
+        base_seq = state["base_seq"]
+        items = conversation.history.items
+        with self.lock:
+            saved = self.saved_seq.get(conversation_id)
+            if saved is None:
+                saved = self._next_seq(conversation_id)
+            start = max(0, saved - base_seq)
+            new_items = [(base_seq + i, items[i]) for i in range(start, len(items))]
+            self._write(conversation_id, state, new_items)
+            self.saved_seq[conversation_id] = base_seq + len(items)
+
+    # 대화 복원 (없으면 None)
+    def load(self, conversation_id: str):
+        from .main import Conversation
+
+        with self.lock:
+            state = self._read_state(conversation_id)
+            if state is None:
+                return None
+            items = list(self._read_items(conversation_id, state["base_seq"], None))
+            self.saved_seq[conversation_id] = state["base_seq"] + len(items)
+        return Conversation.from_state(state, items)
+
+    # 요약으로 접힌 이전 아이템을 필요할 때 읽기
+    def archived_items(self, conversation_id: str) -> Iterator[TResponseInputItem]:
+        state = self._read_state(conversation_id)
+        if state is None:
+            return iter(())
+        return self._read_items(conversation_id, 0, state["base_seq"])
+
+    # 저장된 다음 순번
+    @abstractmethod
+    def _next_seq(self, conversation_id: str) -> int:
+        ...
+
+    # 헤더 덮어쓰기와 아이템 추가
+    @abstractmethod
+    def _write(
+        self, conversation_id: str, state: dict, items: list[tuple[int, TResponseInputItem]]
+    ) -> None:
+        ...
+
+    # 헤더 읽기
+    @abstractmethod
+    def _read_state(self, conversation_id: str) -> dict | None:
+        ...
+
+    # start <= 순번 < stop 인 아이템 읽기 (stop이 None이면 끝까지)
+    @abstractmethod
+    def _read_items(
+        self, conversation_id: str, start: int, stop: int | None
+    ) -> Iterator[TResponseInputItem]:
+        ...
+
+# SQLite 세션 저장소
+class SQLiteSessionStore(SessionStore):
+    # 초기화
+    def __init__(self, path: str = "sessions.sqlite3"):
+        super().__init__()
+        self.conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions (id TEXT PRIMARY KEY, state TEXT NOT NULL)"
+        )
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS session_items ("
+            "session_id TEXT NOT NULL, seq INTEGER NOT NULL, item TEXT NOT NULL, "
+            "PRIMARY KEY (session_id, seq))"
+        )
+
+    def _next_seq(self, conversation_id: str) -> int:
+        row = self.conn.execute(
+            "SELECT MAX(seq) FROM session_items WHERE session_id = ?", (conversation_id,)
+        ).fetchone()
+        return 0 if row[0] is None else row[0] + 1
+
+    def _write(self, conversation_id, state, items) -> None:
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO sessions VALUES (?, ?)", (conversation_id, _dumps(state))
+            )
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO session_items VALUES (?, ?, ?)",
+                [(conversation_id, seq, _dumps(item)) for seq, item in items],
+            )
+            self.conn.execute("COMMIT")
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+
+    def _read_state(self, conversation_id: str) -> dict | None:
+        row = self.conn.execute(
+            "SELECT state FROM sessions WHERE id = ?", (conversation_id,)
+        ).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def _read_items(self, conversation_id, start, stop) -> Iterator[TResponseInputItem]:
+        rows = self.conn.execute(
+            "SELECT item FROM session_items WHERE session_id = ? AND seq >= ? AND seq < ? "
+            "ORDER BY seq",
+            (conversation_id, start, stop if stop is not None else 2**62),
+        ).fetchall()
+        return (json.loads(row[0]) for row in rows)
+
+    # 닫기
+    def close(self) -> None:
+        self.conn.close()
+
+# 파일 세션 저장소 (세션마다 헤더 JSON 파일 + 아이템 JSON Lines 파일)
+# 헤더에 각 순번의 바이트 오프셋을 두지 않고, 접히지 않은 첫 아이템의 오프셋만 기록해서 복원 시 바로 이동
+class FileSessionStore(SessionStore):
+    # 초기화
+    def __init__(self, directory: str = "sessions"):
+        super().__init__()
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.offsets: dict[str, dict[int, int]] = {}  # 세션별 순번 -> 바이트 오프셋 (저장 중 기록)
+
+    # 파일 경로 (형식이 맞지 않는 ID는 저장소 밖을 가리킬 수 있으므로 거부)
+    def _path(self, conversation_id: str, suffix: str) -> str:
+        if not is_valid_session_id(conversation_id):
+            raise ValueError(f"invalid session id: {conversation_id!r}")
+        return os.path.join(self.directory, f"{conversation_id}{suffix}")
+
+    # 아이템 파일을 처음부터 읽어 순번별 오프셋 구하기 (캐시가 없을 때만)
+    def _scan_offsets(self, conversation_id: str) -> dict[int, int]:
+        offsets: dict[int, int] = {}
+        path = self._path(conversation_id, ".items.jsonl")
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                offset = 0
+                for line in f:
+                    offsets[json.loads(line)["seq"]] = offset
+                    offset += len(line)
+        return offsets
+
+    def _next_seq(self, conversation_id: str) -> int:
+        offsets = self.offsets.setdefault(conversation_id, self._scan_offsets(conversation_id))
+        return max(offsets, default=-1) + 1
+
+    def _write(self, conversation_id, state, items) -> None:
+        offsets = self.offsets.setdefault(conversation_id, self._scan_offsets(conversation_id))
+        with open(self._path(conversation_id, ".items.jsonl"), "ab") as f:
+            offset = f.tell()
+            for seq, item in items:
+                line = (_dumps({"seq": seq, "item": item}) + "\n").encode("utf-8")
+                f.write(line)
+                offsets[seq] = offset
+                offset += len(line)
+
+        # 헤더는 임시 파일에 쓴 뒤 교체 (중간에 죽어도 이전 헤더가 남음)
+        state = dict(state, offset=offsets.get(state["base_seq"], offset))
+        path = self._path(conversation_id, ".json")
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            f.write(_dumps(state))
+        os.replace(path + ".tmp", path)
+
+    def _read_state(self, conversation_id: str) -> dict | None:
+        path = self._path(conversation_id, ".json")
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def _read_items(self, conversation_id, start, stop) -> Iterator[TResponseInputItem]:
+        path = self._path(conversation_id, ".items.jsonl")
+        if not os.path.exists(path):
+            return
+        state = self._read_state(conversation_id) or {}
+        with open(path, "rb") as f:
+            # 접히지 않은 아이템부터 읽을 때는 헤더의 오프셋으로 바로 이동
+            if start and start == state.get("base_seq"):
+                f.seek(state.get("offset", 0))
+            for line in f:
+                record = json.loads(line)
+                if record["seq"] < start:
+                    continue
+                if stop is not None and record["seq"] >= stop:
+                    break
+                yield record["item"]
+
+# 경로에 맞는 저장소 생성 (.sqlite3/.db이면 SQLite, 그 외는 디렉터리)
+def open_session_store(path: str) -> SessionStore:
+    if path.endswith((".sqlite3", ".db")):
+        return SQLiteSessionStore(path)
+    return FileSessionStore(path)
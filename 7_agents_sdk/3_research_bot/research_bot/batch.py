@@ -0,0 +1,118 @@
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from .cache import SearchCache
+from .manager import ResearchManager
+from .printer import JsonLinesPrinter
+from .scheduler import SearchScheduler
+
+# 쿼리 읽기 (한 줄에 하나, "-"이면 표준 입력)
+def read_queries(path: str) -> list[str]:
+    if path == "-":
+        lines = sys.stdin.read().splitlines()
+    else:
+        with open(path, encoding="utf-8") as f:
+            lines = f.read().splitlines()
+    return [line.strip() for line in lines if line.strip()]
+
+# 이미 리포트가 출력된 쿼리 (재개용)
+def load_finished(path: str) -> set[str]:
+    finished: set[str] = set()
+    if not os.path.exists(path):
+        return finished
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # 중단 시 잘린 마지막 줄
+            if "report" in record:
+                finished.add(record["query"])
+    return finished
+
+# 배치 리서치 실행
+async def run_batch(
+    queries: list[str],
+    output_path: str,
+    concurrency: int,
+    scheduler: SearchScheduler,
+    cache: SearchCache | None,
+    pipelined: bool,
+) -> None:
+    semaphore = asyncio.Semaphore(concurrency)
+    with open(output_path, "a", encoding="utf-8") as output:
+        # 리서치 하나 실행 후 결과를 JSONL로 추가
+        async def research(query: str) -> None:
+            async with semaphore:
+                manager = ResearchManager(
+                    scheduler=scheduler,
+                    cache=cache,
+                    pipelined=pipelined,
+                    printer=JsonLinesPrinter(job=query),
+                )
+                record: dict = {"query": query}
+                try:
+                    report = await manager.research(query)
+                    record["report"] = report.model_dump()
+                except Exception as e:
+                    record["error"] = repr(e)
+                record["timings"] = manager.timings
+                output.write(json.dumps(record, ensure_ascii=False) + "\n")
+                output.flush()
+
+        await asyncio.gather(*(research(query) for query in queries))
+
+# main
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("queries", help="쿼리 파일 (한 줄에 하나, -이면 표준 입력)")
+    parser.add_argument("-o", "--output", default="reports.jsonl", help="출력 JSONL 파일")
+    parser.add_argument("--concurrency", type=int, default=4, help="동시에 실행할 리서치 수")
+    parser.add_argument("--search-concurrency", type=int, default=10, help="전체 동시 검색 수")
+    parser.add_argument("--rpm", type=float, default=None, help="전체 검색 요청 수/분")
+    parser.add_argument("--tpm", type=float, default=None, help="전체 검색 토큰 수/분")
+    parser.add_argument("--cache", default=None, help="검색 캐시 SQLite 파일")
+    parser.add_argument("--pipelined", action="store_true", help="파이프라인 모드")
+    parser.add_argument("--metrics", help="지표 출력 파일 (.prom이면 Prometheus 텍스트, 그 외는 JSON)")
+    args = parser.parse_args()
+
+    # 지표 수집
+    if args.metrics:
+        sys.path.append(str(Path(__file__).resolve().parents[2]))
+        from agent_metrics import dump_metrics, install_metrics
+        metrics = install_metrics()
+
+    # 이미 끝난 쿼리는 건너뜀
+    finished = load_finished(args.output)
+    queries = [query for query in dict.fromkeys(read_queries(args.queries)) if query not in finished]
+    print(f"{len(queries)} queries to run ({len(finished)} already done)", file=sys.stderr)
+
+    # 모든 리서치가 공유하는 검색 스케줄러와 캐시
+    scheduler = SearchScheduler(
+        max_concurrency=args.search_concurrency,
+        requests_per_minute=args.rpm,
+        tokens_per_minute=args.tpm,
+    )
+    cache = SearchCache(args.cache) if args.cache else None
+
+    start = time.perf_counter()
+    try:
+        await run_batch(queries, args.output, args.concurrency, scheduler, cache, args.pipelined)
+    finally:
+        if cache is not None:
+            cache.close()
+        if args.metrics:
+            dump_metrics(metrics, args.metrics)
+    print(
+        f"Done in {time.perf_counter() - start:.1f}s: "
+        f"{scheduler.stats.succeeded} searches, {scheduler.stats.dropped} dropped",
+        file=sys.stderr,
+    )
+
+# main 실행
+if __name__ == "__main__":
+    asyncio.run(main())
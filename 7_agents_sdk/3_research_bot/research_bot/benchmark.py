@@ -0,0 +1,134 @@
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from agents import RunConfig, set_tracing_disabled
+from .hedging import HedgePolicy
+from .manager import ResearchManager
+from .printer import JsonLinesPrinter
+from .scheduler import SearchScheduler
+
+# 에이전트 예제 공용 가짜 프로바이더 (7_agents_sdk/fake_provider.py)
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from fake_provider import FakeModelProfile, FakeModelProvider
+
+# 백분위 값
+def percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+# 이벤트 루프 지연 측정 (interval마다 깨어나 예정보다 늦은 시간을 기록)
+async def monitor_loop_lag(samples: list[float], interval: float = 0.01) -> None:
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        samples.append(loop.time() - start - interval)
+
+# 벤치마크 실행
+async def run_benchmark(args: argparse.Namespace) -> None:
+    # 네트워크 없이 실행하기 위해 트레이스 전송을 끄고 가짜 프로바이더 사용
+    set_tracing_disabled(True)
+    search_profile = FakeModelProfile(
+        median_latency=args.search_latency,
+        latency_sigma=args.sigma,
+        tokens_per_second=args.tokens_per_second,
+        output_tokens=300,
+        error_rate=args.error_rate,
+    )
+    provider = FakeModelProvider(
+        profiles={
+            "gpt-4o": FakeModelProfile(
+                median_latency=args.plan_latency, latency_sigma=0.2,
+                tokens_per_second=args.tokens_per_second,
+            ),
+            "o3-mini": FakeModelProfile(
+                median_latency=args.write_latency, latency_sigma=0.2, output_tokens=1000,
+                tokens_per_second=args.tokens_per_second,
+            ),
+        },
+        default=search_profile,
+        num_searches=args.searches,
+        seed=args.seed,
+    )
+    run_config = RunConfig(model_provider=provider, tracing_disabled=True)
+    scheduler = SearchScheduler(max_concurrency=args.search_concurrency, base_delay=0.1)
+    hedging = HedgePolicy(initial_delay=args.search_latency * 3) if args.hedge else None
+    semaphore = asyncio.Semaphore(args.concurrency)
+    devnull = open(os.devnull, "w")
+
+    latencies: list[float] = []
+    stage_times: dict[str, list[float]] = {}
+
+    # 리서치 하나 실행
+    async def research(index: int) -> None:
+        async with semaphore:
+            manager = ResearchManager(
+                scheduler=scheduler,
+                pipelined=args.pipelined,
+                hedging=hedging,
+                printer=JsonLinesPrinter(devnull),
+                run_config=run_config,
+            )
+            start = time.perf_counter()
+            await manager.research(f"벤치마크 쿼리 {index}")
+            latencies.append(time.perf_counter() - start)
+            for stage, seconds in manager.timings.items():
+                stage_times.setdefault(stage, []).append(seconds)
+
+    lag_samples: list[float] = []
+    monitor = asyncio.create_task(monitor_loop_lag(lag_samples))
+    tracemalloc.start()
+    start = time.perf_counter()
+    await asyncio.gather(*(research(i) for i in range(args.runs)))
+    elapsed = time.perf_counter() - start
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    monitor.cancel()
+    devnull.close()
+
+    # 결과 출력
+    print(f"runs: {args.runs} in {elapsed:.2f}s ({args.runs / elapsed:.2f} reports/s)")
+    print(
+        "latency: "
+        f"p50={percentile(latencies, 0.5):.2f}s "
+        f"p90={percentile(latencies, 0.9):.2f}s "
+        f"p99={percentile(latencies, 0.99):.2f}s "
+        f"max={max(latencies):.2f}s"
+    )
+    for stage, values in stage_times.items():
+        print(f"stage {stage}: mean={statistics.mean(values):.2f}s p90={percentile(values, 0.9):.2f}s")
+    if lag_samples:
+        print(
+            "event loop lag: "
+            f"p50={percentile(lag_samples, 0.5) * 1000:.1f}ms "
+            f"p99={percentile(lag_samples, 0.99) * 1000:.1f}ms "
+            f"max={max(lag_samples) * 1000:.1f}ms"
+        )
+    print(f"peak memory: {peak_memory / 1024 / 1024:.1f} MiB")
+    stats = scheduler.stats
+    print(f"searches: {stats.succeeded} ok, {stats.retried} retried, {stats.dropped} dropped")
+    if hedging is not None:
+        print(f"hedging: {hedging.stats.hedged} hedged, {hedging.stats.hedge_wins} hedge wins")
+
+# main 실행
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=20, help="리서치 실행 횟수")
+    parser.add_argument("--concurrency", type=int, default=4, help="동시 리서치 수")
+    parser.add_argument("--searches", type=int, default=10, help="리서치당 검색 수")
+    parser.add_argument("--search-concurrency", type=int, default=10, help="전체 동시 검색 수")
+    parser.add_argument("--plan-latency", type=float, default=0.5, help="계획 지연 중앙값(초)")
+    parser.add_argument("--search-latency", type=float, default=0.5, help="검색 지연 중앙값(초)")
+    parser.add_argument("--write-latency", type=float, default=1.0, help="작성 지연 중앙값(초)")
+    parser.add_argument("--sigma", type=float, default=0.8, help="검색 지연 분포의 시그마")
+    parser.add_argument("--tokens-per-second", type=float, default=1000.0, help="출력 토큰 속도")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="검색 오류 비율")
+    parser.add_argument("--pipelined", action="store_true", help="파이프라인 모드")
+    parser.add_argument("--hedge", action="store_true", help="헤지 요청 사용")
+    parser.add_argument("--seed", type=int, default=0, help="난수 시드")
+    asyncio.run(run_benchmark(parser.parse_args()))
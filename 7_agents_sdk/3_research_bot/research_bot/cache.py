@@ -0,0 +1,125 @@
+from __future__ import annotations
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import unicodedata
+from agents import Agent
+
+# 검색어 정규화 (유니코드 정규화, 소문자화, 공백 정리)
+def normalize_text(text: str) -> str:
+    return " ".join(unicodedata.normalize("NFKC", text).lower().split())
+
+# 캐시 키 생성 (검색어, 검색 이유, 에이전트 지시, 모델)
+def make_cache_key(query: str, reason: str, agent: Agent) -> str:
+    model = agent.model if isinstance(agent.model, str) else str(agent.model or "default")
+    key = json.dumps(
+        [normalize_text(query), normalize_text(reason), agent.instructions, model],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+# SQLite 기반 검색 결과 캐시 (TTL + LRU/용량 제한)
+class SearchCache:
+    # 초기화
+    def __init__(
+        self,
+        path: str = "research_cache.sqlite3",
+        ttl: float = 7 * 24 * 3600,
+        max_entries: int = 10000,
+        max_bytes: int = 100 * 1024 * 1024,
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        # 여러 프로세스가 같은 파일을 공유할 수 있도록 WAL 모드 + 대기 시간 설정
+        self.conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS search_cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, "
+            "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS search_cache_accessed ON search_cache (accessed_at)"
+        )
+        # 저장할 때마다 만료 항목을 지우므로 created_at에도 인덱스 (없으면 매번 전체 테이블 스캔)
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS search_cache_created ON search_cache (created_at)"
+        )
+
+    # 캐시 조회 (동기)
+    def _get(self, key: str) -> str | None:
+        with self.lock:
+            return self._get_locked(key)
+
+    # 캐시 조회 본체
+    def _get_locked(self, key: str) -> str | None:
+        now = time.time()
+        row = self.conn.execute(
+            "SELECT value, created_at FROM search_cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        value, created_at = row
+        if now - created_at > self.ttl:
+            self.conn.execute("DELETE FROM search_cache WHERE key = ?", (key,))
+            return None
+        self.conn.execute("UPDATE search_cache SET accessed_at = ? WHERE key = ?", (now, key))
+        return value
+
+    # 캐시 저장과 축출 (동기)
+    def _put(self, key: str, value: str) -> None:
+        with self.lock:
+            self._put_locked(key, value)
+
+    # 캐시 저장 본체
+    def _put_locked(self, key: str, value: str) -> None:
+        now = time.time()
+        size = len(value.encode("utf-8"))
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO search_cache VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, now, now),
+            )
+            self.conn.execute("DELETE FROM search_cache WHERE created_at < ?", (now - self.ttl,))
+            count, total = self.conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM search_cache"
+            ).fetchone()
+            # 가장 오래 사용되지 않은 항목부터 삭제
+            while count > self.max_entries or total > self.max_bytes:
+                row = self.conn.execute(
+                    "SELECT key, size FROM search_cache ORDER BY accessed_at LIMIT 1"
+                ).fetchone()
+                if row is None:
+                    break
+                self.conn.execute("DELETE FROM search_cache WHERE key = ?", (row[0],))
+                count -= 1
+                total -= row[1]
+            self.conn.execute("COMMIT")
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+
+    # 캐시 조회 (이벤트 루프를 막지 않도록 스레드에서 실행)
+    async def get(self, key: str) -> str | None:
+        value = await asyncio.to_thread(self._get, key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    # 캐시 저장
+    async def put(self, key: str, value: str) -> None:
+        await asyncio.to_thread(self._put, key, value)
+
+    # 캐시 닫기
+    def close(self) -> None:
+        self.conn.close()
@@ -0,0 +1,209 @@
+from __future__ import annotations
+import argparse
+import json
+import random
+import re
+import time
+import unicodedata
+import zlib
+from dataclasses import dataclass, field
+
+try:
+    import tiktoken
+    _ENCODING = tiktoken.get_encoding("o200k_base")
+except Exception:
+    _ENCODING = None
+
+# MinHash를 NumPy로 한 번에 계산 (없으면 같은 식을 순수 파이썬으로 계산, 서명은 같음)
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# 순열 해시의 소수 (a*h가 64비트 안에 들어가도록 2^31-1 사용)
+_PRIME = (1 << 31) - 1
+
+# 토큰 수 추정 (tiktoken이 없으면 문자 수 기반 근사)
+def count_tokens(text: str) -> int:
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text))
+    return (len(text) + 1) // 2
+
+# 비교용 정규화 (유니코드 정규화, 소문자화, 문장부호와 공백 제거)
+def normalize(text: str) -> str:
+    text = unicodedata.normalize("NFKC", text).lower()
+    return re.sub(r"[\W_]+", "", text)
+
+# 문자 n-gram 싱글 (해시 값 집합)
+def shingles(text: str, size: int = 5) -> set[int]:
+    text = normalize(text)
+    if len(text) <= size:
+        return {zlib.crc32(text.encode("utf-8"))}
+    return {zlib.crc32(text[i : i + size].encode("utf-8")) for i in range(len(text) - size + 1)}
+
+# MinHash 서명 생성기
+class MinHasher:
+    # 초기화 (같은 seed면 같은 서명이 나오므로 오프라인 벤치마크를 재현 가능)
+    def __init__(self, num_perm: int = 64, bands: int = 16, seed: int = 1):
+        rng = random.Random(seed)
+        self.params = [(rng.randrange(1, _PRIME), rng.randrange(0, _PRIME)) for _ in range(num_perm)]
+        self.bands = bands
+        self.rows = num_perm // bands
+        if np is not None:
+            self.a = np.array([a for a, _ in self.params], dtype=np.uint64)[:, None]
+            self.b = np.array([b for _, b in self.params], dtype=np.uint64)[:, None]
+
+    # 서명 계산 (순열마다 (a*h + b) mod p의 최솟값)
+    # NumPy가 있으면 순열 수 x 싱글 수 행렬로 한 번에 계산 (순수 파이썬 루프는 GIL을 오래 잡음)
+    def signature(self, hashes: set[int]) -> tuple[int, ...]:
+        if np is not None:
+            values = np.fromiter(hashes, dtype=np.uint64, count=len(hashes)) % _PRIME
+            return tuple(((self.a * values + self.b) % _PRIME).min(axis=1).tolist())
+        return tuple(min((a * (h % _PRIME) + b) % _PRIME for h in hashes) for a, b in self.params)
+
+    # LSH 밴드 키 (같은 밴드 키를 공유하는 단락만 후보로 비교)
+    def band_keys(self, signature: tuple[int, ...]) -> list[tuple[int, tuple[int, ...]]]:
+        return [
+            (band, signature[band * self.rows : (band + 1) * self.rows])
+            for band in range(self.bands)
+        ]
+
+# 중복 제거된 단락
+@dataclass
+class Paragraph:
+    text: str
+    sources: list[str] = field(default_factory=list)
+    count: int = 1  # 합쳐진 단락 수
+
+# 중복 제거 결과
+@dataclass
+class DedupResult:
+    prompt: str  # 작성자 에이전트에 넘길 구조화된 검색 결과
+    paragraphs_in: int
+    paragraphs_out: int
+    tokens_before: int  # 중복 제거 전 (모든 단락을 같은 형식으로 나열했을 때)
+    tokens_after: int  # 최종 프롬프트
+    tokens_deduplicated: int  # 중복 제거로 줄인 토큰 수
+    tokens_dropped_for_budget: int  # 예산 초과로 뺀 단락의 토큰 수
+    dropped_for_budget: int  # 예산 초과로 뺀 단락 수
+
+# 요약을 단락으로 나누기 ((출처, 단락) 리스트)
+def split_paragraphs(results: list[tuple[str, str]]) -> list[tuple[str, str]]:
+    return [
+        (source, text.strip())
+        for source, summary in results
+        for text in re.split(r"\n\s*\n", summary)
+        if text.strip()
+    ]
+
+# 프롬프트에 넣는 단락 형식
+def format_section(number: int, sources: list[str], text: str) -> str:
+    return f"[{number}] (출처: {'; '.join(sources)})\n{text}"
+
+# 거의 같은 단락을 하나로 합침 (results: (출처, 요약) 리스트)
+def collapse_duplicates(
+    results: list[tuple[str, str]], threshold: float = 0.7, hasher: MinHasher | None = None
+) -> list[Paragraph]:
+    hasher = hasher or MinHasher()
+    paragraphs: list[Paragraph] = []
+    signatures: list[tuple[int, ...]] = []
+    buckets: dict[tuple[int, tuple[int, ...]], list[int]] = {}
+    for source, text in split_paragraphs(results):
+        signature = hasher.signature(shingles(text))
+
+        # 후보 중 추정 유사도가 임계값 이상인 단락이 있으면 합침
+        match = None
+        for key in hasher.band_keys(signature):
+            for index in buckets.get(key, []):
+                other = signatures[index]
+                similarity = sum(x == y for x, y in zip(signature, other)) / len(signature)
+                if similarity >= threshold:
+                    match = index
+                    break
+            if match is not None:
+                break
+
+        if match is not None:
+            paragraph = paragraphs[match]
+            paragraph.count += 1
+            if source not in paragraph.sources:
+                paragraph.sources.append(source)
+            # 더 긴 쪽을 대표 단락으로 유지
+            if len(text) > len(paragraph.text):
+                paragraph.text = text
+            continue
+
+        index = len(paragraphs)
+        paragraphs.append(Paragraph(text=text, sources=[source]))
+        signatures.append(signature)
+        for key in hasher.band_keys(signature):
+            buckets.setdefault(key, []).append(index)
+    return paragraphs
+
+# 중복 제거 후 토큰 예산 안에 들어가도록 구조화된 프롬프트로 정리
+def pack_search_results(
+    results: list[tuple[str, str]], token_budget: int = 8000, threshold: float = 0.7
+) -> DedupResult:
+    paragraphs = collapse_duplicates(results, threshold=threshold)
+
+    # 여러 검색에서 확인된 단락을 우선, 그다음은 원래 순서
+    order = sorted(range(len(paragraphs)), key=lambda i: (-paragraphs[i].count, i))
+    sections: list[str] = []
+    used = 0
+    dropped = 0
+    dropped_tokens = 0
+    for i in order:
+        paragraph = paragraphs[i]
+        section = format_section(len(sections) + 1, paragraph.sources, paragraph.text)
+        tokens = count_tokens(section)
+        if used + tokens > token_budget:
+            dropped += 1
+            dropped_tokens += tokens
+            continue
+        sections.append(section)
+        used += tokens
+
+    # 중복 제거 전후를 같은 방식(단락마다 형식을 붙여 따로 셈)으로 비교
+    tokens_before = sum(
+        count_tokens(format_section(n + 1, [source], text))
+        for n, (source, text) in enumerate(split_paragraphs(results))
+    )
+    prompt = "\n\n".join(sections)
+    return DedupResult(
+        prompt=prompt,
+        paragraphs_in=sum(p.count for p in paragraphs),
+        paragraphs_out=len(sections),
+        tokens_before=tokens_before,
+        tokens_after=used,
+        tokens_deduplicated=max(0, tokens_before - used - dropped_tokens),
+        tokens_dropped_for_budget=dropped_tokens,
+        dropped_for_budget=dropped,
+    )
+
+# 저장된 요약으로 오프라인 벤치마크
+# 입력: 요약 문자열 리스트 또는 {"query": ..., "summary": ...} 리스트의 JSON 파일
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("path", help="저장된 검색 요약 JSON 파일")
+    parser.add_argument("--budget", type=int, default=8000, help="토큰 예산")
+    parser.add_argument("--threshold", type=float, default=0.7, help="중복 판정 유사도")
+    parser.add_argument("--repeat", type=int, default=10, help="반복 횟수")
+    args = parser.parse_args()
+
+    with open(args.path, encoding="utf-8") as f:
+        data = json.load(f)
+    results = [
+        (entry["query"], entry["summary"]) if isinstance(entry, dict) else (f"#{i}", entry)
+        for i, entry in enumerate(data)
+    ]
+
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        result = pack_search_results(results, args.budget, args.threshold)
+    elapsed = (time.perf_counter() - start) / args.repeat
+
+    print(f"paragraphs: {result.paragraphs_in} -> {result.paragraphs_out}")
+    print(f"tokens: {result.tokens_before} -> {result.tokens_after}")
+    print(f"deduplicated: {result.tokens_deduplicated} tokens")
+    print(f"dropped for budget: {result.dropped_for_budget} paragraphs, {result.tokens_dropped_for_budget} tokens")
+    print(f"time: {elapsed * 1000:.1f} ms")
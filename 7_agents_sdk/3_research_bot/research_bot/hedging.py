@@ -0,0 +1,123 @@
+from __future__ import annotations
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Awaitable, Callable, TypeVar
+
+T = TypeVar("T")
+
+# 최근 지연 시간 기록 (백분위 계산용)
+class LatencyTracker:
+    # 초기화
+    def __init__(self, window: int = 100):
+        self.samples: deque[float] = deque(maxlen=window)
+
+    # 지연 시간 기록
+    def record(self, latency: float) -> None:
+        self.samples.append(latency)
+
+    # 백분위 값 (샘플이 없으면 None)
+    def percentile(self, q: float) -> float | None:
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+# 헤징 통계
+@dataclass
+class HedgeStats:
+    requests: int = 0  # 요청 수
+    hedged: int = 0  # 중복 요청을 보낸 수
+    hedge_wins: int = 0  # 중복 요청이 먼저 끝난 수
+    timeouts: int = 0  # 검색별 마감 시간을 넘긴 수
+
+# 헤지 요청 정책 (적응형 임계값을 넘기면 같은 요청을 한 번 더 보내고 먼저 끝난 쪽을 사용)
+class HedgePolicy:
+    # 초기화
+    def __init__(
+        self,
+        percentile: float = 0.9,
+        initial_delay: float = 10.0,
+        min_delay: float = 1.0,
+        min_samples: int = 5,
+        search_timeout: float | None = None,
+        window: int = 100,
+    ):
+        self.percentile = percentile
+        self.initial_delay = initial_delay
+        self.min_delay = min_delay
+        self.min_samples = min_samples
+        self.search_timeout = search_timeout
+        self.latencies = LatencyTracker(window)
+        self.stats = HedgeStats()
+
+    # 헤지 요청을 보낼 때까지의 대기 시간
+    def hedge_delay(self) -> float:
+        if len(self.latencies.samples) < self.min_samples:
+            return self.initial_delay
+        return max(self.min_delay, self.latencies.percentile(self.percentile))
+
+    # 시작 시각을 기록하며 실행
+    # censor=True이면 도중에 취소돼도 그때까지의 경과 시간을 기록 (실제 지연은 그 이상인 중도 절단 표본)
+    # 헤지 요청에게 지고 취소된 원 요청을 빼면 느린 요청이 기록에서 빠져 p90이 점점 낮아짐
+    async def _timed(self, func: Callable[[], Awaitable[T]], censor: bool = False) -> T:
+        start = time.monotonic()
+        try:
+            result = await func()
+        except asyncio.CancelledError:
+            if censor:
+                self.latencies.record(time.monotonic() - start)
+            raise
+        self.latencies.record(time.monotonic() - start)
+        return result
+
+    # 헤지 요청 실행 (acquire: 레이트 리밋 할당량을 먼저 확보하는 함수)
+    async def _hedge(
+        self, func: Callable[[], Awaitable[T]], acquire: Callable[[], Awaitable[None]] | None
+    ) -> T:
+        if acquire is not None:
+            await acquire()
+        self.stats.hedged += 1
+        return await self._timed(func)
+
+    # 헤지 요청과 함께 실행 (먼저 성공한 결과 반환)
+    async def _run_hedged(
+        self, func: Callable[[], Awaitable[T]], acquire: Callable[[], Awaitable[None]] | None
+    ) -> T:
+        primary = asyncio.create_task(self._timed(func, censor=True))
+        pending = {primary}
+        try:
+            done, pending = await asyncio.wait(pending, timeout=self.hedge_delay())
+            if done:
+                return primary.result()
+
+            hedge = asyncio.create_task(self._hedge(func, acquire))
+            pending.add(hedge)
+            while True:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                succeeded = [task for task in done if task.exception() is None]
+                if succeeded:
+                    if succeeded[0] is hedge:
+                        self.stats.hedge_wins += 1
+                    return succeeded[0].result()
+                # 양쪽 모두 실패하면 오류 전달
+                if not pending:
+                    return done.pop().result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    # 실행 (검색별 마감 시간을 넘기면 TimeoutError)
+    # acquire를 지정하면 헤지 요청도 보내기 전에 레이트 리밋 할당량을 확보 (원 요청은 호출하는 쪽에서 확보)
+    async def run(
+        self, func: Callable[[], Awaitable[T]], acquire: Callable[[], Awaitable[None]] | None = None
+    ) -> T:
+        self.stats.requests += 1
+        if self.search_timeout is None:
+            return await self._run_hedged(func, acquire)
+        try:
+            return await asyncio.wait_for(self._run_hedged(func, acquire), self.search_timeout)
+        except asyncio.TimeoutError:
+            self.stats.timeouts += 1
+            raise
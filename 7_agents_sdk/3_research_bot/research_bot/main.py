@@ -1,10 +1,15 @@
 import asyncio
+from .cache import SearchCache
 from .manager import ResearchManager
 
 # main
 async def main() -> None:
     query = input("무엇을 연구하고 싶으세요?")
-    await ResearchManager().run(query)
+    cache = SearchCache()
+    try:
+        await ResearchManager(cache=cache).run(query)
+    finally:
+        cache.close()
 
 # main 실행
 if __name__ == "__main__":
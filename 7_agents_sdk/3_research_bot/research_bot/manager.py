@@ -1,22 +1,76 @@
 from __future__ import annotations
 import asyncio
+import math
 import time
+from typing import Literal
+from openai.types.responses import ResponseTextDeltaEvent
 from rich.console import Console
-from agents import Runner, custom_span, gen_trace_id, trace
+from agents import RunConfig, Runner, custom_span, gen_trace_id, trace
 from .agents.planner_agent import WebSearchItem, WebSearchPlan, planner_agent
 from .agents.search_agent import search_agent
 from .agents.writer_agent import ReportData, writer_agent
-from .printer import Printer
+from .cache import SearchCache, make_cache_key
+from .dedup import pack_search_results
+from .hedging import HedgePolicy
+from .plan_parser import SearchPlanParser
+from .printer import JsonLinesPrinter, Printer
+from .scheduler import SearchScheduler
 
 # 리서치 매니저
 class ResearchManager:
     # 초기화
-    def __init__(self):
-        self.console = Console()
-        self.printer = Printer(self.console)
+    # pipelined=True이면 계획 스트리밍 중에 검색을 시작하고,
+    # quorum 비율의 결과가 모이거나 deadline(초)이 지나면 리포트 작성을 시작
+    # late_policy: 늦게 도착한 결과를 버리거나("drop") 리포트 작성 중에 도착한 것만 부록으로 덧붙임("appendix")
+    #   부록은 작성 에이전트가 읽지 않은 원본 요약이므로 본문과 구분해서 출력
+    # hedging을 지정하면 느린 검색에 중복 요청을 보내고,
+    # search_deadline(초)이 지나면 남은 검색을 포기 (파이프라인 모드는 첫 검색을 시작한 시각부터)
+    def __init__(
+        self,
+        scheduler: SearchScheduler | None = None,
+        cache: SearchCache | None = None,
+        pipelined: bool = False,
+        quorum: float = 0.8,
+        deadline: float | None = 60.0,
+        late_policy: Literal["drop", "appendix"] = "drop",
+        hedging: HedgePolicy | None = None,
+        search_deadline: float | None = None,
+        printer: Printer | JsonLinesPrinter | None = None,
+        writer_token_budget: int = 8000,
+        run_config: RunConfig | None = None,
+    ):
+        # 터미널이 아니면(헤드리스 실행) JSON Lines로 상태 변화만 출력
+        if printer is None:
+            console = Console()
+            printer = Printer(console) if console.is_terminal else JsonLinesPrinter()
+        self.printer = printer
+        self.scheduler = scheduler or SearchScheduler()
+        self.cache = cache
+        self.pipelined = pipelined
+        self.quorum = quorum
+        self.deadline = deadline
+        self.late_policy = late_policy
+        self.hedging = hedging
+        self.search_deadline = search_deadline
+        self.writer_token_budget = writer_token_budget
+        self.run_config = run_config  # 모델 프로바이더 교체용 (벤치마크 등)
+        self.search_sources: dict[str, str] = {}  # 요약 -> 검색어
+        self.timings: dict[str, float] = {}  # 단계별 소요 시간(초)
 
-    # 리서치 실행
-    async def run(self, query: str) -> None:
+    # 리서치 실행 후 리포트 출력
+    async def run(self, query: str) -> ReportData:
+        report = await self.research(query)
+
+        print("\n\n=====REPORT=====\n\n")
+        print(f"Report: {report.markdown_report}")
+        print("\n\n=====FOLLOW UP QUESTIONS=====\n\n")
+        follow_up_questions = "\n".join(report.follow_up_questions)
+        print(f"Follow up questions: {follow_up_questions}")
+        return report
+
+    # 리서치 실행 (리포트 반환)
+    async def research(self, query: str) -> ReportData:
+        start = time.perf_counter()
         trace_id = gen_trace_id()
         with trace("Research trace", trace_id=trace_id):
             self.printer.update_item(
@@ -33,25 +87,35 @@ class ResearchManager:
                 hide_checkmark=True,
             )
 
-            # 웹 검색 계획 생성
-            search_plan = await self._plan_searches(query)
+            if self.pipelined:
+                # 계획 생성과 검색을 겹쳐서 실행
+                search_results, late_tasks = await self._plan_and_search_pipelined(query)
+                self.timings["plan_and_search"] = time.perf_counter() - start
 
-            # 검색 쿼리 실행
-            search_results = await self._perform_searches(search_plan)
+                # 리포트 작성 (늦은 검색은 정책에 따라 계속 실행)
+                report = await self._write_report(query, search_results)
+                report = self._append_late_results(report, late_tasks)
+            else:
+                # 웹 검색 계획 생성
+                search_plan = await self._plan_searches(query)
+                self.timings["plan"] = time.perf_counter() - start
 
-            # 리포트 작성
-            report = await self._write_report(query, search_results)
+                # 검색 쿼리 실행
+                search_results = await self._perform_searches(search_plan)
+                self.timings["search"] = time.perf_counter() - start - self.timings["plan"]
+
+                # 리포트 작성
+                report = await self._write_report(query, search_results)
+            self.timings["total"] = time.perf_counter() - start
+            self.timings["write"] = self.timings["total"] - sum(
+                value for key, value in self.timings.items() if key != "total"
+            )
 
             final_report = f"Report summary\n\n{report.short_summary}"
             self.printer.update_item("final_report", final_report, is_done=True)
 
             self.printer.end()
-
-        print("\n\n=====REPORT=====\n\n")
-        print(f"Report: {report.markdown_report}")
-        print("\n\n=====FOLLOW UP QUESTIONS=====\n\n")
-        follow_up_questions = "\n".join(report.follow_up_questions)
-        print(f"Follow up questions: {follow_up_questions}")
+        return report
 
     # 웹 검색 계획 생성
     async def _plan_searches(self, query: str) -> WebSearchPlan:
@@ -59,6 +123,7 @@ class ResearchManager:
         result = await Runner.run(
             planner_agent,
             f"쿼리: {query}",
+            run_config=self.run_config,
         )
         self.printer.update_item(
             "planning",
@@ -74,36 +139,217 @@ class ResearchManager:
             num_completed = 0
             tasks = [asyncio.create_task(self._search(item)) for item in search_plan.searches]
             results = []
-            for task in asyncio.as_completed(tasks):
-                result = await task
-                if result is not None:
-                    results.append(result)
-                num_completed += 1
+            num_dropped = 0
+            try:
+                for task in asyncio.as_completed(tasks, timeout=self.search_deadline):
+                    result = await task
+                    if result is not None:
+                        results.append(result)
+                    else:
+                        num_dropped += 1
+                    num_completed += 1
+                    self.printer.update_item(
+                        "searching", f"Searching... {num_completed}/{len(tasks)} completed"
+                    )
+            except asyncio.TimeoutError:
+                # 검색 단계 마감 시간 초과: 끝나지 않은 검색은 포기
+                for task in tasks:
+                    task.cancel()
+                num_dropped += len(tasks) - num_completed
+            self._update_hedge_status()
+            self.printer.update_item(
+                "searching",
+                f"Searched {len(results)}/{len(tasks)} ({num_dropped} dropped)",
+                is_done=True,
+            )
+            return results
+
+    # 계획 스트리밍과 검색을 파이프라인으로 실행 (결과와 아직 끝나지 않은 검색 태스크 반환)
+    async def _plan_and_search_pipelined(
+        self, query: str
+    ) -> tuple[list[str], set[asyncio.Task[str | None]]]:
+        self.printer.update_item("planning", "Planning searches...")
+        tasks: set[asyncio.Task[str | None]] = set()
+        loop = asyncio.get_running_loop()
+        search_started: float | None = None  # 첫 검색을 시작한 시각 (search_deadline 기준)
+
+        # 계획 JSON이 스트리밍되는 동안 검색 아이템이 완성될 때마다 검색 시작
+        parser = SearchPlanParser()
+        result = Runner.run_streamed(
+            planner_agent,
+            f"쿼리: {query}",
+            run_config=self.run_config,
+        )
+        async for event in result.stream_events():
+            if event.type == "raw_response_event" and isinstance(
+                event.data, ResponseTextDeltaEvent
+            ):
+                for item in parser.feed(event.data.delta):
+                    if search_started is None:
+                        search_started = loop.time()
+                    tasks.add(asyncio.create_task(self._search(item)))
+                    self.printer.update_item(
+                        "planning", f"Planning searches... {len(tasks)} started"
+                    )
+
+        # 스트림에서 놓친 아이템이 있으면 최종 출력 기준으로 보충
+        search_plan = result.final_output_as(WebSearchPlan)
+        for item in search_plan.searches[len(tasks) :]:
+            if search_started is None:
+                search_started = loop.time()
+            tasks.add(asyncio.create_task(self._search(item)))
+        self.printer.update_item(
+            "planning", f"Will perform {len(tasks)} searches", is_done=True
+        )
+
+        # 정족수 또는 마감 시간까지 결과 수집
+        with custom_span("Search the web"):
+            self.printer.update_item("searching", "Searching...")
+            quorum = math.ceil(len(tasks) * self.quorum)
+            deadline = loop.time() + self.deadline if self.deadline is not None else None
+            search_deadline = None
+            if self.search_deadline is not None and search_started is not None:
+                search_deadline = search_started + self.search_deadline
+                deadline = search_deadline if deadline is None else min(deadline, search_deadline)
+            results: list[str] = []
+            pending = set(tasks)
+            num_completed = 0
+            while pending and num_completed < quorum:
+                timeout = None if deadline is None else max(0.0, deadline - loop.time())
+                done, pending = await asyncio.wait(
+                    pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    break
+                for task in done:
+                    num_completed += 1
+                    if task.result() is not None:
+                        results.append(task.result())
                 self.printer.update_item(
                     "searching", f"Searching... {num_completed}/{len(tasks)} completed"
                 )
-            self.printer.mark_item_done("searching")
-            return results
 
-    # 개별 검색 쿼리 실행
+            self._update_hedge_status()
+            if self.late_policy == "drop" or (search_deadline is not None and loop.time() >= search_deadline):
+                for task in pending:
+                    task.cancel()
+                pending = set()
+            elif search_deadline is not None:
+                # 리포트를 쓰는 동안에도 검색 단계 마감 시간이 지나면 남은 검색을 포기
+                late = set(pending)
+                loop.call_at(search_deadline, lambda: [task.cancel() for task in late])
+            self.printer.update_item(
+                "searching",
+                f"Writing with {len(results)}/{len(tasks)} results ({len(pending)} still running)",
+                is_done=True,
+            )
+            return results, pending
+
+    # 리포트 작성 중에 끝난 검색 결과를 부록으로 덧붙이고 남은 검색은 취소
+    # 작성 에이전트가 반영하지 않은 원본 요약이므로 검색어와 함께 본문과 분리해서 표시
+    def _append_late_results(
+        self, report: ReportData, late_tasks: set[asyncio.Task[str | None]]
+    ) -> ReportData:
+        late_results = []
+        for task in late_tasks:
+            if task.done() and not task.cancelled() and task.result() is not None:
+                late_results.append(task.result())
+            else:
+                task.cancel()
+        if not late_results:
+            return report
+        sections = [
+            f"### {self.search_sources.get(summary, '검색 결과')}\n\n{summary}" for summary in late_results
+        ]
+        appendix = "\n\n".join(sections)
+        return report.model_copy(
+            update={
+                "markdown_report": (
+                    f"{report.markdown_report}\n\n## 부록: 리포트 작성 후 도착한 검색 결과\n\n"
+                    f"_아래 내용은 본문 작성에 반영되지 않은 검색 요약입니다._\n\n{appendix}"
+                )
+            }
+        )
+
+    # 개별 검색 쿼리 실행 (스케줄러가 동시 실행 수, 레이트 리밋, 재시도를 관리)
     async def _search(self, item: WebSearchItem) -> str | None:
+        # 캐시 확인
+        if self.cache is not None:
+            key = make_cache_key(item.query, item.reason, search_agent)
+            cached = await self.cache.get(key)
+            self._update_cache_status()
+            if cached is not None:
+                self.search_sources[cached] = item.query
+                return cached
+
         input = f"검색어: {item.query}\n검색 이유: {item.reason}"
-        try:
+
+        async def run_search() -> str:
             result = await Runner.run(
                 search_agent,
                 input,
+                run_config=self.run_config,
             )
             return str(result.final_output)
-        except Exception:
-            return None
+
+        if self.hedging is not None:
+            result = await self.scheduler.run(
+                lambda: self.hedging.run(run_search, acquire=self.scheduler.acquire_rate)
+            )
+        else:
+            result = await self.scheduler.run(run_search)
+        if result is not None:
+            self.search_sources[result] = item.query
+            if self.cache is not None:
+                await self.cache.put(key, result)
+        return result
+
+    # 캐시 적중 상황 표시
+    def _update_cache_status(self) -> None:
+        self.printer.update_item(
+            "cache",
+            f"Search cache: {self.cache.hits} hits / {self.cache.misses} misses",
+            is_done=True,
+            hide_checkmark=True,
+        )
+
+    # 헤지 요청 상황 표시
+    def _update_hedge_status(self) -> None:
+        if self.hedging is None:
+            return
+        stats = self.hedging.stats
+        self.printer.update_item(
+            "hedging",
+            f"Hedged {stats.hedged}/{stats.requests} searches "
+            f"({stats.hedge_wins} hedge wins, {stats.timeouts} timeouts)",
+            is_done=True,
+            hide_checkmark=True,
+        )
 
     # 리포트 작성
     async def _write_report(self, query: str, search_results: list[str]) -> ReportData:
         self.printer.update_item("writing", "Thinking about report...")
-        input = f"원본 쿼리: {query}\n요약된 검색 결과: {search_results}"
+
+        # 거의 같은 단락을 합치고 토큰 예산 안으로 정리
+        # MinHash 계산은 CPU 작업이므로 별도 스레드에서 (배치 모드의 다른 작업을 막지 않도록)
+        packed = await asyncio.to_thread(
+            pack_search_results,
+            [(self.search_sources.get(summary, ""), summary) for summary in search_results],
+            token_budget=self.writer_token_budget,
+        )
+        self.printer.update_item(
+            "dedup",
+            f"Collapsed {packed.paragraphs_in} paragraphs into {packed.paragraphs_out} "
+            f"(deduplicated ~{packed.tokens_deduplicated} tokens, "
+            f"{packed.tokens_dropped_for_budget} tokens dropped for budget)",
+            is_done=True,
+            hide_checkmark=True,
+        )
+        input = f"원본 쿼리: {query}\n요약된 검색 결과:\n{packed.prompt}"
         result = Runner.run_streamed(
             writer_agent,
             input,
+            run_config=self.run_config,
         )
         update_messages = [
             "Thinking about report...",
@@ -0,0 +1,45 @@
+from __future__ import annotations
+from pydantic import ValidationError
+from .agents.planner_agent import WebSearchItem
+
+# 스트리밍되는 WebSearchPlan JSON에서 완성된 검색 아이템을 순서대로 꺼내는 파서
+# {"searches": [{...}, {...}, ...]} 형태에서 searches 배열 안의 객체가 닫힐 때마다 아이템을 반환
+class SearchPlanParser:
+    # 초기화
+    def __init__(self):
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+        self.item_start: int | None = None
+        self.text = ""
+
+    # 텍스트 조각을 받아 새로 완성된 검색 아이템 반환
+    def feed(self, chunk: str) -> list[WebSearchItem]:
+        items: list[WebSearchItem] = []
+        offset = len(self.text)
+        self.text += chunk
+        for i, char in enumerate(chunk, start=offset):
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == "\\":
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+            elif char == '"':
+                self.in_string = True
+            elif char in "{[":
+                self.depth += 1
+                if char == "{" and self.depth == 3:
+                    self.item_start = i
+            elif char in "}]":
+                if char == "}" and self.depth == 3 and self.item_start is not None:
+                    try:
+                        items.append(
+                            WebSearchItem.model_validate_json(self.text[self.item_start : i + 1])
+                        )
+                    except ValidationError:
+                        pass
+                    self.item_start = None
+                self.depth -= 1
+        return items
@@ -1,42 +1,110 @@
-from typing import Any
+import json
+import sys
+import threading
+import time
+from typing import Any, TextIO
 from rich.console import Console, Group
 from rich.live import Live
 from rich.spinner import Spinner
 
 # 프린터
+# 업데이트 시에는 변경 표시만 하고, 화면은 Live의 리프레시 스레드가 최대 refresh_per_second로 그림
 class Printer:
     # 초기화
-    def __init__(self, console: Console):
-        self.live = Live(console=console)
+    def __init__(self, console: Console, refresh_per_second: float = 8):
         self.items: dict[str, tuple[str, bool]] = {}
         self.hide_done_ids: set[str] = set()
+        self.spinners: dict[str, tuple[str, Spinner]] = {}
+        self.lock = threading.Lock()
+        self.dirty = True
+        self.group = Group()
+        self.live = Live(
+            console=console,
+            refresh_per_second=refresh_per_second,
+            get_renderable=self.render,
+        )
         self.live.start()
 
     # 지정한 항목의 내용 업데이트
     def update_item(
         self, item_id: str, content: str, is_done: bool = False, hide_checkmark: bool = False
     ) -> None:
-        self.items[item_id] = (content, is_done)
-        if hide_checkmark:
-            self.hide_done_ids.add(item_id)
-        self.flush()
+        with self.lock:
+            self.items[item_id] = (content, is_done)
+            if hide_checkmark:
+                self.hide_done_ids.add(item_id)
+            self.dirty = True
 
     # 지정한 항목을 완료로 변경
     def mark_item_done(self, item_id: str) -> None:
-        self.items[item_id] = (self.items[item_id][0], True)
-        self.flush()
+        with self.lock:
+            self.items[item_id] = (self.items[item_id][0], True)
+            self.dirty = True
+
+    # 라이브 표시 내용 생성 (변경이 있을 때만 다시 구성, 스피너는 항목별로 재사용)
+    def render(self) -> Group:
+        with self.lock:
+            if not self.dirty:
+                return self.group
+            renderables: list[Any] = []
+            for item_id, (content, is_done) in self.items.items():
+                if is_done:
+                    self.spinners.pop(item_id, None)
+                    prefix = "✅ " if item_id not in self.hide_done_ids else ""
+                    renderables.append(prefix + content)
+                else:
+                    shown, spinner = self.spinners.get(item_id, (None, None))
+                    if spinner is None:
+                        spinner = Spinner("dots", text=content)
+                    elif shown != content:
+                        spinner.update(text=content)
+                    self.spinners[item_id] = (content, spinner)
+                    renderables.append(spinner)
+            self.group = Group(*renderables)
+            self.dirty = False
+            return self.group
 
-    # 라이브 표시 업데이트
+    # 라이브 표시 즉시 업데이트
     def flush(self) -> None:
-        renderables: list[Any] = []
-        for item_id, (content, is_done) in self.items.items():
-            if is_done:
-                prefix = "✅ " if item_id not in self.hide_done_ids else ""
-                renderables.append(prefix + content)
-            else:
-                renderables.append(Spinner("dots", text=content))
-        self.live.update(Group(*renderables))
+        self.live.refresh()
 
     # 라이브 표시 중지
     def end(self) -> None:
         self.live.stop()
+
+# 헤드리스 실행용 프린터 (상태가 바뀔 때만 JSON Lines로 출력)
+class JsonLinesPrinter:
+    # 초기화 (job을 지정하면 여러 리서치가 같은 스트림을 공유해도 구분 가능)
+    def __init__(self, stream: TextIO | None = None, job: str | None = None):
+        self.stream = stream or sys.stderr
+        self.job = job
+        self.items: dict[str, tuple[str, bool]] = {}
+
+    # 이벤트 출력
+    def _emit(self, item_id: str, content: str, is_done: bool) -> None:
+        event = {"time": time.time(), "item": item_id, "done": is_done, "content": content}
+        if self.job is not None:
+            event["job"] = self.job
+        self.stream.write(json.dumps(event, ensure_ascii=False) + "\n")
+        self.stream.flush()
+
+    # 지정한 항목의 내용 업데이트 (새 항목이거나 완료 상태가 바뀐 경우만 출력)
+    def update_item(
+        self, item_id: str, content: str, is_done: bool = False, hide_checkmark: bool = False
+    ) -> None:
+        previous = self.items.get(item_id)
+        self.items[item_id] = (content, is_done)
+        if previous is None or previous[1] != is_done:
+            self._emit(item_id, content, is_done)
+
+    # 지정한 항목을 완료로 변경
+    def mark_item_done(self, item_id: str) -> None:
+        self.update_item(item_id, self.items[item_id][0], is_done=True)
+
+    # 출력할 내용 없음
+    def flush(self) -> None:
+        pass
+
+    # 출력할 내용 없음
+    def end(self) -> None:
+        pass
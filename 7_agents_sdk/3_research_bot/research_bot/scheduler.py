@@ -0,0 +1,116 @@
+from __future__ import annotations
+import asyncio
+import random
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, TypeVar
+import openai
+from agents import custom_span
+
+T = TypeVar("T")
+
+# 재시도해도 되는 오류 (레이트 리밋, 타임아웃, 일시적인 서버 오류)
+RETRYABLE_ERRORS: tuple[type[BaseException], ...] = (
+    openai.RateLimitError,
+    openai.APITimeoutError,
+    openai.APIConnectionError,
+    openai.InternalServerError,
+)
+
+# 재시도 대상 오류인지 판정
+def is_retryable_error(error: BaseException) -> bool:
+    return isinstance(error, RETRYABLE_ERRORS)
+
+# 토큰 버킷 (분당 허용량만큼 채워지는 버킷)
+class TokenBucket:
+    # 초기화
+    def __init__(self, rate_per_minute: float, capacity: float | None = None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    # 경과 시간만큼 버킷 채우기
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    # 지정한 양을 꺼낼 수 있을 때까지 대기
+    async def acquire(self, amount: float = 1.0) -> None:
+        amount = min(amount, self.capacity)
+        async with self.lock:
+            while True:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                await asyncio.sleep((amount - self.tokens) / self.rate)
+
+# 스케줄러 통계
+@dataclass
+class SchedulerStats:
+    submitted: int = 0  # 요청 수
+    succeeded: int = 0  # 성공 수
+    retried: int = 0  # 재시도 횟수
+    dropped: int = 0  # 최종적으로 실패해 버려진 수
+
+# 검색 스케줄러 (동시 실행 수 제한 + 레이트 리밋 + 재시도)
+class SearchScheduler:
+    # 초기화
+    def __init__(
+        self,
+        max_concurrency: int = 5,
+        requests_per_minute: float | None = None,
+        tokens_per_minute: float | None = None,
+        tokens_per_request: int = 2000,
+        max_retries: int = 3,
+        base_delay: float = 1.0,
+        max_delay: float = 30.0,
+        is_retryable: Callable[[BaseException], bool] = is_retryable_error,
+    ):
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.request_bucket = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.token_bucket = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.tokens_per_request = tokens_per_request
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.is_retryable = is_retryable
+        self.stats = SchedulerStats()
+
+    # 레이트 리밋 버킷에서 할당량 확보 (헤지 요청처럼 슬롯 안에서 추가로 보내는 요청도 사용)
+    async def acquire_rate(self) -> None:
+        if self.request_bucket is not None:
+            await self.request_bucket.acquire(1)
+        if self.token_bucket is not None:
+            await self.token_bucket.acquire(self.tokens_per_request)
+
+    # 지수 백오프 + 풀 지터 대기 시간
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+
+    # 작업 실행 (실패하면 None 반환)
+    async def run(self, func: Callable[[], Awaitable[T]]) -> T | None:
+        self.stats.submitted += 1
+        for attempt in range(self.max_retries + 1):
+            # 대기 시간을 실행 시간과 구분해서 트레이스에 기록
+            with custom_span("Search queue wait"):
+                await self.acquire_rate()
+                await self.semaphore.acquire()
+            try:
+                result = await func()
+            except Exception as e:
+                if attempt == self.max_retries or not self.is_retryable(e):
+                    break
+            else:
+                self.stats.succeeded += 1
+                return result
+            finally:
+                self.semaphore.release()
+            # 슬롯을 반납한 뒤 백오프
+            self.stats.retried += 1
+            await asyncio.sleep(self._backoff(attempt))
+        self.stats.dropped += 1
+        return None
@@ -0,0 +1,171 @@
+from __future__ import annotations
+import bisect
+import json
+import threading
+import time
+from typing import Any
+from agents import add_trace_processor
+from agents.tracing import Span, Trace, TracingProcessor
+
+# 지연 시간 히스토그램 버킷(초)
+DURATION_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+# 히스토그램 (Prometheus 형식과 같은 누적 버킷)
+class Histogram:
+    # 초기화
+    def __init__(self, buckets: tuple[float, ...] = DURATION_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    # 값 기록
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    # 누적 버킷 (상한, 개수) 리스트
+    def cumulative(self) -> list[tuple[str, int]]:
+        total = 0
+        result = []
+        for bound, count in zip([*map(str, self.buckets), "+Inf"], self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+# 에이전트 SDK 트레이스를 프로세스 내부 지표로 집계하는 트레이스 프로세서
+# - 스팬 종류·이름별 소요 시간 히스토그램
+# - 에이전트별 입력/출력/추론 토큰 수
+# - 스팬 종류·이름별 실패 수
+class MetricsProcessor(TracingProcessor):
+    # 초기화
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.durations: dict[tuple[str, str], Histogram] = {}
+        self.tokens: dict[tuple[str, str], int] = {}
+        self.failures: dict[tuple[str, str], int] = {}
+        self.started: dict[str, float] = {}
+        self.span_agents: dict[str, str] = {}  # 스팬 ID -> 소속 에이전트 이름
+
+    # 스팬 이름 (에이전트·함수·커스텀 스팬은 이름, 모델 호출은 소속 에이전트)
+    def _span_name(self, span: Span[Any], agent: str) -> str:
+        name = getattr(span.span_data, "name", None)
+        return str(name) if name else agent
+
+    # 토큰 수 누적
+    def _add_tokens(self, agent: str, kind: str, value: int | None) -> None:
+        if value:
+            self.tokens[(agent, kind)] = self.tokens.get((agent, kind), 0) + value
+
+    # 모델 호출 스팬에서 토큰 사용량 집계
+    def _record_usage(self, span: Span[Any], agent: str) -> None:
+        data = span.span_data
+        response = getattr(data, "response", None)
+        usage = getattr(response, "usage", None)
+        if usage is not None:
+            self._add_tokens(agent, "input", usage.input_tokens)
+            self._add_tokens(agent, "output", usage.output_tokens)
+            details = getattr(usage, "output_tokens_details", None)
+            self._add_tokens(agent, "reasoning", getattr(details, "reasoning_tokens", 0))
+        elif data.type == "generation" and data.usage:
+            self._add_tokens(agent, "input", data.usage.get("input_tokens"))
+            self._add_tokens(agent, "output", data.usage.get("output_tokens"))
+
+    def on_trace_start(self, trace: Trace) -> None:
+        pass
+
+    def on_trace_end(self, trace: Trace) -> None:
+        pass
+
+    # 스팬 시작 시각과 소속 에이전트 기록
+    def on_span_start(self, span: Span[Any]) -> None:
+        with self.lock:
+            self.started[span.span_id] = time.monotonic()
+            if span.span_data.type == "agent":
+                self.span_agents[span.span_id] = span.span_data.name
+            elif span.parent_id in self.span_agents:
+                self.span_agents[span.span_id] = self.span_agents[span.parent_id]
+
+    # 스팬 종료 시 소요 시간·토큰·실패 집계
+    def on_span_end(self, span: Span[Any]) -> None:
+        with self.lock:
+            start = self.started.pop(span.span_id, None)
+            agent = self.span_agents.pop(span.span_id, "")
+            key = (span.span_data.type, self._span_name(span, agent))
+            if start is not None:
+                self.durations.setdefault(key, Histogram()).observe(time.monotonic() - start)
+            if span.error is not None:
+                self.failures[key] = self.failures.get(key, 0) + 1
+            if span.span_data.type in ("response", "generation"):
+                self._record_usage(span, agent)
+
+    def shutdown(self) -> None:
+        pass
+
+    def force_flush(self) -> None:
+        pass
+
+    # JSON으로 사용할 수 있는 딕셔너리로 덤프
+    def to_dict(self) -> dict[str, Any]:
+        with self.lock:
+            return {
+                "span_duration_seconds": [
+                    {
+                        "type": span_type,
+                        "name": name,
+                        "count": histogram.count,
+                        "sum": histogram.sum,
+                        "buckets": dict(histogram.cumulative()),
+                    }
+                    for (span_type, name), histogram in self.durations.items()
+                ],
+                "tokens": [
+                    {"agent": agent, "kind": kind, "value": value}
+                    for (agent, kind), value in self.tokens.items()
+                ],
+                "failures": [
+                    {"type": span_type, "name": name, "value": value}
+                    for (span_type, name), value in self.failures.items()
+                ],
+            }
+
+    # JSON 문자열로 덤프
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), ensure_ascii=False, indent=2)
+
+    # Prometheus 텍스트 형식으로 덤프
+    def to_prometheus(self) -> str:
+        data = self.to_dict()
+        lines = ["# TYPE agents_span_duration_seconds histogram"]
+        for entry in data["span_duration_seconds"]:
+            labels = f'type="{entry["type"]}",name="{_escape(entry["name"])}"'
+            for bound, count in entry["buckets"].items():
+                lines.append(f'agents_span_duration_seconds_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(f"agents_span_duration_seconds_sum{{{labels}}} {entry['sum']}")
+            lines.append(f"agents_span_duration_seconds_count{{{labels}}} {entry['count']}")
+        lines.append("# TYPE agents_tokens_total counter")
+        for entry in data["tokens"]:
+            labels = f'agent="{_escape(entry["agent"])}",kind="{entry["kind"]}"'
+            lines.append(f"agents_tokens_total{{{labels}}} {entry['value']}")
+        lines.append("# TYPE agents_span_failures_total counter")
+        for entry in data["failures"]:
+            labels = f'type="{entry["type"]}",name="{_escape(entry["name"])}"'
+            lines.append(f"agents_span_failures_total{{{labels}}} {entry['value']}")
+        return "\n".join(lines) + "\n"
+
+# Prometheus 라벨 값 이스케이프
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+# 지표 수집 프로세서를 등록해서 반환
+def install_metrics() -> MetricsProcessor:
+    processor = MetricsProcessor()
+    add_trace_processor(processor)
+    return processor
+
+# 지표를 파일로 저장 (.prom이면 Prometheus 텍스트, 그 외는 JSON)
+def dump_metrics(processor: MetricsProcessor, path: str) -> None:
+    text = processor.to_prometheus() if path.endswith(".prom") else processor.to_json()
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
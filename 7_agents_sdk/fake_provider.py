@@ -0,0 +1,178 @@
+from __future__ import annotations
+import asyncio
+import json
+import math
+import random
+import time
+import zlib
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, field
+import openai
+from openai.types.responses import (
+    Response,
+    ResponseCompletedEvent,
+    ResponseOutputMessage,
+    ResponseOutputText,
+    ResponseTextDeltaEvent,
+    ResponseUsage,
+)
+from openai.types.responses.response_usage import InputTokensDetails, OutputTokensDetails
+from agents import Model, ModelProvider, ModelResponse, Usage
+
+# 가짜 레이트 리밋 오류 (HTTP 응답 없이 만들 수 있는 RateLimitError)
+class FakeRateLimitError(openai.RateLimitError):
+    # 초기화
+    def __init__(self):
+        Exception.__init__(self, "fake rate limit")
+        self.message = "fake rate limit"
+        self.body = None
+        self.status_code = 429
+
+# 가짜 모델의 지연 시간·토큰 속도·오류 설정
+@dataclass
+class FakeModelProfile:
+    median_latency: float = 1.0  # 첫 토큰까지의 지연 시간 중앙값(초)
+    latency_sigma: float = 0.5  # 로그정규분포의 시그마 (클수록 꼬리가 김)
+    tokens_per_second: float = 100.0  # 출력 토큰 생성 속도
+    output_tokens: int = 300  # 출력 토큰 수
+    error_rate: float = 0.0  # 레이트 리밋 오류 비율
+    text: str | None = None  # 출력 스키마가 없을 때의 고정 응답 (없으면 검색 결과 단락을 생성)
+
+# 가짜 모델 (네트워크 없이 결정적인 응답을 반환)
+class FakeModel(Model):
+    # 초기화
+    def __init__(self, profile: FakeModelProfile, seed: int, num_searches: int):
+        self.profile = profile
+        self.seed = seed
+        self.num_searches = num_searches
+        self.calls: dict[int, int] = {}
+
+    # 입력별 난수 생성기 (같은 입력이라도 재시도마다 다른 값)
+    def _rng(self, system_instructions: str | None, input: object) -> random.Random:
+        key = zlib.crc32(f"{self.seed}:{system_instructions}:{input}".encode("utf-8"))
+        count = self.calls.get(key, 0)
+        self.calls[key] = count + 1
+        return random.Random(key * 1000 + count)
+
+    # 출력 스키마에 맞는 응답 텍스트 생성
+    def _output_text(self, output_schema, rng: random.Random) -> str:
+        name = output_schema.name() if output_schema is not None else None
+        if name == "WebSearchPlan":
+            searches = [
+                {"reason": f"이유 {i}", "query": f"검색어 {rng.randrange(10**6)}"}
+                for i in range(self.num_searches)
+            ]
+            return json.dumps({"searches": searches}, ensure_ascii=False)
+        if name == "ReportData":
+            return json.dumps(
+                {
+                    "short_summary": "가짜 요약입니다.",
+                    "markdown_report": "# 가짜 리포트\n\n" + "본문 " * self.profile.output_tokens,
+                    "follow_up_questions": ["추가 질문 1", "추가 질문 2"],
+                },
+                ensure_ascii=False,
+            )
+        if self.profile.text is not None:
+            return self.profile.text
+        return "\n\n".join(
+            f"검색 결과 단락 {rng.randrange(10**6)}. " * 10 for _ in range(3)
+        )
+
+    # 지연 시간 대기와 오류 주입
+    async def _wait(self, rng: random.Random) -> None:
+        delay = self.profile.median_latency * math.exp(self.profile.latency_sigma * rng.gauss(0, 1))
+        await asyncio.sleep(delay)
+        if rng.random() < self.profile.error_rate:
+            raise FakeRateLimitError()
+
+    # 응답 객체 생성 (SDK 버전에 따라 필수 필드가 달라지므로 검증 없이 구성)
+    def _response(self, text: str) -> Response:
+        message = ResponseOutputMessage(
+            id="msg_fake",
+            type="message",
+            role="assistant",
+            status="completed",
+            content=[ResponseOutputText(type="output_text", text=text, annotations=[])],
+        )
+        return Response.model_construct(
+            id="resp_fake",
+            created_at=time.time(),
+            model="fake",
+            object="response",
+            output=[message],
+            tool_choice="auto",
+            tools=[],
+            parallel_tool_calls=False,
+            usage=ResponseUsage.model_construct(
+                input_tokens=500,
+                input_tokens_details=InputTokensDetails.model_construct(cached_tokens=0),
+                output_tokens=self.profile.output_tokens,
+                output_tokens_details=OutputTokensDetails.model_construct(reasoning_tokens=0),
+                total_tokens=500 + self.profile.output_tokens,
+            ),
+        )
+
+    # 응답 한 번에 반환
+    async def get_response(
+        self, system_instructions, input, model_settings, tools, output_schema, handoffs,
+        tracing, *, previous_response_id=None, conversation_id=None, prompt=None,
+    ) -> ModelResponse:
+        rng = self._rng(system_instructions, input)
+        await self._wait(rng)
+        text = self._output_text(output_schema, rng)
+        await asyncio.sleep(self.profile.output_tokens / self.profile.tokens_per_second)
+        response = self._response(text)
+        return ModelResponse(
+            output=response.output,
+            usage=Usage(
+                requests=1,
+                input_tokens=response.usage.input_tokens,
+                output_tokens=response.usage.output_tokens,
+                total_tokens=response.usage.total_tokens,
+            ),
+            response_id=None,
+        )
+
+    # 응답을 스트리밍으로 반환 (토큰 속도에 맞춰 조각 단위로 전송)
+    async def stream_response(
+        self, system_instructions, input, model_settings, tools, output_schema, handoffs,
+        tracing, *, previous_response_id=None, conversation_id=None, prompt=None,
+    ) -> AsyncIterator:
+        rng = self._rng(system_instructions, input)
+        await self._wait(rng)
+        text = self._output_text(output_schema, rng)
+        num_chunks = 20
+        chunk_size = max(1, len(text) // num_chunks + 1)
+        for sequence, start in enumerate(range(0, len(text), chunk_size)):
+            await asyncio.sleep(
+                self.profile.output_tokens / self.profile.tokens_per_second / num_chunks
+            )
+            yield ResponseTextDeltaEvent(
+                type="response.output_text.delta",
+                item_id="msg_fake",
+                output_index=0,
+                content_index=0,
+                delta=text[start : start + chunk_size],
+                logprobs=[],
+                sequence_number=sequence,
+            )
+        yield ResponseCompletedEvent(
+            type="response.completed", response=self._response(text), sequence_number=num_chunks + 1
+        )
+
+# 가짜 모델 프로바이더 (모델 이름별로 프로필 지정, 없으면 default 사용)
+@dataclass
+class FakeModelProvider(ModelProvider):
+    profiles: dict[str, FakeModelProfile] = field(default_factory=dict)
+    default: FakeModelProfile = field(default_factory=FakeModelProfile)
+    num_searches: int = 10
+    seed: int = 0
+    models: dict[str, FakeModel] = field(default_factory=dict)
+
+    # 모델 반환 (재시도마다 다른 응답이 나오도록 모델 이름별로 재사용)
+    def get_model(self, model_name: str | None) -> Model:
+        name = model_name or ""
+        if name not in self.models:
+            profile = self.profiles.get(name, self.default)
+            self.models[name] = FakeModel(profile, self.seed, self.num_searches)
+        return self.models[name]